@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:41:09 2026
+
+Benchmark of optimization in linear and log scale for the synTF_chem example
+(run PYTHONPATH=src python -m benchmarks.benchmark_parameter_scale from the repository root)
+"""
+import json
+import os
+import time
+import numpy as np
+import games
+from games.config.experimental_data import define_experimental_data
+from games.config.settings import (
+    define_free_parameter_indices,
+    set_default_parameter_bounds,
+    set_non_default_parameter_bounds,
+)
+from games.models.set_model import set_model
+from games.modules.parameter_estimation.optimization import optimize_initial_guess
+from games.modules.parameter_estimation.samplers import sample_parameters
+
+NUM_INITIAL_GUESSES = 8
+
+
+def main() -> None:
+    """Optimizes the same initial guesses in linear and log scale and compares the number
+    of model evaluations, the wall time and the chi_sq values reached"""
+    context = os.path.join(os.path.dirname(games.__file__), "")
+    with open(os.path.join(context, "config", "config_chem.json"), encoding="utf-8") as file:
+        settings = json.load(file)
+    settings["context"] = context
+    free_parameters, _ = define_free_parameter_indices(
+        settings["parameters"], settings["parameter_labels"], settings["free_parameter_labels"]
+    )
+    bounds_log = set_non_default_parameter_bounds(
+        set_default_parameter_bounds(settings["bounds_orders_of_magnitude"], free_parameters),
+        settings["non_default_bounds"],
+        settings["free_parameter_labels"],
+    )
+    problem = {
+        "num_vars": len(free_parameters),
+        "names": settings["free_parameter_labels"],
+        "bounds": bounds_log,
+    }
+    x, exp_data, exp_error = define_experimental_data(settings)
+    model = set_model(settings)
+
+    free_parameter_indices = [
+        settings["parameter_labels"].index(label) for label in settings["free_parameter_labels"]
+    ]
+    initial_guesses = np.tile(
+        np.asarray(settings["parameters"], dtype=float), (NUM_INITIAL_GUESSES, 1)
+    )
+    initial_guesses[:, free_parameter_indices] = 10 ** sample_parameters(
+        problem, NUM_INITIAL_GUESSES, "sobol", 456767
+    )
+
+    for optimizer_jacobian in ["finite difference", "sensitivity"]:
+        for parameter_scale in ["linear", "log"]:
+            num_evaluations = []
+            chi_sq_values = []
+            start_time = time.perf_counter()
+            for count, initial_parameters in enumerate(initial_guesses):
+                results_row, results_row_labels = optimize_initial_guess(
+                    model,
+                    count + 1,
+                    list(initial_parameters),
+                    [x, exp_data, exp_error],
+                    [
+                        settings["dataID"],
+                        settings["weight_by_error"],
+                        settings["parameter_labels"],
+                        problem,
+                        "leastsq",
+                        optimizer_jacobian,
+                        parameter_scale,
+                        "ppl",
+                    ],
+                )
+                num_evaluations.append(len(results_row[results_row_labels.index("chi_sq_list")]))
+                chi_sq_values.append(results_row[results_row_labels.index("chi_sq")])
+            wall_time = time.perf_counter() - start_time
+            print(
+                optimizer_jacobian
+                + ", "
+                + parameter_scale
+                + ": "
+                + str(int(np.sum(num_evaluations)))
+                + " model evaluations, "
+                + str(round(wall_time, 1))
+                + " s, median chi_sq "
+                + str(round(float(np.median(chi_sq_values)), 2))
+                + ", best chi_sq "
+                + str(round(float(np.min(chi_sq_values)), 2))
+                + ", chi_sq per run "
+                + str([round(float(chi_sq), 1) for chi_sq in chi_sq_values])
+            )
+
+
+if __name__ == "__main__":
+    main()
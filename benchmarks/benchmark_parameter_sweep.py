@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:12:40 2026
+
+Benchmark of the construction of the global search parameter sweep
+(run PYTHONPATH=src python -m benchmarks.benchmark_parameter_sweep from the repository root)
+"""
+import time
+from typing import Callable, List
+import numpy as np
+import pandas as pd
+from games.modules.parameter_estimation.global_search import (
+    convert_parameters_to_linear,
+    create_default_df,
+    replace_parameter_values_for_sweep,
+)
+from games.modules.parameter_estimation.samplers import sample_parameters
+
+PARAMETER_LABELS = ["e", "b", "k_bind", "m", "km", "n"]
+ALL_PARAMETERS = [1.0, 0.01, 0.05, 1.0, 0.1, 2.0]
+PROBLEM = {
+    "num_vars": 5,
+    "names": ["e", "k_bind", "m", "km", "n"],
+    "bounds": [[-3, 3], [-4, 2], [-3, 3], [-4, 2], [-0.3, 0.6]],
+}
+
+
+def create_default_df_loop(
+    n_search: int, all_parameter_labels: List[str], all_parameters: List[float]
+) -> pd.DataFrame:
+    """Column by column construction of the default df (before vectorization)"""
+    df_parameters = pd.DataFrame()
+    for i, param in enumerate(all_parameter_labels):
+        param_array = np.full((1, n_search), all_parameters[i])
+        param_array = param_array.tolist()
+        df_parameters[param] = param_array[0]
+    return df_parameters
+
+
+def convert_parameters_to_linear_loop(param_values_global_search: List[list]) -> np.ndarray:
+    """Element by element conversion to linear scale (before vectorization)"""
+    params_linear = []
+    for item in param_values_global_search:
+        params_linear.append([10 ** (val) for val in item])
+    return np.asarray(params_linear)
+
+
+def replace_parameter_values_for_sweep_loop(
+    df_parameters_default: pd.DataFrame,
+    num_parameters: int,
+    free_parameter_labels: List[str],
+    params_linear: np.ndarray,
+) -> pd.DataFrame:
+    """Label by label replacement of the free parameter columns (before vectorization)"""
+    df_parameters = df_parameters_default
+    for i in range(0, num_parameters):
+        for label in free_parameter_labels:
+            if free_parameter_labels[i] == label:
+                df_parameters[label] = params_linear[:, i]
+    return df_parameters
+
+
+def build_sweep(
+    n_search: int,
+    samples_log: np.ndarray,
+    create_default: Callable,
+    convert: Callable,
+    replace: Callable,
+) -> pd.DataFrame:
+    """Builds the parameter sweep df from log scale samples with the given functions"""
+    df_parameters_default = create_default(n_search, PARAMETER_LABELS, ALL_PARAMETERS)
+    params_linear = convert(samples_log)
+    return replace(df_parameters_default, PROBLEM["num_vars"], PROBLEM["names"], params_linear)
+
+
+def main() -> None:
+    """Times the loop and vectorized sweep construction for increasing sweep sizes"""
+    for n_search in [10**4, 10**5, 10**6]:
+        samples_log = sample_parameters(PROBLEM, n_search, "sobol", 456767)
+        times = []
+        dfs = []
+        for functions in [
+            (
+                create_default_df_loop,
+                convert_parameters_to_linear_loop,
+                replace_parameter_values_for_sweep_loop,
+            ),
+            (create_default_df, convert_parameters_to_linear, replace_parameter_values_for_sweep),
+        ]:
+            start_time = time.perf_counter()
+            dfs.append(build_sweep(n_search, samples_log, *functions))
+            times.append(time.perf_counter() - start_time)
+        np.testing.assert_allclose(dfs[0].to_numpy(dtype=float), dfs[1].to_numpy(dtype=float))
+        print(
+            "n_search = "
+            + str(n_search)
+            + ": loop "
+            + str(round(times[0], 3))
+            + " s, vectorized "
+            + str(round(times[1], 3))
+            + " s ("
+            + str(round(times[0] / times[1], 1))
+            + "x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from math import log10
 from typing import Tuple, List
 import json
+import os
 from games.utilities.saving import make_main_directory
 
 
@@ -122,6 +123,12 @@ def define_settings(settings_import: dict) -> Tuple[dict, str, dict]:
 
     """
 
+    # Paths to the config files, training data and results are relative to context,
+    # which defaults to the installed src/games folder
+    if "context" not in settings_import:
+        settings_import["context"] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    settings_import["context"] = os.path.join(settings_import["context"], "")
+
     # Define free parameter indices and add to settings dictionary
     free_parameters, free_parameter_indices = define_free_parameter_indices(
         settings_import["parameters"],
@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:12:41 2026
+
+Gradient and Jacobian kernels for the compiled model backend.
+
+The kernels are plain Python functions that only use scalar arithmetic and
+numpy arrays so that they can be compiled with Numba (optional dependency).
+Parameters and inputs are packed into a single float array and any
+mechanism-specific branching is resolved before the kernels are called.
+"""
+from typing import Any, Callable, Tuple
+import numpy as np
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args: Any, **kwargs: Any) -> Callable[[Callable], Callable]:  # type: ignore[no-redef]
+        """Leaves the kernels as plain Python functions if numba is not installed"""
+        return lambda function: function
+
+
+@njit(cache=True)
+def synTF_gradient(y: np.ndarray, t: float, p: np.ndarray) -> np.ndarray:
+    """Defines the gradient for synTF model.
+
+    Parameters
+    ----------
+    y
+        an array defining the model states
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters and inputs [b, m, w, dose_a]
+
+    Returns
+    -------
+    dydt
+        An array corresponding to the gradient of each model state at time t
+
+    """
+    k_txn = 1.0
+    k_trans = 1.0
+    kdeg_rna = 2.7
+    kdeg_protein = 0.35
+    kdeg_reporter = 0.029
+
+    b = p[0]
+    m = p[1]
+    w = p[2]
+    dose_a = p[3]
+
+    fractional_activation_promoter = b + m * w * y[1] / (1 + w * y[1])
+
+    dydt = np.empty(4)
+    dydt[0] = k_txn * dose_a - kdeg_rna * y[0]  # y0 synTF mRNA
+    dydt[1] = k_trans * y[0] - kdeg_protein * y[1]  # y1 synTF protein
+    dydt[2] = k_txn * fractional_activation_promoter - kdeg_rna * y[2]  # y2 Reporter mRNA
+    dydt[3] = k_trans * y[2] - kdeg_reporter * y[3]  # y3 Reporter protein
+
+    return dydt
+
+
+@njit(cache=True)
+def synTF_jacobian(y: np.ndarray, t: float, p: np.ndarray) -> np.ndarray:
+    """Defines the Jacobian of the gradient for synTF model.
+
+    Parameters
+    ----------
+    y
+        an array defining the model states
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters and inputs [b, m, w, dose_a]
+
+    Returns
+    -------
+    jacobian
+        An array in which element [i, j] is the derivative of the gradient of
+        state i with respect to state j
+
+    """
+    k_txn = 1.0
+    k_trans = 1.0
+    kdeg_rna = 2.7
+    kdeg_protein = 0.35
+    kdeg_reporter = 0.029
+
+    m = p[1]
+    w = p[2]
+
+    jacobian = np.zeros((4, 4))
+    jacobian[0, 0] = -kdeg_rna
+    jacobian[1, 0] = k_trans
+    jacobian[1, 1] = -kdeg_protein
+    jacobian[2, 1] = k_txn * m * w / (1 + w * y[1]) ** 2
+    jacobian[2, 2] = -kdeg_rna
+    jacobian[3, 2] = k_trans
+    jacobian[3, 3] = -kdeg_reporter
+
+    return jacobian
+
+
+@njit(cache=True)
+def synTF_chem_gradient(y: np.ndarray, t: float, p: np.ndarray) -> np.ndarray:
+    """Defines the gradient for synTF_Chem model.
+
+    Parameters
+    ----------
+    y
+        an array defining the model states
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters and inputs
+        [b, k_bind, m, km, n, dose_a, dose_b] (m is already scaled by b for
+        mechanisms in which m is defined relative to b)
+
+    Returns
+    -------
+    dydt
+        An array corresponding to the gradient of each model state at time t
+
+    """
+    k_txn = 1.0
+    k_trans = 1.0
+    kdeg_rna = 2.7
+    kdeg_protein = 0.35
+    kdeg_reporter = 0.029
+    kdeg_ligand = 0.01
+
+    b = p[0]
+    k_bind = p[1]
+    m = p[2]
+    km = p[3]
+    n = p[4]
+    dose_a = p[5]
+    dose_b = p[6]
+
+    activator_term = (y[5] / km) ** n
+    fractional_activation_promoter = (b + m * activator_term) / (
+        1 + activator_term + (y[1] / km) ** n
+    )
+    if np.isnan(fractional_activation_promoter):
+        fractional_activation_promoter = 0.0
+
+    binding = k_bind * y[1] * y[3] * y[4]
+
+    dydt = np.empty(8)
+    dydt[0] = k_txn * dose_a - kdeg_rna * y[0]  # y0 A mRNA
+    dydt[1] = k_trans * y[0] - kdeg_protein * y[1] - binding  # y1 A protein
+    dydt[2] = k_txn * dose_b - kdeg_rna * y[2]  # y2 B mRNA
+    dydt[3] = k_trans * y[2] - kdeg_protein * y[3] - binding  # y3 B protein
+    dydt[4] = -binding - y[4] * kdeg_ligand  # y4 Ligand
+    dydt[5] = binding - kdeg_protein * y[5]  # y5 Activator
+    dydt[6] = k_txn * fractional_activation_promoter - kdeg_rna * y[6]  # y6 Reporter mRNA
+    dydt[7] = k_trans * y[6] - kdeg_reporter * y[7]  # y7 Reporter protein
+
+    return dydt
+
+
+@njit(cache=True)
+def synTF_chem_jacobian(y: np.ndarray, t: float, p: np.ndarray) -> np.ndarray:
+    """Defines the Jacobian of the gradient for synTF_Chem model.
+
+    Parameters
+    ----------
+    y
+        an array defining the model states
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters and inputs
+        [b, k_bind, m, km, n, dose_a, dose_b]
+
+    Returns
+    -------
+    jacobian
+        An array in which element [i, j] is the derivative of the gradient of
+        state i with respect to state j
+
+    """
+    k_txn = 1.0
+    k_trans = 1.0
+    kdeg_rna = 2.7
+    kdeg_protein = 0.35
+    kdeg_reporter = 0.029
+    kdeg_ligand = 0.01
+
+    b = p[0]
+    k_bind = p[1]
+    m = p[2]
+    km = p[3]
+    n = p[4]
+
+    # derivatives of the ligand binding rate
+    binding_y1 = k_bind * y[3] * y[4]
+    binding_y3 = k_bind * y[1] * y[4]
+    binding_y4 = k_bind * y[1] * y[3]
+
+    # derivatives of the fractional promoter activation
+    activator_term = (y[5] / km) ** n
+    denominator = 1 + activator_term + (y[1] / km) ** n
+    fractional_activation_promoter = (b + m * activator_term) / denominator
+    promoter_y1 = 0.0
+    promoter_y5 = 0.0
+    if not np.isnan(fractional_activation_promoter):
+        if y[1] > 0 or n >= 1:
+            promoter_y1 = -fractional_activation_promoter * n * (y[1] / km) ** (n - 1) / km
+            promoter_y1 = promoter_y1 / denominator
+        if y[5] > 0 or n >= 1:
+            promoter_y5 = (m - fractional_activation_promoter) * n * (y[5] / km) ** (n - 1) / km
+            promoter_y5 = promoter_y5 / denominator
+        if np.isnan(promoter_y1):
+            promoter_y1 = 0.0
+        if np.isnan(promoter_y5):
+            promoter_y5 = 0.0
+
+    jacobian = np.zeros((8, 8))
+    jacobian[0, 0] = -kdeg_rna
+    jacobian[1, 0] = k_trans
+    jacobian[1, 1] = -kdeg_protein - binding_y1
+    jacobian[1, 3] = -binding_y3
+    jacobian[1, 4] = -binding_y4
+    jacobian[2, 2] = -kdeg_rna
+    jacobian[3, 1] = -binding_y1
+    jacobian[3, 2] = k_trans
+    jacobian[3, 3] = -kdeg_protein - binding_y3
+    jacobian[3, 4] = -binding_y4
+    jacobian[4, 1] = -binding_y1
+    jacobian[4, 3] = -binding_y3
+    jacobian[4, 4] = -binding_y4 - kdeg_ligand
+    jacobian[5, 1] = binding_y1
+    jacobian[5, 3] = binding_y3
+    jacobian[5, 4] = binding_y4
+    jacobian[5, 5] = -kdeg_protein
+    jacobian[6, 1] = k_txn * promoter_y1
+    jacobian[6, 5] = k_txn * promoter_y5
+    jacobian[6, 6] = -kdeg_rna
+    jacobian[7, 6] = k_trans
+    jacobian[7, 7] = -kdeg_reporter
+
+    return jacobian
+
+
+@njit(cache=True)
+def synTF_chem_gradient_batch(
+    y: np.ndarray, t: float, p: np.ndarray, inputs: np.ndarray
+) -> np.ndarray:
+    """Defines the gradient for synTF_Chem model for a batch of conditions.
+
+    Parameters
+    ----------
+    y
+        a 1D array defining the model states for all conditions
+        (the states of each condition are stored contiguously)
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters [b, k_bind, m, km, n]
+
+    inputs
+        an array of floats defining the inputs (rows are conditions,
+        columns are dose_a and dose_b)
+
+    Returns
+    -------
+    dydt
+        a 1D array corresponding to the gradient of each model state
+        for all conditions at time t
+
+    """
+    dydt = np.empty(y.shape[0])
+    p_condition = np.empty(7)
+    p_condition[:5] = p[:5]
+    for i in range(inputs.shape[0]):
+        p_condition[5] = inputs[i, 0]
+        p_condition[6] = inputs[i, 1]
+        dydt[i * 8 : (i + 1) * 8] = synTF_chem_gradient(y[i * 8 : (i + 1) * 8], t, p_condition)
+
+    return dydt
+
+
+@njit(cache=True)
+def synTF_chem_jacobian_batch(
+    y: np.ndarray, t: float, p: np.ndarray, inputs: np.ndarray
+) -> np.ndarray:
+    """Defines the Jacobian of the gradient for synTF_Chem model for a batch of
+    conditions in the banded format used by ODEint (ml = mu = 7)
+
+    Parameters
+    ----------
+    y
+        a 1D array defining the model states for all conditions
+        (the states of each condition are stored contiguously)
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters [b, k_bind, m, km, n]
+
+    inputs
+        an array of floats defining the inputs (rows are conditions,
+        columns are dose_a and dose_b)
+
+    Returns
+    -------
+    jacobian_banded
+        an array in which element [i - j + 7, j] is the derivative of the
+        gradient of state i with respect to state j
+
+    """
+    jacobian_banded = np.zeros((15, y.shape[0]))
+    p_condition = np.empty(7)
+    p_condition[:5] = p[:5]
+    for condition in range(inputs.shape[0]):
+        p_condition[5] = inputs[condition, 0]
+        p_condition[6] = inputs[condition, 1]
+        offset = condition * 8
+        jacobian = synTF_chem_jacobian(y[offset : offset + 8], t, p_condition)
+        for i in range(8):
+            for j in range(8):
+                jacobian_banded[i - j + 7, offset + j] = jacobian[i, j]
+
+    return jacobian_banded
+
+
+@njit(cache=True)
+def synTF_parameter_jacobian(y: np.ndarray, t: float, p: np.ndarray) -> np.ndarray:
+    """Defines the derivatives of the gradient for synTF model with respect to the
+    parameters [b, m, w]
+
+    Parameters
+    ----------
+    y
+        an array defining the model states
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters and inputs [b, m, w, dose_a]
+
+    Returns
+    -------
+    parameter_jacobian
+        An array in which element [i, j] is the derivative of the gradient of
+        state i with respect to parameter j
+
+    """
+    k_txn = 1.0
+    m = p[1]
+    w = p[2]
+
+    parameter_jacobian = np.zeros((4, 3))
+    parameter_jacobian[2, 0] = k_txn
+    parameter_jacobian[2, 1] = k_txn * w * y[1] / (1 + w * y[1])
+    parameter_jacobian[2, 2] = k_txn * m * y[1] / (1 + w * y[1]) ** 2
+
+    return parameter_jacobian
+
+
+@njit(cache=True)
+def synTF_chem_parameter_jacobian(y: np.ndarray, t: float, p: np.ndarray) -> np.ndarray:
+    """Defines the derivatives of the gradient for synTF_Chem model with respect to the
+    parameters [e, b, k_bind, m, km, n]
+
+    Parameters
+    ----------
+    y
+        an array defining the model states
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters and inputs
+        [b, k_bind, m, km, n, dose_a, dose_b, m_scaled_by_b, m_parameter], in which
+        m is the effective value used in the gradient, m_scaled_by_b is 1 if m is
+        defined relative to b (else 0) and m_parameter is the value of parameter m
+
+    Returns
+    -------
+    parameter_jacobian
+        An array in which element [i, j] is the derivative of the gradient of
+        state i with respect to parameter j
+
+    """
+    k_txn = 1.0
+
+    b = p[0]
+    m = p[2]
+    km = p[3]
+    n = p[4]
+
+    activator_term = (y[5] / km) ** n
+    repressor_term = (y[1] / km) ** n
+    denominator = 1 + activator_term + repressor_term
+    fractional_activation_promoter = (b + m * activator_term) / denominator
+    activator_term_n = 0.0
+    if y[5] > 0:
+        activator_term_n = activator_term * np.log(y[5] / km)
+    repressor_term_n = 0.0
+    if y[1] > 0:
+        repressor_term_n = repressor_term * np.log(y[1] / km)
+
+    promoter_b = 1 / denominator
+    promoter_m = activator_term / denominator
+    promoter_km = (
+        -n
+        / km
+        * (m * activator_term - fractional_activation_promoter * (activator_term + repressor_term))
+        / denominator
+    )
+    promoter_n = (
+        m * activator_term_n
+        - fractional_activation_promoter * (activator_term_n + repressor_term_n)
+    ) / denominator
+    if not (
+        np.isfinite(fractional_activation_promoter)
+        and np.isfinite(promoter_b)
+        and np.isfinite(promoter_m)
+        and np.isfinite(promoter_km)
+        and np.isfinite(promoter_n)
+    ):
+        promoter_b = 0.0
+        promoter_m = 0.0
+        promoter_km = 0.0
+        promoter_n = 0.0
+
+    if p[7] == 1:
+        promoter_b = promoter_b + p[8] * promoter_m
+        promoter_m = b * promoter_m
+
+    binding_k_bind = y[1] * y[3] * y[4]
+
+    parameter_jacobian = np.zeros((8, 6))
+    parameter_jacobian[1, 2] = -binding_k_bind
+    parameter_jacobian[3, 2] = -binding_k_bind
+    parameter_jacobian[4, 2] = -binding_k_bind
+    parameter_jacobian[5, 2] = binding_k_bind
+    parameter_jacobian[6, 1] = k_txn * promoter_b
+    parameter_jacobian[6, 3] = k_txn * promoter_m
+    parameter_jacobian[6, 4] = k_txn * promoter_km
+    parameter_jacobian[6, 5] = k_txn * promoter_n
+
+    return parameter_jacobian
+
+
+@njit(cache=True)
+def augment_gradient(
+    z: np.ndarray, dydt: np.ndarray, jacobian: np.ndarray, parameter_jacobian: np.ndarray
+) -> np.ndarray:
+    """Defines the gradient of a model augmented with the forward sensitivity
+    equations dS/dt = J S + df/dp
+
+    Parameters
+    ----------
+    z
+        a 1D array defining the model states followed by the sensitivities of
+        each model state to each parameter (flattened by row, rows are model states)
+
+    dydt
+        an array defining the gradient of the model states
+
+    jacobian
+        an array defining the Jacobian of the gradient
+
+    parameter_jacobian
+        an array defining the derivatives of the gradient with respect to the parameters
+
+    Returns
+    -------
+    dzdt
+        a 1D array corresponding to the gradient of each model state and sensitivity
+
+    """
+    number_of_states, number_of_parameters = parameter_jacobian.shape
+    dzdt = np.empty(z.shape[0])
+    dzdt[:number_of_states] = dydt
+    for i in range(number_of_states):
+        for j in range(number_of_parameters):
+            value = parameter_jacobian[i, j]
+            for k in range(number_of_states):
+                value += jacobian[i, k] * z[number_of_states + k * number_of_parameters + j]
+            dzdt[number_of_states + i * number_of_parameters + j] = value
+
+    return dzdt
+
+
+@njit(cache=True)
+def augment_jacobian(jacobian: np.ndarray, number_of_parameters: int) -> np.ndarray:
+    """Defines the approximate Jacobian of a model augmented with the forward
+    sensitivity equations (second derivative terms are neglected)
+
+    Parameters
+    ----------
+    jacobian
+        an array defining the Jacobian of the gradient
+
+    number_of_parameters
+        an integer defining the number of parameters
+
+    Returns
+    -------
+    jacobian_augmented
+        an array defining the approximate Jacobian of the augmented system
+
+    """
+    number_of_states = jacobian.shape[0]
+    size = number_of_states * (number_of_parameters + 1)
+    jacobian_augmented = np.zeros((size, size))
+    jacobian_augmented[:number_of_states, :number_of_states] = jacobian
+    for i in range(number_of_states):
+        for k in range(number_of_states):
+            for j in range(number_of_parameters):
+                jacobian_augmented[
+                    number_of_states + i * number_of_parameters + j,
+                    number_of_states + k * number_of_parameters + j,
+                ] = jacobian[i, k]
+
+    return jacobian_augmented
+
+
+@njit(cache=True)
+def synTF_gradient_sensitivity(z: np.ndarray, t: float, p: np.ndarray) -> np.ndarray:
+    """Defines the gradient for synTF model augmented with the forward sensitivity equations
+
+    Parameters
+    ----------
+    z
+        a 1D array defining the model states followed by the sensitivities
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters and inputs [b, m, w, dose_a]
+
+    Returns
+    -------
+    dzdt
+        a 1D array corresponding to the gradient of each model state and sensitivity
+
+    """
+    y = z[:4]
+    return augment_gradient(
+        z,
+        synTF_gradient(y, t, p),
+        synTF_jacobian(y, t, p),
+        synTF_parameter_jacobian(y, t, p),
+    )
+
+
+@njit(cache=True)
+def synTF_jacobian_sensitivity(z: np.ndarray, t: float, p: np.ndarray) -> np.ndarray:
+    """Defines the approximate Jacobian for synTF model augmented with the forward
+    sensitivity equations
+
+    Parameters
+    ----------
+    z
+        a 1D array defining the model states followed by the sensitivities
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters and inputs [b, m, w, dose_a]
+
+    Returns
+    -------
+    jacobian
+        an array defining the approximate Jacobian of the augmented system
+
+    """
+    return augment_jacobian(synTF_jacobian(z[:4], t, p), 3)
+
+
+@njit(cache=True)
+def synTF_chem_gradient_sensitivity(z: np.ndarray, t: float, p: np.ndarray) -> np.ndarray:
+    """Defines the gradient for synTF_Chem model augmented with the forward sensitivity
+    equations
+
+    Parameters
+    ----------
+    z
+        a 1D array defining the model states followed by the sensitivities
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters and inputs
+        (see synTF_chem_parameter_jacobian())
+
+    Returns
+    -------
+    dzdt
+        a 1D array corresponding to the gradient of each model state and sensitivity
+
+    """
+    y = z[:8]
+    return augment_gradient(
+        z,
+        synTF_chem_gradient(y, t, p),
+        synTF_chem_jacobian(y, t, p),
+        synTF_chem_parameter_jacobian(y, t, p),
+    )
+
+
+@njit(cache=True)
+def synTF_chem_jacobian_sensitivity(z: np.ndarray, t: float, p: np.ndarray) -> np.ndarray:
+    """Defines the approximate Jacobian for synTF_Chem model augmented with the forward
+    sensitivity equations
+
+    Parameters
+    ----------
+    z
+        a 1D array defining the model states followed by the sensitivities
+
+    t
+        a float defining the time (necessary parameter to use ODEint to solve gradient)
+
+    p
+        an array of floats defining the packed parameters and inputs
+        (see synTF_chem_parameter_jacobian())
+
+    Returns
+    -------
+    jacobian
+        an array defining the approximate Jacobian of the augmented system
+
+    """
+    return augment_jacobian(synTF_chem_jacobian(z[:8], t, p), 6)
+
+
+KERNELS = {
+    "synTF": (synTF_gradient, synTF_jacobian),
+    "synTF_chem": (synTF_chem_gradient, synTF_chem_jacobian),
+    "synTF_chem batch": (synTF_chem_gradient_batch, synTF_chem_jacobian_batch),
+    "synTF sensitivity": (synTF_gradient_sensitivity, synTF_jacobian_sensitivity),
+    "synTF_chem sensitivity": (synTF_chem_gradient_sensitivity, synTF_chem_jacobian_sensitivity),
+}
+
+
+def get_compiled_kernels(kernelID: str) -> Tuple[Callable, Callable]:
+    """Returns the Numba-compiled gradient and Jacobian kernels for the given kernelID
+
+    Kernels are compiled the first time they are called and the compiled
+    functions are cached on disk by Numba, so the compilation cost is only
+    paid once on a given machine.
+
+    Parameters
+    ----------
+    kernelID
+        a string defining the kernels (a key of KERNELS)
+
+    Returns
+    -------
+    gradient
+        the compiled gradient function
+
+    jacobian
+        the compiled Jacobian function
+
+    """
+    if not NUMBA_AVAILABLE:
+        raise ImportError(
+            'model_backend = "numba" requires numba to be installed (pip install numba)'
+        )
+
+    return KERNELS[kernelID]
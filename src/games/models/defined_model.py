@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:48:05 2026
+
+Model class built from a declarative model definition (see games/models/model_definition.py)
+"""
+from typing import List, Optional, Tuple, Union
+import numpy as np
+from games.models.model_definition import (
+    check_model_definition,
+    compile_model_functions,
+    load_model_definition,
+)
+from games.models.solvers import define_solver, solve_ode
+from games.plots.plots_training_data import plot_training_data_2d
+
+
+class DefinedModel:
+    """
+    Representation of a model built from a declarative model definition
+
+    """
+
+    def __init__(
+        self,
+        definition: Union[str, dict],
+        parameters: List[float] = None,
+        inputs: List[float] = None,
+        model_backend: str = "python",
+        solver: dict = None,
+        solve_mode: str = "default",
+    ) -> None:
+        """Initializes the model.
+
+        Parameters
+        ----------
+        definition
+            a dictionary defining the model, or a string defining the path
+            to the model definition file
+
+        parameters
+            a list of floats defining the parameters
+
+        inputs
+            a list of floats defining the inputs (defaults to the values in
+            "default_inputs" in the model definition, or 0 if not given)
+
+        model_backend
+            a string defining whether the gradient and Jacobian of a single condition
+            are compiled with numba ("numba") or not ("python")
+
+        solver
+            a dictionary of solver settings (see games.models.solvers.define_solver),
+            or None to use the default solver
+
+        solve_mode
+            a string defining whether the conditions of an experiment are solved one
+            at a time ("default") or all at once in a single vectorized ODE system ("batch")
+
+        Returns
+        -------
+        None
+
+        """
+        if isinstance(definition, str):
+            definition = load_model_definition(definition)
+        else:
+            check_model_definition(definition)
+        self.definition = definition
+        self.modelID = definition["modelID"]
+        self.state_labels = list(definition["species"].values())
+        self.parameter_labels = list(definition["parameters"])
+        self.input_labels = list(definition.get("inputs", []))
+        if parameters is None:
+            parameters = [1] * len(self.parameter_labels)
+        if inputs is None:
+            default_inputs = definition.get("default_inputs", {})
+            inputs = [default_inputs.get(label, 0) for label in self.input_labels]
+        self.parameters = parameters
+        self.inputs = inputs
+        self.model_backend = model_backend
+        self.solver = define_solver(solver)
+        self.solve_mode = solve_mode
+        self.functions = compile_model_functions(definition, model_backend)
+        self.output_index = list(definition["species"]).index(definition["output"])
+        self.initial_conditions = np.array(
+            [
+                definition.get("initial_conditions", {}).get(name, 0)
+                for name in definition["species"]
+            ],
+            dtype=float,
+        )
+
+    def with_parameters(self, parameters: List[float]) -> "DefinedModel":
+        """Defines an independent copy of the model with the given parameters
+        (see synTF.with_parameters())
+
+        Parameters
+        ----------
+        parameters
+            a list of floats defining the parameters
+
+        Returns
+        -------
+        model
+            a copy of the model with the given parameters
+
+        """
+        given_model = object.__new__(type(self))
+        given_model.__dict__.update(self.__dict__)
+        given_model.parameters = list(parameters)
+
+        return given_model
+
+    def __getstate__(self) -> dict:
+        # compiled model functions are not pickled, they are defined again when the model is unpickled
+        state = dict(self.__dict__)
+        state.pop("functions", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.functions = compile_model_functions(self.definition, self.model_backend)
+
+    def solve_single(self, output: str = "dense") -> Tuple[np.ndarray, np.ndarray]:
+        """Solves the model for a single set of parameters and inputs, one phase
+        of the protocol at a time
+
+        Parameters
+        ----------
+        output
+            a string defining the output mode ("dense" returns the solution at
+            evenly spaced timepoints in each phase, "final" returns only the initial and
+            final states of each phase)
+
+        Returns
+        -------
+        solution
+            An array of ODE solutions (rows are timepoints and columns are model states)
+
+        t
+            A 1D array of time values corresponding to the rows in solution
+
+        """
+        parameters = np.asarray(self.parameters, dtype=float)
+        inputs = np.asarray(self.inputs, dtype=float)
+        args = (parameters, inputs)
+        states = np.array(self.initial_conditions)
+        solutions, timepoints = [], []
+        start_time = 0
+        for phase_index, phase in enumerate(self.definition["protocol"]):
+            states = self.functions["set_phase_" + str(phase_index)](states, parameters, inputs)
+            solution, t = solve_ode(
+                self.functions["gradient"],
+                self.functions["jacobian"],
+                states,
+                phase["duration"],
+                args,
+                self.solver,
+                output,
+            )
+            solutions.append(solution)
+            timepoints.append(t + start_time)
+            states = np.array(solution[-1, :])
+            start_time += phase["duration"]
+
+        return np.vstack(solutions), np.concatenate(timepoints)
+
+    def solve_batch(self, conditions: np.ndarray) -> List[float]:
+        """Solves the model for all conditions of an experiment in a single ODE
+        system with the vectorized gradient and banded Jacobian
+
+        Parameters
+        ----------
+        conditions
+            an array defining the inputs of each condition (rows are conditions)
+
+        Returns
+        -------
+        solutions
+            A list of floats containing the value of the output species
+            at the final timepoint for each condition
+
+        """
+        if len(conditions) == 0:
+            return []
+
+        number_of_states = len(self.state_labels)
+        parameters = np.asarray(self.parameters, dtype=float)
+        args = (parameters, conditions)
+        states = np.tile(self.initial_conditions, (len(conditions), 1))
+        for phase_index, phase in enumerate(self.definition["protocol"]):
+            states = self.functions["set_phase_" + str(phase_index) + "_batch"](
+                states, parameters, conditions
+            )
+            solution, _ = solve_ode(
+                self.functions["gradient_batch"],
+                self.functions["jacobian_batch"],
+                states.ravel(),
+                phase["duration"],
+                args,
+                self.solver,
+                self.solver["output"],
+                bandwidth=number_of_states - 1,
+            )
+            states = np.array(solution[-1, :]).reshape(-1, number_of_states)
+
+        return list(states[:, self.output_index])
+
+    def define_conditions(self, x: List[float], dataID: str) -> np.ndarray:
+        """Defines the inputs for each condition in an experiment
+
+        Each experiment in the model definition is a list of blocks of conditions.
+        In each block, the input given by "vary" takes the values of x[start:stop]
+        (defined by "x": [start, stop], or all of x if not given) and the other
+        inputs take the values given by "inputs" (or 0 if not given).
+
+        Parameters
+        ----------
+        x
+            a list of floats containing the independent variable
+
+        dataID
+            a string defining the dataID
+
+        Returns
+        -------
+        conditions
+            an array defining the inputs of each condition (rows are conditions)
+
+        """
+        conditions = []
+        if dataID in self.definition.get("experiments", {}):
+            for block in self.definition["experiments"][dataID]["conditions"]:
+                inputs = [block.get("inputs", {}).get(label, 0) for label in self.input_labels]
+                start, stop = block.get("x", [0, len(x)])
+                for value in x[start:stop]:
+                    inputs[self.input_labels.index(block["vary"])] = value
+                    conditions.append(list(inputs))
+
+        return np.array(conditions, dtype=float).reshape(-1, len(self.input_labels))
+
+    def solve_experiment(self, x: List[float], dataID: str, parameter_labels: List[str]) -> list:
+        """Solves the model for each condition in an experiment.
+
+        Parameters
+        ----------
+        x
+            a list of floats containing the independent variable
+
+        dataID
+            a string defining the dataID
+
+        parameter_labels
+            a list of strings defining the parameter labels
+
+        Returns
+        -------
+        solutions
+            A list of floats containing the value of the output species
+            at the final timepoint for each condition
+
+        """
+        conditions = self.define_conditions(x, dataID)
+        return self.solve_experiment_conditions(
+            x, dataID, parameter_labels, list(range(len(conditions)))
+        )
+
+    def solve_experiment_conditions(
+        self, x: List[float], dataID: str, parameter_labels: List[str], indices: List[int]
+    ) -> list:
+        """Solves the model for the conditions of an experiment with the given indices
+        (used to solve an experiment in stages)
+
+        Parameters
+        ----------
+        x
+            a list of floats containing the independent variable
+
+        dataID
+            a string defining the dataID
+
+        parameter_labels
+            a list of strings defining the parameter labels
+
+        indices
+            a list of ints defining the indices of the conditions (datapoints) to solve
+
+        Returns
+        -------
+        solutions
+            A list of floats containing the value of the output species
+            at the final timepoint for each of the given conditions
+
+        """
+        conditions = self.define_conditions(x, dataID)[indices]
+        if self.solve_mode == "batch":
+            return self.solve_batch(conditions)
+
+        solutions = []
+        for inputs in conditions:
+            self.inputs = inputs
+            solution, _ = self.solve_single(self.solver["output"])
+            solutions.append(solution[-1, self.output_index])
+
+        return solutions
+
+    def normalize_data(self, solutions_raw: List[float], dataID: str) -> List[float]:
+        """Normalizes data by the maximum value of each normalization group
+        (defined by "normalization_groups": [[start, stop], ...] in the experiment,
+        or all data if not given), if "normalization" is "max"
+
+        Parameters
+        ----------
+        solutions_raw
+            a list of floats defining the solutions before normalization
+
+        dataID
+            a string defining the dataID
+
+        Returns
+        -------
+        solutions_norm
+            a list of floats defining the dependent variable for the given
+            dataset (after normalization)
+
+        """
+        experiment = self.definition["experiments"][dataID]
+        if experiment.get("normalization", "max") != "max":
+            return list(solutions_raw)
+
+        solutions_norm = []
+        for start, stop in experiment.get("normalization_groups", [[0, len(solutions_raw)]]):
+            group = solutions_raw[start:stop]
+            solutions_norm += [i / max(group) for i in group]
+
+        return solutions_norm
+
+    def define_normalization_groups(
+        self, dataID: str, num_datapoints: int
+    ) -> Optional[List[List[int]]]:
+        """Defines the datapoints that are normalized together by normalize_data()
+
+        Parameters
+        ----------
+        dataID
+            a string defining the dataID
+
+        num_datapoints
+            an int defining the number of datapoints
+
+        Returns
+        -------
+        normalization_groups
+            a list of lists defining the start and stop index of each group of datapoints
+            normalized by their maximum value, or None if the data are not normalized
+
+        """
+        experiment = self.definition["experiments"][dataID]
+        if experiment.get("normalization", "max") != "max":
+            return None
+
+        return experiment.get("normalization_groups", [[0, num_datapoints]])
+
+    def plot_training_data(
+        self,
+        x: List[float],
+        solutions_norm: List[float],
+        exp_data: List[float],
+        exp_error: List[float],
+        filename: str,
+        run_type: str,
+        context: str,
+        dataID: str,
+    ) -> None:
+        """
+        Plots training data and simulated training data for a single parameter set
+
+        Parameters
+        ----------
+        x
+            a list of floats defining the independent variable
+
+        solutions_norm
+            a list of floats defining the simulated dependent variable
+
+        exp_data
+            a list of floats defining the experimental dependent variable
+
+        exp_error
+            a list of floats defining the experimental error for the dependent variable
+
+        filename
+            a string defining the filename used to save the plot
+
+        run_type
+            a string containing the data type ('PEM evaluation' or else)
+
+        context
+            a string defining the absolute path to src/games
+
+        dataID
+            a string defining the data identity
+
+        Returns
+        -------
+        None
+        """
+        # define plot settings
+        experiment = self.definition["experiments"][dataID]
+        x_label = experiment.get("x_label", "x")
+        x_scale = experiment.get("x_scale", "linear")
+        y_label = experiment.get("y_label", self.definition["species"][self.definition["output"]])
+
+        if run_type == "PEM evaluation":
+            plot_color = "dimgrey"
+            marker_type = "^"
+        else:
+            plot_color = "black"
+            marker_type = "o"
+
+        plot_settings = x_label, y_label, x_scale, plot_color, marker_type
+
+        # make plot
+        plot_training_data_2d(
+            x, solutions_norm, exp_data, exp_error, filename, plot_settings, context
+        )
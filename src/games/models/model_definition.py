@@ -0,0 +1,637 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:12:40 2026
+
+Declarative model definitions. A model definition (JSON, or YAML if PyYAML is installed)
+lists the species, parameters, inputs, constants, reactions with their rate laws, the
+dosing protocol and the experiments. The definition is compiled into Python source for
+the gradient, the analytic Jacobian and vectorized versions of both that solve all
+conditions of an experiment at once. See games/models/definitions/ for examples.
+"""
+import ast
+import functools
+import json
+import math
+from typing import Any, Callable, Dict, List, Set, Union
+import numpy as np
+from games.models.compiled import NUMBA_AVAILABLE, njit
+
+RESERVED_NAMES = {
+    "y",
+    "t",
+    "parameters",
+    "inputs",
+    "states",
+    "dydt",
+    "jacobian",
+    "np",
+    "math",
+    "exp",
+    "log",
+    "sqrt",
+    "i",
+    "j",
+}
+FUNCTIONS = ("exp", "log", "sqrt")
+
+
+def load_model_definition(path: str) -> dict:
+    """Loads a model definition from a JSON or YAML file
+
+    Parameters
+    ----------
+    path
+        a string defining the path to the model definition file
+
+    Returns
+    -------
+    definition
+        a dictionary defining the model
+
+    """
+    with open(path, encoding="utf-8") as file:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml  # pylint: disable=import-outside-toplevel
+            except ImportError as error:
+                raise ImportError(
+                    "YAML model definitions require PyYAML (pip install pyyaml)"
+                ) from error
+            definition = yaml.safe_load(file)
+        else:
+            definition = json.load(file)
+
+    check_model_definition(definition)
+
+    return definition
+
+
+def check_model_definition(definition: dict) -> None:
+    """Checks that a model definition is complete, that all names are valid and that the
+    rate laws, expressions and protocol only use names defined in the model
+
+    Parameters
+    ----------
+    definition
+        a dictionary defining the model
+
+    Returns
+    -------
+    None
+
+    """
+    for key in ["modelID", "species", "parameters", "reactions", "protocol", "output"]:
+        if key not in definition:
+            raise ValueError("Model definition is missing " + key)
+
+    names = (
+        list(definition["species"])
+        + list(definition["parameters"])
+        + list(definition.get("inputs", []))
+        + list(definition.get("constants", {}))
+        + list(definition.get("expressions", {}))
+    )
+    for name in names:
+        if not name.isidentifier() or name in RESERVED_NAMES or name.startswith("rate_"):
+            raise ValueError("Invalid name in model definition: " + name)
+    if len(set(names)) != len(names):
+        raise ValueError("Names in model definition must be unique")
+
+    for reaction in definition["reactions"]:
+        for species in list(reaction.get("reactants", {})) + list(reaction.get("products", {})):
+            if species not in definition["species"]:
+                raise ValueError("Unknown species in reaction: " + species)
+    for phase in definition["protocol"]:
+        for species in phase.get("set", {}):
+            if species not in definition["species"]:
+                raise ValueError("Unknown species in protocol: " + species)
+    if definition["output"] not in definition["species"]:
+        raise ValueError("Unknown output species: " + definition["output"])
+
+    # expressions are defined in order, so each one can only use the expressions before it
+    known_names = set(names) - set(definition.get("expressions", {}))
+    for name, expression in definition.get("expressions", {}).items():
+        check_expression_names(expression, known_names, "expression " + name)
+        known_names.add(name)
+    for index, reaction in enumerate(definition["reactions"]):
+        description = "reaction " + str(reaction.get("name", index))
+        if "rate" not in reaction:
+            raise ValueError("Model definition is missing the rate of " + description)
+        check_expression_names(reaction["rate"], known_names, description)
+    for index, phase in enumerate(definition["protocol"]):
+        for expression in phase.get("set", {}).values():
+            check_expression_names(
+                expression, known_names, "protocol phase " + str(phase.get("name", index))
+            )
+
+
+def check_expression_names(
+    expression: Union[str, float], known_names: Set[str], description: str
+) -> None:
+    """Checks that an expression is valid and only uses known names or functions
+
+    Parameters
+    ----------
+    expression
+        a string (or number) defining the expression
+
+    known_names
+        a set of strings defining the names that the expression can use
+
+    description
+        a string describing where the expression is used (for the error message)
+
+    Returns
+    -------
+    None
+
+    """
+    try:
+        node = parse_expression(expression)
+    except SyntaxError as error:
+        raise ValueError("Invalid expression in " + description + ": " + str(expression)) from error
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and child.id not in known_names | set(FUNCTIONS):
+            raise ValueError("Unknown name in " + description + ": " + child.id)
+
+
+def is_number(node: ast.AST, value: float = None) -> bool:
+    """Checks whether an expression node is a number (equal to value, if given)"""
+    if not isinstance(node, ast.Constant) or not isinstance(node.value, (int, float)):
+        return False
+    return value is None or node.value == value
+
+
+def add(a: ast.AST, b: ast.AST) -> ast.AST:
+    """Defines a + b, simplifying additions of zero"""
+    if is_number(a, 0):
+        return b
+    if is_number(b, 0):
+        return a
+    return ast.BinOp(a, ast.Add(), b)
+
+
+def subtract(a: ast.AST, b: ast.AST) -> ast.AST:
+    """Defines a - b, simplifying subtractions of and from zero"""
+    if is_number(b, 0):
+        return a
+    if is_number(a, 0):
+        return negate(b)
+    return ast.BinOp(a, ast.Sub(), b)
+
+
+def multiply(a: ast.AST, b: ast.AST) -> ast.AST:
+    """Defines a * b, simplifying multiplications by zero and one"""
+    if is_number(a, 0) or is_number(b, 0):
+        return ast.Constant(0)
+    if is_number(a, 1):
+        return b
+    if is_number(b, 1):
+        return a
+    return ast.BinOp(a, ast.Mult(), b)
+
+
+def divide(a: ast.AST, b: ast.AST) -> ast.AST:
+    """Defines a / b, simplifying divisions of zero and by one"""
+    if is_number(a, 0):
+        return ast.Constant(0)
+    if is_number(b, 1):
+        return a
+    return ast.BinOp(a, ast.Div(), b)
+
+
+def negate(a: ast.AST) -> ast.AST:
+    """Defines -a, simplifying negations of zero"""
+    if is_number(a, 0):
+        return a
+    return ast.UnaryOp(ast.USub(), a)
+
+
+def call(function: str, argument: ast.AST) -> ast.AST:
+    """Defines function(argument)"""
+    return ast.Call(ast.Name(function, ast.Load()), [argument], [])
+
+
+def depends_on(node: ast.AST, name: str) -> bool:
+    """Checks whether an expression node contains the variable name"""
+    return any(isinstance(child, ast.Name) and child.id == name for child in ast.walk(node))
+
+
+def parse_expression(expression: Union[str, float]) -> ast.AST:
+    """Parses a rate law or expression into an expression node"""
+    return ast.parse(str(expression), mode="eval").body
+
+
+def substitute(node: ast.AST, substitutions: Dict[str, ast.AST]) -> ast.AST:
+    """Replaces the variables in substitutions by their expressions"""
+    if isinstance(node, ast.Name) and node.id in substitutions:
+        return substitutions[node.id]
+    if isinstance(node, ast.BinOp):
+        return ast.BinOp(
+            substitute(node.left, substitutions), node.op, substitute(node.right, substitutions)
+        )
+    if isinstance(node, ast.UnaryOp):
+        return ast.UnaryOp(node.op, substitute(node.operand, substitutions))
+    if isinstance(node, ast.Call):
+        return ast.Call(node.func, [substitute(arg, substitutions) for arg in node.args], [])
+    return node
+
+
+def differentiate(node: ast.AST, name: str) -> ast.AST:
+    """Differentiates an expression node with respect to the variable name
+
+    Parameters
+    ----------
+    node
+        an expression node built from numbers, variables, +, -, *, /, ** and
+        the functions exp, log and sqrt
+
+    name
+        a string defining the variable
+
+    Returns
+    -------
+    derivative
+        an expression node defining the derivative
+
+    """
+    if not depends_on(node, name):
+        return ast.Constant(0)
+
+    if isinstance(node, ast.Name):
+        return ast.Constant(1)
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        derivative = differentiate(node.operand, name)
+        return negate(derivative) if isinstance(node.op, ast.USub) else derivative
+
+    if isinstance(node, ast.BinOp):
+        a, b = node.left, node.right
+        da, db = differentiate(a, name), differentiate(b, name)
+        if isinstance(node.op, ast.Add):
+            return add(da, db)
+        if isinstance(node.op, ast.Sub):
+            return subtract(da, db)
+        if isinstance(node.op, ast.Mult):
+            return add(multiply(da, b), multiply(a, db))
+        if isinstance(node.op, ast.Div):
+            return subtract(
+                divide(da, b), divide(multiply(a, db), ast.BinOp(b, ast.Pow(), ast.Constant(2)))
+            )
+        if isinstance(node.op, ast.Pow):
+            if not depends_on(b, name):
+                # d(a ** b) = b * a ** (b - 1) * da
+                return multiply(
+                    multiply(b, ast.BinOp(a, ast.Pow(), subtract(b, ast.Constant(1)))), da
+                )
+            # d(a ** b) = a ** b * (db * log(a) + b * da / a)
+            return multiply(node, add(multiply(db, call("log", a)), divide(multiply(b, da), a)))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and len(node.args) == 1:
+        argument = node.args[0]
+        derivative = differentiate(argument, name)
+        if node.func.id == "exp":
+            return multiply(node, derivative)
+        if node.func.id == "log":
+            return divide(derivative, argument)
+        if node.func.id == "sqrt":
+            return divide(derivative, multiply(ast.Constant(2), node))
+
+    raise ValueError("Cannot differentiate expression: " + to_source(node))
+
+
+def to_source(node: ast.AST) -> str:
+    """Converts an expression node to Python source (fully parenthesized)"""
+    operators = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.Pow: "**"}
+    if isinstance(node, ast.Constant):
+        return repr(node.value)
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.UnaryOp):
+        return ("-" if isinstance(node.op, ast.USub) else "+") + "(" + to_source(node.operand) + ")"
+    if isinstance(node, ast.BinOp) and type(node.op) in operators:
+        return (
+            "("
+            + to_source(node.left)
+            + " "
+            + operators[type(node.op)]
+            + " "
+            + to_source(node.right)
+            + ")"
+        )
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS:
+        return node.func.id + "(" + ", ".join(to_source(arg) for arg in node.args) + ")"
+
+    raise ValueError("Unsupported expression in model definition: " + ast.dump(node))
+
+
+def define_stoichiometry(definition: dict) -> np.ndarray:
+    """Defines the stoichiometry matrix (rows are species and columns are reactions)
+
+    Parameters
+    ----------
+    definition
+        a dictionary defining the model
+
+    Returns
+    -------
+    stoichiometry
+        an array defining the net change in each species for each reaction
+
+    """
+    species = list(definition["species"])
+    stoichiometry = np.zeros((len(species), len(definition["reactions"])))
+    for j, reaction in enumerate(definition["reactions"]):
+        for name, coefficient in reaction.get("reactants", {}).items():
+            stoichiometry[species.index(name), j] -= coefficient
+        for name, coefficient in reaction.get("products", {}).items():
+            stoichiometry[species.index(name), j] += coefficient
+
+    return stoichiometry
+
+
+def define_rate_laws(definition: dict) -> List[ast.AST]:
+    """Defines the rate law of each reaction with all expressions substituted, so
+    that the rate laws only depend on species, parameters, inputs and constants
+
+    Parameters
+    ----------
+    definition
+        a dictionary defining the model
+
+    Returns
+    -------
+    rate_laws
+        a list of expression nodes defining the rate law of each reaction
+
+    """
+    substitutions = {}
+    for name, expression in definition.get("expressions", {}).items():
+        substitutions[name] = substitute(parse_expression(expression), substitutions)
+
+    return [
+        substitute(parse_expression(reaction["rate"]), substitutions)
+        for reaction in definition["reactions"]
+    ]
+
+
+def combine_terms(coefficients: np.ndarray, terms: List[str]) -> str:
+    """Defines the sum of terms multiplied by coefficients (terms with a coefficient of 0
+    are left out)"""
+    source = ""
+    for coefficient, term in zip(coefficients, terms):
+        if coefficient == 0:
+            continue
+        if coefficient == 1:
+            source += " + " + term
+        elif coefficient == -1:
+            source += " - " + term
+        else:
+            source += " + " + repr(float(coefficient)) + " * " + term
+    if source == "":
+        return "0.0"
+    if source.startswith(" + "):
+        return source[3:]
+    return "-" + source[3:]
+
+
+def generate_unpacking(definition: dict, batch: bool) -> List[str]:
+    """Defines the source lines that unpack the species, parameters, inputs, constants
+    and expressions into local variables"""
+    lines = []
+    for i, name in enumerate(definition["species"]):
+        lines.append(name + (" = states[:, " if batch else " = y[") + str(i) + "]")
+    for i, name in enumerate(definition["parameters"]):
+        lines.append(name + " = parameters[" + str(i) + "]")
+    for i, name in enumerate(definition.get("inputs", [])):
+        lines.append(name + (" = inputs[:, " if batch else " = inputs[") + str(i) + "]")
+    for name, value in definition.get("constants", {}).items():
+        lines.append(name + " = " + repr(float(value)))
+    for name, expression in definition.get("expressions", {}).items():
+        lines.append(name + " = " + to_source(parse_expression(expression)))
+
+    return lines
+
+
+def generate_model_source(definition: dict) -> str:
+    """Generates the Python source of the model functions:
+    gradient(y, t, parameters, inputs) and jacobian(y, t, parameters, inputs) for a single
+    condition, gradient_batch and jacobian_batch (banded) for a flattened array of the states
+    of all conditions, with one row of inputs per condition, and set_phase_<k> and
+    set_phase_<k>_batch which update the states at the start of each phase of the protocol
+
+    Parameters
+    ----------
+    definition
+        a dictionary defining the model
+
+    Returns
+    -------
+    source
+        a string defining the Python source of the model functions
+
+    """
+    species = list(definition["species"])
+    number_of_species = len(species)
+    stoichiometry = define_stoichiometry(definition)
+    rate_laws = define_rate_laws(definition)
+    rate_labels = ["rate_" + str(j) for j in range(len(rate_laws))]
+
+    # derivative of each rate law with respect to each species
+    rate_derivatives = {}
+    for j, rate_law in enumerate(rate_laws):
+        for k, name in enumerate(species):
+            derivative = differentiate(rate_law, name)
+            if not is_number(derivative, 0):
+                rate_derivatives[(j, k)] = to_source(derivative)
+
+    source = []
+    for batch in [False, True]:
+        suffix = "_batch" if batch else ""
+        index = "[:, " if batch else "["
+        unpacking = ["    " + line for line in generate_unpacking(definition, batch)]
+
+        source.append("def gradient" + suffix + "(y, t, parameters, inputs):")
+        if batch:
+            source.append("    states = y.reshape(-1, " + str(number_of_species) + ")")
+        source += unpacking
+        for label, reaction in zip(rate_labels, definition["reactions"]):
+            source.append("    " + label + " = " + to_source(parse_expression(reaction["rate"])))
+        source.append(
+            "    dydt = np.empty(" + ("states.shape" if batch else str(number_of_species)) + ")"
+        )
+        for i in range(number_of_species):
+            source.append(
+                "    dydt" + index + str(i) + "] = " + combine_terms(stoichiometry[i], rate_labels)
+            )
+        source.append("    return dydt" + (".ravel()" if batch else ""))
+        source.append("")
+
+        source.append("def jacobian" + suffix + "(y, t, parameters, inputs):")
+        if batch:
+            source.append("    states = y.reshape(-1, " + str(number_of_species) + ")")
+            source.append(
+                "    jacobian = np.zeros((" + str(2 * number_of_species - 1) + ", len(y)))"
+            )
+        else:
+            source.append(
+                "    jacobian = np.zeros(("
+                + str(number_of_species)
+                + ", "
+                + str(number_of_species)
+                + "))"
+            )
+        source += unpacking
+        for (j, k), derivative in rate_derivatives.items():
+            source.append("    d_rate_" + str(j) + "_" + str(k) + " = " + derivative)
+        for i in range(number_of_species):
+            for k in range(number_of_species):
+                terms = [
+                    "d_rate_" + str(j) + "_" + str(k) if (j, k) in rate_derivatives else None
+                    for j in range(len(rate_laws))
+                ]
+                coefficients = [
+                    coefficient if term is not None else 0
+                    for coefficient, term in zip(stoichiometry[i], terms)
+                ]
+                if all(coefficient == 0 for coefficient in coefficients):
+                    continue
+                entry = combine_terms(coefficients, [term or "" for term in terms])
+                if batch:
+                    # banded format: element [i, k] is stored in row i - k + bandwidth
+                    row = str(i - k + number_of_species - 1)
+                    source.append(
+                        "    jacobian["
+                        + row
+                        + ", "
+                        + str(k)
+                        + "::"
+                        + str(number_of_species)
+                        + "] = "
+                        + entry
+                    )
+                else:
+                    source.append("    jacobian[" + str(i) + ", " + str(k) + "] = " + entry)
+        # non-finite derivatives (for example of (y / km) ** n at y = 0 with n < 1) are set to 0
+        if batch:
+            source.append("    jacobian[~np.isfinite(jacobian)] = 0")
+        else:
+            source.append("    for i in range(" + str(number_of_species) + "):")
+            source.append("        for j in range(" + str(number_of_species) + "):")
+            source.append("            if not math.isfinite(jacobian[i, j]):")
+            source.append("                jacobian[i, j] = 0")
+        source.append("    return jacobian")
+        source.append("")
+
+        for phase_index, phase in enumerate(definition["protocol"]):
+            source.append(
+                "def set_phase_" + str(phase_index) + suffix + "(states, parameters, inputs):"
+            )
+            if batch:
+                source += unpacking
+            else:
+                source += [line.replace("= y[", "= states[") for line in unpacking]
+            for name, expression in phase.get("set", {}).items():
+                source.append(
+                    "    states"
+                    + index
+                    + str(species.index(name))
+                    + "] = "
+                    + to_source(parse_expression(expression))
+                )
+            source.append("    return states")
+            source.append("")
+
+    return "\n".join(source)
+
+
+def ignore_floating_point_errors(function: Callable) -> Callable:
+    """Wraps a vectorized model function so that numpy does not warn about the
+    non-finite values that it handles itself"""
+
+    def wrapped_function(*args: Any) -> Any:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return function(*args)
+
+    return wrapped_function
+
+
+def compile_model_functions(definition: dict, model_backend: str = "python") -> Dict[str, Callable]:
+    """Compiles the model functions generated by generate_model_source()
+
+    Parameters
+    ----------
+    definition
+        a dictionary defining the model
+
+    model_backend
+        a string defining whether the single condition functions are compiled
+        with numba ("numba") or not ("python")
+
+    Returns
+    -------
+    functions
+        a dictionary of the compiled model functions
+
+    """
+    if model_backend == "numba" and not NUMBA_AVAILABLE:
+        raise ImportError(
+            'model_backend = "numba" requires numba to be installed (pip install numba)'
+        )
+
+    return compile_model_source(
+        generate_model_source(definition),
+        definition["modelID"],
+        len(definition["protocol"]),
+        model_backend,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def compile_model_source(
+    source: str, modelID: str, number_of_phases: int, model_backend: str
+) -> Dict[str, Callable]:
+    """Compiles the source generated by generate_model_source(). Compiled functions are
+    stored, so each model is only compiled once per process (for example when
+    models are unpickled in worker processes).
+
+    Parameters
+    ----------
+    source
+        a string defining the Python source of the model functions
+
+    modelID
+        a string defining the model name
+
+    number_of_phases
+        an integer defining the number of phases in the protocol
+
+    model_backend
+        a string defining whether the single condition functions are compiled
+        with numba ("numba") or not ("python")
+
+    Returns
+    -------
+    functions
+        a dictionary of the compiled model functions
+
+    """
+    namespace_single = {"np": np, "math": math, "exp": math.exp, "log": math.log, "sqrt": math.sqrt}
+    namespace_batch = {"np": np, "math": math, "exp": np.exp, "log": np.log, "sqrt": np.sqrt}
+    code = compile(source, "<model definition " + modelID + ">", "exec")
+    exec(code, namespace_single)  # pylint: disable=exec-used
+    exec(code, namespace_batch)  # pylint: disable=exec-used
+
+    names = ["gradient", "jacobian"] + [
+        "set_phase_" + str(phase_index) for phase_index in range(number_of_phases)
+    ]
+    functions = {"source": source}
+    for name in names:
+        functions[name] = namespace_single[name]
+        if model_backend == "numba":
+            functions[name] = njit()(functions[name])
+        functions[name + "_batch"] = namespace_batch[name + "_batch"]
+    functions["jacobian_batch"] = ignore_floating_point_errors(functions["jacobian_batch"])
+
+    return functions
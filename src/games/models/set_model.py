@@ -5,18 +5,22 @@ Created on Fri Jun  3 14:57:05 2022
 
 @author: kate
 """
-import json
+import os
+from typing import Any
+from games.models.defined_model import DefinedModel
 from games.models.synTF import synTF
 from games.models.synTF_chem import synTF_chem
 
 
-def set_model():
+def set_model(settings: dict) -> Any:
     """
-    Defines the model class to use depending on the modelID defined in Settings
+    Defines the model class to use depending on the modelID defined in Settings,
+    or builds the model from the model definition file defined in Settings
 
     Parameters
     ----------
-    None
+    settings
+        a dictionary of run settings
 
     Returns
     -------
@@ -25,17 +29,40 @@ def set_model():
 
     """
 
-    if settings["modelID"] == "synTF_chem":
+    if "solve_mode" not in settings:
+        settings["solve_mode"] = "default"
+
+    if "model_backend" not in settings:
+        settings["model_backend"] = "python"
+
+    if "solver" not in settings:
+        settings["solver"] = {}
+
+    if "model_definition" in settings:
+        # relative paths are relative to settings["context"]
+        given_model = DefinedModel(
+            os.path.join(settings["context"], settings["model_definition"]),
+            parameters=settings["parameters"],
+            model_backend=settings["model_backend"],
+            solver=settings["solver"],
+            solve_mode=settings["solve_mode"],
+        )
+
+    elif settings["modelID"] == "synTF_chem":
         given_model = synTF_chem(
-            parameters=settings["parameters"], mechanismID=settings["mechanismID"]
+            parameters=settings["parameters"],
+            mechanismID=settings["mechanismID"],
+            solve_mode=settings["solve_mode"],
+            model_backend=settings["model_backend"],
+            solver=settings["solver"],
         )
 
     elif settings["modelID"] == "synTF":
-        given_model = synTF(parameters=settings["parameters"])
+        given_model = synTF(
+            parameters=settings["parameters"],
+            model_backend=settings["model_backend"],
+            solver=settings["solver"],
+            solve_mode=settings["solve_mode"],
+        )
 
     return given_model
-
-
-file = open("/Users/kdreyer/Documents/Github/GAMES/src/games/config/config.json", encoding="utf-8")
-settings = json.load(file)
-model = set_model()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:03:17 2026
+
+Integrator layer shared by the model classes. The solver is selected with
+settings["solver"], for example {"method": "LSODA", "rtol": 1e-6, "output": "final"}.
+"""
+import warnings
+from typing import Callable, Optional, Tuple
+import numpy as np
+from scipy.integrate import odeint, solve_ivp
+from scipy.sparse import dia_matrix
+
+SOLVER_DEFAULTS = {
+    "odeint": {"rtol": 1.49012e-8, "atol": 1.49012e-8, "mxstep": 5000},
+    "LSODA": {"rtol": 1e-6, "atol": 1e-9},
+    "Radau": {"rtol": 1e-6, "atol": 1e-9},
+    "BDF": {"rtol": 1e-6, "atol": 1e-9},
+    "rk4": {"step_size": 0.1, "rtol": 1e-6, "atol": 1e-9},
+}
+
+
+def define_solver(solver: Optional[dict] = None) -> dict:
+    """Defines the solver settings, filling in the default values for any
+    setting that is not given
+
+    Parameters
+    ----------
+    solver
+        a dictionary of solver settings ("method", "output", "timesteps" and
+        the method-specific settings in SOLVER_DEFAULTS), or None to use the defaults
+
+    Returns
+    -------
+    solver
+        a dictionary containing all solver settings
+
+    """
+    if solver is None:
+        solver = {}
+    method = solver.get("method", "odeint")
+    if method not in SOLVER_DEFAULTS:
+        raise ValueError(
+            "Unknown solver method "
+            + str(method)
+            + ". Must be one of: "
+            + ", ".join(SOLVER_DEFAULTS.keys())
+        )
+
+    solver_all = {"method": method, "output": "final", "timesteps": 100}
+    solver_all.update(SOLVER_DEFAULTS[method])
+    solver_all.update(solver)
+
+    return solver_all
+
+
+def define_timepoints(end_time: float, solver: dict, output: str) -> np.ndarray:
+    """Defines the timepoints at which the ODE solution is returned
+
+    Parameters
+    ----------
+    end_time
+        a float defining the final time
+
+    solver
+        a dictionary of solver settings (defined by define_solver())
+
+    output
+        a string defining the output mode ("dense" returns solver["timesteps"]
+        evenly spaced timepoints, "final" returns only the initial and final timepoints)
+
+    Returns
+    -------
+    t
+        a 1D array of time values
+
+    """
+    if output == "dense":
+        return np.linspace(0, end_time, solver["timesteps"])
+
+    return np.array([0, end_time], dtype=float)
+
+
+def solve_ode(
+    gradient: Callable,
+    jacobian: Optional[Callable],
+    initial_conditions: np.ndarray,
+    end_time: float,
+    args: tuple,
+    solver: dict,
+    output: str = "dense",
+    bandwidth: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Solves an ODE system with the solver defined in solver["method"]
+
+    Parameters
+    ----------
+    gradient
+        a function defining the gradient with signature gradient(y, t, *args)
+
+    jacobian
+        a function defining the Jacobian of the gradient with signature
+        jacobian(y, t, *args), or None to approximate the Jacobian
+
+    initial_conditions
+        an array defining the initial conditions
+
+    end_time
+        a float defining the final time (the initial time is 0)
+
+    args
+        a tuple defining the extra arguments passed to gradient and jacobian
+
+    solver
+        a dictionary of solver settings (defined by define_solver())
+
+    output
+        a string defining the output mode ("dense" or "final")
+
+    bandwidth
+        an integer defining the number of sub- and super-diagonals of a banded
+        Jacobian (if given, jacobian returns the Jacobian in the banded format
+        used by ODEint), or None if the Jacobian is not banded
+
+    Returns
+    -------
+    solution
+        An array of ODE solutions (rows are timepoints and columns are model states)
+
+    t
+        A 1D array of time values corresponding to the rows in solution
+
+    """
+    t = define_timepoints(end_time, solver, output)
+    method = solver["method"]
+
+    if method == "odeint":
+        solution = odeint(
+            gradient,
+            initial_conditions,
+            t,
+            args=args,
+            Dfun=jacobian,
+            ml=bandwidth,
+            mu=bandwidth,
+            rtol=solver["rtol"],
+            atol=solver["atol"],
+            mxstep=solver["mxstep"],
+        )
+
+    elif method == "rk4":
+        solution = solve_rk4(
+            gradient,
+            initial_conditions,
+            t,
+            args,
+            solver["step_size"],
+            solver["rtol"],
+            solver["atol"],
+        )
+
+    else:
+        solution = solve_scipy_ivp(
+            gradient, jacobian, initial_conditions, t, args, solver, bandwidth
+        )
+
+    return solution, t
+
+
+def solve_scipy_ivp(
+    gradient: Callable,
+    jacobian: Optional[Callable],
+    initial_conditions: np.ndarray,
+    t: np.ndarray,
+    args: tuple,
+    solver: dict,
+    bandwidth: Optional[int],
+) -> np.ndarray:
+    """Solves an ODE system with scipy.integrate.solve_ivp
+
+    Parameters
+    ----------
+    gradient
+        a function defining the gradient with signature gradient(y, t, *args)
+
+    jacobian
+        a function defining the Jacobian of the gradient with signature
+        jacobian(y, t, *args), or None to approximate the Jacobian
+
+    initial_conditions
+        an array defining the initial conditions
+
+    t
+        a 1D array of time values at which the solution is returned
+
+    args
+        a tuple defining the extra arguments passed to gradient and jacobian
+
+    solver
+        a dictionary of solver settings (defined by define_solver())
+
+    bandwidth
+        an integer defining the number of sub- and super-diagonals of a banded
+        Jacobian, or None if the Jacobian is not banded
+
+    Returns
+    -------
+    solution
+        An array of ODE solutions (rows are timepoints and columns are model states).
+        Timepoints that were not reached because the solver failed are set to NaN.
+
+    """
+    method = solver["method"]
+    options = {}
+    if jacobian is not None:
+        if bandwidth is None:
+            options["jac"] = lambda time, y: jacobian(y, time, *args)
+        elif method == "LSODA":
+            # LSODA expects bandwidth additional rows of zeros below the banded Jacobian
+            padding = np.zeros((bandwidth, len(initial_conditions)))
+            options["jac"] = lambda time, y: np.vstack((jacobian(y, time, *args), padding))
+        else:
+            # Radau and BDF do not accept the banded format, but accept sparse matrices
+            offsets = bandwidth - np.arange(2 * bandwidth + 1)
+            size = len(initial_conditions)
+            options["jac"] = lambda time, y: dia_matrix(
+                (jacobian(y, time, *args), offsets), shape=(size, size)
+            ).tocsc()
+    if bandwidth is not None and method == "LSODA":
+        options["lband"] = bandwidth
+        options["uband"] = bandwidth
+
+    result = solve_ivp(
+        lambda time, y: gradient(y, time, *args),
+        (t[0], t[-1]),
+        initial_conditions,
+        method=method,
+        t_eval=t,
+        rtol=solver["rtol"],
+        atol=solver["atol"],
+        **options,
+    )
+
+    solution = np.full((len(t), len(initial_conditions)), np.nan)
+    solution[: result.y.shape[1]] = result.y.T
+
+    return solution
+
+
+def rk4_step(
+    gradient: Callable,
+    y: np.ndarray,
+    time: float,
+    h: float,
+    args: tuple,
+    k1: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Takes a single step of the classical 4th order Runge-Kutta method
+
+    Parameters
+    ----------
+    gradient
+        a function defining the gradient with signature gradient(y, t, *args)
+
+    y
+        an array defining the state at the start of the step
+
+    time
+        a float defining the time at the start of the step
+
+    h
+        a float defining the step size
+
+    args
+        a tuple defining the extra arguments passed to gradient
+
+    k1
+        an array defining the gradient at the start of the step, or None to calculate it
+
+    Returns
+    -------
+    y
+        an array defining the state at the end of the step
+
+    """
+    if k1 is None:
+        k1 = gradient(y, time, *args)
+    k2 = gradient(y + h / 2 * k1, time + h / 2, *args)
+    k3 = gradient(y + h / 2 * k2, time + h / 2, *args)
+    k4 = gradient(y + h * k3, time + h, *args)
+    return y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def solve_rk4(
+    gradient: Callable,
+    initial_conditions: np.ndarray,
+    t: np.ndarray,
+    args: tuple,
+    step_size: float,
+    rtol: float,
+    atol: float,
+) -> np.ndarray:
+    """Solves an ODE system with the classical 4th order Runge-Kutta method with step size
+    control (suitable for non-stiff parameter regimes, stiff regimes need many small steps)
+
+    The error of each step is estimated by comparing it with two steps of half the size
+    (step doubling). Steps with an error above the tolerances, or with states that are
+    not finite, are repeated with a smaller step size, so unstable steps that make the
+    states explode are rejected instead of returned.
+
+    Parameters
+    ----------
+    gradient
+        a function defining the gradient with signature gradient(y, t, *args)
+
+    initial_conditions
+        an array defining the initial conditions
+
+    t
+        a 1D array of time values at which the solution is returned
+
+    args
+        a tuple defining the extra arguments passed to gradient
+
+    step_size
+        a float defining the initial and maximum step size
+
+    rtol
+        a float defining the relative tolerance for the error of each step
+
+    atol
+        a float defining the absolute tolerance for the error of each step
+
+    Returns
+    -------
+    solution
+        An array of ODE solutions (rows are timepoints and columns are model states).
+        Timepoints that were not reached because the step size fell below
+        1e-12 * (t[-1] - t[0]) are set to NaN (with a RuntimeWarning).
+
+    """
+    solution = np.full((len(t), len(initial_conditions)), np.nan)
+    y = np.array(initial_conditions, dtype=float)
+    solution[0] = y
+    h = step_size
+    min_step = 1e-12 * max(1.0, t[-1] - t[0])
+    for i in range(1, len(t)):
+        time = t[i - 1]
+        while time < t[i]:
+            h_step = min(h, t[i] - time)
+            k1 = gradient(y, time, *args)
+            y_full = rk4_step(gradient, y, time, h_step, args, k1)
+            y_half = rk4_step(gradient, y, time, h_step / 2, args, k1)
+            y_two = rk4_step(gradient, y_half, time + h_step / 2, h_step / 2, args)
+
+            # the difference between one step and two half steps is 15 times the error
+            # of the two half steps (4th order method)
+            scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_two))
+            error = np.max(np.abs(y_two - y_full) / (15 * scale))
+            if not np.isfinite(error):
+                h = h_step / 4
+            else:
+                if error <= 1:
+                    time = t[i] if h_step == t[i] - time else time + h_step
+                    y = y_two
+                h = min(step_size, h_step * min(4.0, max(0.2, 0.9 * max(error, 1e-10) ** -0.2)))
+
+            if h < min_step:
+                warnings.warn(
+                    "rk4 step size fell below "
+                    + str(min_step)
+                    + " at t = "
+                    + str(time)
+                    + " (the states are not finite or diverging, or the system is too stiff"
+                    + " for rk4), so the remaining timepoints are set to NaN",
+                    RuntimeWarning,
+                )
+                return solution
+        solution[i] = y
+
+    return solution
@@ -5,9 +5,10 @@ Created on Thu Jun 16 09:11:29 2022
 
 @author: kate
 """
-from typing import Tuple, List
+from typing import Callable, Tuple, List
 import numpy as np
-from scipy.integrate import odeint
+from games.models.compiled import get_compiled_kernels
+from games.models.solvers import define_solver, solve_ode
 from games.plots.plots_training_data import plot_training_data_2d
 
 
@@ -17,7 +18,14 @@ class synTF:
 
     """
 
-    def __init__(self, parameters: List[float] = None, inputs: List[float] = None) -> None:
+    def __init__(
+        self,
+        parameters: List[float] = None,
+        inputs: List[float] = None,
+        model_backend: str = "python",
+        solver: dict = None,
+        solve_mode: str = "default",
+    ) -> None:
         """Initializes synTF model.
 
         Parameters
@@ -28,6 +36,20 @@ class synTF:
         inputs
             List of floats defining the inputs
 
+        model_backend
+            a string defining how the gradient is evaluated ("python" uses
+            gradient(), "numba" uses the compiled gradient and analytic
+            Jacobian kernels in games.models.compiled)
+
+        solver
+            a dictionary of solver settings (see games.models.solvers.define_solver),
+            or None to use the default solver
+
+        solve_mode
+            a string defining how solve_experiment() solves the model ("default"
+            integrates the ODEs, "semi-analytic" uses the closed-form solution for
+            the synTF states and quadrature for the reporter states)
+
         Returns
         -------
         None
@@ -36,17 +58,74 @@ class synTF:
         self.state_labels = ["ZFa mRNA", "ZFa protein", "Rep RNA", "Rep protein"]
         self.parameters = parameters
         self.inputs = inputs
+        self.model_backend = model_backend
+        self.solver = define_solver(solver)
+        self.solve_mode = solve_mode
+        self.end_time = 42
+        self.quadrature = self.define_quadrature(self.end_time)
+        self.define_compiled_kernels()
         number_of_states = len(self.state_labels)
         y_init = np.zeros(number_of_states)
         self.initial_conditions = y_init
 
-    def solve_single(self) -> Tuple[np.ndarray, np.ndarray]:
-        """Solves synTF model for a single set of parameters and inputs
+    def define_compiled_kernels(self) -> None:
+        """Defines the compiled kernels used by the numba model backend
 
         Parameters
         ----------
         None
 
+        Returns
+        -------
+        None
+
+        """
+        if self.model_backend == "numba":
+            self.compiled_kernels = get_compiled_kernels("synTF")
+            self.compiled_kernels_sensitivity = get_compiled_kernels("synTF sensitivity")
+
+    def with_parameters(self, parameters: List[float]) -> "synTF":
+        """Defines a copy of the model with the given parameters. Solving the copy does
+        not change this model, so the same model can be used by several studies, threads
+        or processes at once.
+
+        Parameters
+        ----------
+        parameters
+            a list of floats defining the parameters
+
+        Returns
+        -------
+        model
+            a copy of the model with the given parameters
+
+        """
+        given_model = object.__new__(type(self))
+        given_model.__dict__.update(self.__dict__)
+        given_model.parameters = list(parameters)
+
+        return given_model
+
+    def __getstate__(self) -> dict:
+        # compiled kernels are not pickled, they are defined again when the model is unpickled
+        state = dict(self.__dict__)
+        state.pop("compiled_kernels", None)
+        state.pop("compiled_kernels_sensitivity", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.define_compiled_kernels()
+
+    def solve_single(self, output: str = "dense") -> Tuple[np.ndarray, np.ndarray]:
+        """Solves synTF model for a single set of parameters and inputs
+
+        Parameters
+        ----------
+        output
+            a string defining the output mode ("dense" returns the solution at
+            evenly spaced timepoints, "final" returns only the initial and final states)
+
         Returns
         -------
         solution
@@ -57,22 +136,40 @@ class synTF:
 
         """
 
-        timesteps = 100
-        end_time = 42
-        tspace = np.linspace(0, end_time, timesteps)
-        t = tspace
-        solution = odeint(
-            self.gradient,
-            self.initial_conditions,
-            t,
-            args=(
-                self.parameters,
-                self.inputs,
-            ),
+        gradient, jacobian, args = self.define_ode_functions()
+        solution, t = solve_ode(
+            gradient, jacobian, self.initial_conditions, self.end_time, args, self.solver, output
         )
 
         return solution, t
 
+    def define_ode_functions(self) -> Tuple[Callable, Callable, tuple]:
+        """Defines the gradient, Jacobian and gradient arguments used by the solver
+        for the current parameters and inputs, depending on the model backend
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        gradient
+            the function defining the gradient
+
+        jacobian
+            the function defining the Jacobian of the gradient
+
+        args
+            a tuple defining the extra arguments passed to gradient and jacobian
+
+        """
+        if self.model_backend == "numba":
+            gradient, jacobian = self.compiled_kernels
+            packed_parameters = np.array(list(self.parameters) + list(self.inputs), dtype=float)
+            return gradient, jacobian, (packed_parameters,)
+
+        return self.gradient, self.jacobian, (self.parameters, self.inputs)
+
     @staticmethod
     def gradient(
         y: np.ndarray, t: np.ndarray, parameters: List[float], inputs: List[float]
@@ -122,6 +219,344 @@ class synTF:
 
         return dydt
 
+    @staticmethod
+    def jacobian(
+        y: np.ndarray, t: np.ndarray, parameters: List[float], inputs: List[float]
+    ) -> np.ndarray:
+        """Defines the Jacobian of the gradient for synTF model.
+
+        Parameters
+        ----------
+        y
+            an array defining the model states
+
+        t
+            an array defining the time (necessary parameter to use ODEint to solve gradient)
+
+        parameters
+            List of floats defining the parameters
+
+        inputs
+            List of floats defining the inputs
+
+        Returns
+        -------
+        jacobian
+            An array in which element [i, j] is the derivative of the gradient
+            of state i with respect to state j
+
+        """
+
+        k_txn = 1
+        k_trans = 1
+        kdeg_rna = 2.7
+        kdeg_protein = 0.35
+        kdeg_reporter = 0.029
+
+        [_, m, w] = parameters
+
+        jacobian = np.array(
+            [
+                [-kdeg_rna, 0, 0, 0],  # y0 synTF mRNA
+                [k_trans, -kdeg_protein, 0, 0],  # y1 synTF protein
+                [0, k_txn * m * w / (1 + w * y[1]) ** 2, -kdeg_rna, 0],  # y2 Reporter mRNA
+                [0, 0, k_trans, -kdeg_reporter],  # y3 Reporter protein
+            ]
+        )
+
+        return jacobian
+
+    @staticmethod
+    def parameter_jacobian(
+        y: np.ndarray, t: np.ndarray, parameters: List[float], inputs: List[float]
+    ) -> np.ndarray:
+        """Defines the derivatives of the gradient for synTF model with respect to the
+        parameters.
+
+        Parameters
+        ----------
+        y
+            an array defining the model states
+
+        t
+            an array defining the time (necessary parameter to use ODEint to solve gradient)
+
+        parameters
+            List of floats defining the parameters
+
+        inputs
+            List of floats defining the inputs
+
+        Returns
+        -------
+        parameter_jacobian
+            An array in which element [i, j] is the derivative of the gradient
+            of state i with respect to parameter j
+
+        """
+        k_txn = 1
+        [_, m, w] = parameters
+
+        parameter_jacobian = np.array(
+            [
+                [0, 0, 0],  # y0 synTF mRNA
+                [0, 0, 0],  # y1 synTF protein
+                [
+                    k_txn,
+                    k_txn * w * y[1] / (1 + w * y[1]),
+                    k_txn * m * y[1] / (1 + w * y[1]) ** 2,
+                ],  # y2 Reporter mRNA
+                [0, 0, 0],  # y3 Reporter protein
+            ]
+        )
+
+        return parameter_jacobian
+
+    @staticmethod
+    def gradient_sensitivity(
+        z: np.ndarray, t: np.ndarray, parameters: List[float], inputs: List[float]
+    ) -> np.ndarray:
+        """Defines the gradient for synTF model augmented with the forward
+        sensitivity equations dS/dt = J S + df/dp
+
+        Parameters
+        ----------
+        z
+            a 1D array defining the model states followed by the sensitivities of
+            each model state to each parameter (flattened by row, rows are model states)
+
+        t
+            an array defining the time (necessary parameter to use ODEint to solve gradient)
+
+        parameters
+            List of floats defining the parameters
+
+        inputs
+            List of floats defining the inputs
+
+        Returns
+        -------
+        dzdt
+            a 1D array corresponding to the gradient of each model state and
+            sensitivity at time t
+
+        """
+        y = z[:4]
+        sensitivities = z[4:].reshape(4, -1)
+        dydt = synTF.gradient(y, t, parameters, inputs)
+        dsdt = synTF.jacobian(y, t, parameters, inputs) @ sensitivities + synTF.parameter_jacobian(
+            y, t, parameters, inputs
+        )
+
+        return np.concatenate((dydt, dsdt.ravel()))
+
+    @staticmethod
+    def jacobian_sensitivity(
+        z: np.ndarray, t: np.ndarray, parameters: List[float], inputs: List[float]
+    ) -> np.ndarray:
+        """Defines the Jacobian used by the solver for the augmented system in
+        gradient_sensitivity() (second derivative terms are neglected, which only
+        affects the convergence of the corrector iterations, not the accuracy
+        of the solution)
+
+        Parameters
+        ----------
+        z
+            a 1D array defining the model states followed by the sensitivities
+
+        t
+            an array defining the time (necessary parameter to use ODEint to solve gradient)
+
+        parameters
+            List of floats defining the parameters
+
+        inputs
+            List of floats defining the inputs
+
+        Returns
+        -------
+        jacobian
+            an array defining the approximate Jacobian of the augmented system
+
+        """
+        number_of_parameters = len(parameters)
+        jacobian = synTF.jacobian(z[:4], t, parameters, inputs)
+        jacobian_sensitivity = np.zeros((4 * (number_of_parameters + 1),) * 2)
+        jacobian_sensitivity[:4, :4] = jacobian
+        jacobian_sensitivity[4:, 4:] = np.kron(jacobian, np.eye(number_of_parameters))
+
+        return jacobian_sensitivity
+
+    def define_sensitivity_functions(self) -> Tuple[Callable, Callable, tuple]:
+        """Defines the gradient, Jacobian and gradient arguments of the system augmented
+        with the forward sensitivity equations, depending on the model backend
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        gradient
+            the function defining the gradient of the augmented system
+
+        jacobian
+            the function defining the approximate Jacobian of the augmented system
+
+        args
+            a tuple defining the extra arguments passed to gradient and jacobian
+
+        """
+        if self.model_backend == "numba":
+            gradient, jacobian = self.compiled_kernels_sensitivity
+            packed_parameters = np.array(list(self.parameters) + list(self.inputs), dtype=float)
+            return gradient, jacobian, (packed_parameters,)
+
+        return self.gradient_sensitivity, self.jacobian_sensitivity, (self.parameters, self.inputs)
+
+    def solve_single_sensitivities(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Solves synTF model and the forward sensitivity equations for a single set
+        of parameters and inputs
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        solution
+            a 1D array defining the model states at the final timepoint
+
+        sensitivities
+            an array defining the derivatives of the model states at the final timepoint
+            with respect to the parameters (rows are model states and columns are parameters)
+
+        """
+        number_of_states = len(self.state_labels)
+        number_of_parameters = len(self.parameters)
+        gradient, jacobian, args = self.define_sensitivity_functions()
+        initial_conditions = np.zeros(number_of_states * (number_of_parameters + 1))
+        solution, _ = solve_ode(
+            gradient, jacobian, initial_conditions, self.end_time, args, self.solver, "final"
+        )
+        sensitivities = solution[-1, number_of_states:].reshape(
+            number_of_states, number_of_parameters
+        )
+
+        return solution[-1, :number_of_states], sensitivities
+
+    @staticmethod
+    def define_quadrature(end_time: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Defines the Gauss-Legendre quadrature nodes and weights used by
+        solve_experiment_semi_analytic(). Panels are geometrically refined near t = 0,
+        where the promoter activation can switch on sharply for large w.
+
+        Parameters
+        ----------
+        end_time
+            a float defining the final time
+
+        Returns
+        -------
+        nodes
+            a 1D array of time values at which the integrand is evaluated
+
+        weights
+            a 1D array of quadrature weights corresponding to nodes
+
+        """
+        edges = np.concatenate(
+            ([0], np.geomspace(1e-4, end_time / 2, 16), end_time - np.array([10, 4, 2, 1, 0]))
+        )
+        points, point_weights = np.polynomial.legendre.leggauss(8)  # type: ignore[no-untyped-call]
+        half_widths = np.diff(edges)[:, None] / 2
+        midpoints = (edges[:-1] + edges[1:])[:, None] / 2
+        nodes = (half_widths * points + midpoints).ravel()
+        weights = (half_widths * point_weights).ravel()
+
+        return nodes, weights
+
+    def define_semi_analytic_terms(self, doses: List[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Defines the terms used to solve synTF model without integrating the ODEs.
+
+        The synTF mRNA and protein states are linear, so synTF protein has a closed-form
+        solution. The reporter mRNA and protein states are linear in the promoter
+        activation, so the reporter protein at the final time is the integral of the
+        promoter activation multiplied by the impulse response of the reporter states,
+        which is evaluated by quadrature for all synTF amounts at once.
+
+        Parameters
+        ----------
+        doses
+            a list of floats defining the synTF amounts
+
+        Returns
+        -------
+        synTF_protein
+            an array defining synTF protein at each quadrature node
+            (rows are synTF amounts and columns are quadrature nodes)
+
+        weighted_impulse_response
+            a 1D array defining the impulse response of the reporter protein at the
+            final time to the promoter activation at each quadrature node,
+            multiplied by the quadrature weights
+
+        """
+        k_txn = 1
+        k_trans = 1
+        kdeg_rna = 2.7
+        kdeg_protein = 0.35
+        kdeg_reporter = 0.029
+
+        nodes, weights = self.quadrature
+        doses = np.asarray(doses, dtype=float)[:, None]
+
+        # y1 synTF protein (closed-form solution with y0(0) = y1(0) = 0)
+        synTF_protein = (
+            k_trans
+            * k_txn
+            * doses
+            / kdeg_rna
+            * (
+                (1 - np.exp(-kdeg_protein * nodes)) / kdeg_protein
+                - (np.exp(-kdeg_protein * nodes) - np.exp(-kdeg_rna * nodes))
+                / (kdeg_rna - kdeg_protein)
+            )
+        )
+
+        # impulse response of y3 Reporter protein to the promoter activation
+        time_to_end = self.end_time - nodes
+        impulse_response = (
+            k_trans
+            * k_txn
+            * (np.exp(-kdeg_reporter * time_to_end) - np.exp(-kdeg_rna * time_to_end))
+            / (kdeg_rna - kdeg_reporter)
+        )
+
+        return synTF_protein, impulse_response * weights
+
+    def solve_experiment_semi_analytic(self, doses: List[float]) -> List[float]:
+        """Solves synTF model for a list of synTF amounts without integrating the ODEs
+        (see define_semi_analytic_terms())
+
+        Parameters
+        ----------
+        doses
+            a list of floats defining the synTF amounts
+
+        Returns
+        -------
+        solutions
+            A list of floats containing the value of the reporter protein
+            at the final timepoint for each synTF amount
+
+        """
+        [b, m, w] = self.parameters
+        synTF_protein, weighted_impulse_response = self.define_semi_analytic_terms(doses)
+        fractional_activation_promoter = b + m * w * synTF_protein / (1 + w * synTF_protein)
+
+        return list(fractional_activation_promoter @ weighted_impulse_response)
+
     def solve_experiment(self, x: List[float], dataID: str, parameter_labels) -> List[float]:
         """Solve synTF model for a list of synTF values.
 
@@ -147,12 +582,122 @@ class synTF:
         """
         solutions = []
         if dataID == "synTF dose response":
+            solutions = self.solve_experiment_conditions(
+                x, dataID, parameter_labels, list(range(len(x)))
+            )
+
+        return solutions
+
+    def solve_experiment_conditions(
+        self, x: List[float], dataID: str, parameter_labels: List[str], indices: List[int]
+    ) -> List[float]:
+        """Solve synTF model for the conditions of an experiment with the given indices
+        (used to solve an experiment in stages)
+
+        Parameters
+        ----------
+        x
+            a list of floats containing the independent variable
+
+        dataID
+            a string defining the dataID
+
+        parameter_labels
+            a list of strings defining the parameter labels
+
+        indices
+            a list of ints defining the indices of the conditions (datapoints) to solve
+
+        Returns
+        -------
+        solutions
+            A list of floats containing the value of the reporter protein
+            at the final timepoint for each of the given conditions
+
+        """
+        doses = [x[i] for i in indices]
+        if self.solve_mode == "semi-analytic":
+            return self.solve_experiment_semi_analytic(doses)
+
+        solutions = []
+        for synTF_amount in doses:
+            self.inputs = [synTF_amount]
+            sol, _ = self.solve_single(self.solver["output"])
+            solutions.append(sol[-1, -1])
+
+        return solutions
+
+    @staticmethod
+    def define_normalization_groups(dataID: str, num_datapoints: int) -> List[List[int]]:
+        """Defines the datapoints that are normalized together by normalize_data()
+
+        Parameters
+        ----------
+        dataID
+            a string defining the dataID
+
+        num_datapoints
+            an int defining the number of datapoints
+
+        Returns
+        -------
+        normalization_groups
+            a list of lists defining the start and stop index of each group of datapoints
+            normalized by their maximum value
+
+        """
+        return [[0, num_datapoints]]
+
+    def solve_experiment_sensitivities(
+        self, x: List[float], dataID: str, parameter_labels: List[str]
+    ) -> Tuple[List[float], np.ndarray]:
+        """Solve synTF model and the forward sensitivity equations for a list of synTF values.
+
+        Parameters
+        ----------
+        x
+            a list of floats containing the independent variable
+
+        dataID
+            a string defining the dataID
+
+        parameter_labels
+            a list of strings defining the parameter labels
+
+        Returns
+        -------
+        solutions
+            A list of floats containing the value of the reporter protein
+            at the final timepoint for each synTF amount
+
+        sensitivities
+            an array defining the derivatives of the reporter protein at the final
+            timepoint (rows) with respect to each parameter (columns)
+
+        """
+        solutions = []
+        sensitivities = []
+        if dataID == "synTF dose response":
+            if self.solve_mode == "semi-analytic":
+                [_, m, w] = self.parameters
+                synTF_protein, weighted_impulse_response = self.define_semi_analytic_terms(x)
+                promoter_derivatives = [
+                    np.ones(np.shape(synTF_protein)),
+                    w * synTF_protein / (1 + w * synTF_protein),
+                    m * synTF_protein / (1 + w * synTF_protein) ** 2,
+                ]
+                sensitivities = np.column_stack(
+                    [derivative @ weighted_impulse_response for derivative in promoter_derivatives]
+                )
+                return self.solve_experiment_semi_analytic(x), sensitivities
+
             for synTF_amount in x:
                 self.inputs = [synTF_amount]
-                sol, _ = self.solve_single()
-                solutions.append(sol[-1, -1])
+                solution, sensitivities_single = self.solve_single_sensitivities()
+                solutions.append(solution[-1])
+                sensitivities.append(sensitivities_single[-1])
 
-        return solutions
+        return solutions, np.reshape(sensitivities, (len(solutions), len(parameter_labels)))
 
     @staticmethod
     def normalize_data(solutions_raw: List[float], dataID: str) -> List[float]:
@@ -178,6 +723,43 @@ class synTF:
 
         return solutions_norm
 
+    @staticmethod
+    def normalize_sensitivities(
+        solutions_raw: List[float], sensitivities_raw: np.ndarray, dataID: str
+    ) -> np.ndarray:
+        """Calculates the derivatives of the normalized data (defined by normalize_data())
+        with respect to the parameters
+
+        Parameters
+        ----------
+        solutions_raw
+            a list of floats defining the solutions before normalization
+
+        sensitivities_raw
+            an array defining the derivatives of the solutions before normalization
+            (rows) with respect to each parameter (columns)
+
+        dataID
+            a string defining the dataID
+
+        Returns
+        -------
+        sensitivities_norm
+            an array defining the derivatives of the normalized solutions
+            (rows) with respect to each parameter (columns)
+
+        """
+        if dataID == "synTF dose response":
+            solutions_raw = np.asarray(solutions_raw, dtype=float)
+            index_max = np.argmax(solutions_raw)
+            solution_max = solutions_raw[index_max]
+            sensitivities_norm = (
+                sensitivities_raw * solution_max
+                - solutions_raw[:, None] * sensitivities_raw[index_max]
+            ) / solution_max**2
+
+        return sensitivities_norm
+
     @staticmethod
     def plot_training_data(
         x: List[float],
@@ -189,7 +771,6 @@ class synTF:
         context: str,
         dataID: str,
     ) -> None:
-
         """
         Plots training data and simulated training data for a single parameter set
 
@@ -7,9 +7,10 @@ Created on Thu Jun 16 09:11:29 2022
 """
 
 import math
-from typing import Tuple, List
+from typing import Callable, Tuple, List
 import numpy as np
-from scipy.integrate import odeint
+from games.models.compiled import get_compiled_kernels
+from games.models.solvers import define_solver, solve_ode
 from games.plots.plots_training_data import plot_training_data_2d
 
 
@@ -25,8 +26,10 @@ class synTF_chem:
         inputs: List[float] = None,
         input_ligand: float = 1000,
         mechanismID: str = "default",
+        solve_mode: str = "default",
+        model_backend: str = "python",
+        solver: dict = None,
     ) -> None:
-
         """Initializes synTF_Chem model.
 
         Parameters
@@ -43,6 +46,20 @@ class synTF_chem:
         mechanismID
             a string defining the mechanism identity
 
+        solve_mode
+            a string defining how solve_experiment() integrates the conditions
+            ("default" solves each condition separately, "batch" solves all
+            conditions of an experiment together in a single ODE system)
+
+        model_backend
+            a string defining how the gradient is evaluated ("python" uses
+            gradient(), "numba" uses the compiled gradient and analytic
+            Jacobian kernels in games.models.compiled)
+
+        solver
+            a dictionary of solver settings (see games.models.solvers.define_solver),
+            or None to use the default solver
+
         Returns
         -------
         None
@@ -62,12 +79,131 @@ class synTF_chem:
         self.inputs = inputs
         self.input_ligand = input_ligand
         self.mechanismID = mechanismID
+        self.solve_mode = solve_mode
+        self.model_backend = model_backend
+        self.solver = define_solver(solver)
+        # for mechanisms C and D, m is defined relative to b
+        self.m_scaled_by_b = mechanismID in ("C", "D")
+        self.define_compiled_kernels()
         number_of_states = len(self.state_labels)
         y_init = np.zeros(number_of_states)
         self.initial_conditions = y_init
+        # solutions before ligand addition, which do not depend on the ligand dose
+        # (see solve_before_ligand_addition())
+        self.solutions_before_ligand_addition = {}
+        self.solutions_before_ligand_addition_settings = None
+
+    def define_compiled_kernels(self) -> None:
+        """Defines the compiled kernels used by the numba model backend
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+
+        """
+        if self.model_backend == "numba":
+            self.compiled_kernels = get_compiled_kernels("synTF_chem")
+            self.compiled_kernels_batch = get_compiled_kernels("synTF_chem batch")
+            self.compiled_kernels_sensitivity = get_compiled_kernels("synTF_chem sensitivity")
+
+    def with_parameters(self, parameters: List[float]) -> "synTF_chem":
+        """Defines an independent copy of the model with the given parameters
+        (see synTF.with_parameters())
+
+        Parameters
+        ----------
+        parameters
+            a list of floats defining the parameters
+
+        Returns
+        -------
+        model
+            a copy of the model with the given parameters
+
+        """
+        given_model = object.__new__(type(self))
+        given_model.__dict__.update(self.__dict__)
+        given_model.parameters = list(parameters)
+        # solutions stored by solve_before_ligand_addition() are not shared with the copy
+        given_model.solutions_before_ligand_addition = {}
+        given_model.solutions_before_ligand_addition_settings = None
+
+        return given_model
+
+    def __getstate__(self) -> dict:
+        # compiled kernels are not pickled, they are defined again when the model is unpickled
+        state = dict(self.__dict__)
+        state.pop("compiled_kernels", None)
+        state.pop("compiled_kernels_batch", None)
+        state.pop("compiled_kernels_sensitivity", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.define_compiled_kernels()
+
+    def solve_before_ligand_addition(
+        self, gradient: Callable, jacobian: Callable, args: tuple, output: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Solves synTF_Chem model from transfection to ligand addition. The solution only
+        depends on the parameters and plasmid inputs, so it is stored and reused for
+        all ligand doses with the same parameters and inputs.
+
+        Parameters
+        ----------
+        gradient
+            the function defining the gradient
+
+        jacobian
+            the function defining the Jacobian
+
+        args
+            a tuple defining the extra arguments passed to gradient and jacobian
+
+        output
+            a string defining the output mode ("dense", "final" or "sensitivity",
+            which solves the system augmented with the forward sensitivity equations)
+
+        Returns
+        -------
+        solution
+            An array of ODE solutions (rows are timepoints and columns are model states)
+
+        t
+            A 1D array of time values corresponding to the rows in solution
+
+        """
+        # stored solutions are only valid for the current parameters and solver settings
+        settings = (
+            tuple(self.parameters),
+            self.mechanismID,
+            self.model_backend,
+            tuple(sorted(self.solver.items())),
+        )
+        if settings != self.solutions_before_ligand_addition_settings:
+            self.solutions_before_ligand_addition = {}
+            self.solutions_before_ligand_addition_settings = settings
+
+        key = (tuple(self.inputs), output)
+        if key not in self.solutions_before_ligand_addition:
+            if output == "sensitivity":
+                initial_conditions = np.zeros(len(self.state_labels) * (len(self.parameters) + 1))
+                output = "final"
+            else:
+                initial_conditions = self.initial_conditions
+            end_time1 = 18
+            self.solutions_before_ligand_addition[key] = solve_ode(
+                gradient, jacobian, initial_conditions, end_time1, args, self.solver, output
+            )
+
+        return self.solutions_before_ligand_addition[key]
 
     def solve_single(
-        self, parameter_labels: List[str]
+        self, parameter_labels: List[str], output: str = "dense"
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """Solves synTF_Chem model for a single set of parameters and inputs, including 2 steps
            1) Time from transfection to ligand addition
@@ -78,6 +214,10 @@ class synTF_chem:
         parameter_labels
             a list of strings defining the parameter labels
 
+        output
+            a string defining the output mode ("dense" returns the solution at
+            evenly spaced timepoints, "final" returns only the initial and final states)
+
         Returns
         -------
         solution
@@ -88,20 +228,11 @@ class synTF_chem:
 
         """
         # solve before ligand addition
-        timesteps = 100
-        end_time1 = 18
-        tspace_before_ligand_addition = np.linspace(0, end_time1, timesteps)
-        t = tspace_before_ligand_addition
-        solution_before_ligand_addition = odeint(
-            self.gradient,
-            self.initial_conditions,
-            t,
-            args=(
-                self.parameters,
-                self.inputs,
-                self.mechanismID,
-            ),
-        )
+        gradient, jacobian, args = self.define_ode_functions()
+        (
+            solution_before_ligand_addition,
+            tspace_before_ligand_addition,
+        ) = self.solve_before_ligand_addition(gradient, jacobian, args, output)
 
         # solve after ligand addition
         for i, label in enumerate(parameter_labels):
@@ -109,19 +240,16 @@ class synTF_chem:
                 input_ligand_transformed = self.input_ligand * self.parameters[i]
 
         end_time2 = 24
-        tspace_after_ligand_addition = np.linspace(0, end_time2, timesteps)
-        t = tspace_after_ligand_addition
         initial_conditions_after_ligand_addition = np.array(solution_before_ligand_addition[-1, :])
         initial_conditions_after_ligand_addition[4] = input_ligand_transformed
-        solution_after_ligand_addition = odeint(
-            self.gradient,
+        solution_after_ligand_addition, tspace_after_ligand_addition = solve_ode(
+            gradient,
+            jacobian,
             initial_conditions_after_ligand_addition,
-            t,
-            args=(
-                self.parameters,
-                self.inputs,
-                self.mechanismID,
-            ),
+            end_time2,
+            args,
+            self.solver,
+            output,
         )
 
         return (
@@ -131,6 +259,92 @@ class synTF_chem:
             solution_after_ligand_addition,
         )
 
+    def pack_parameters(self) -> np.ndarray:
+        """Packs the parameters into the array used by the compiled kernels
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        packed_parameters
+            an array of floats defining [b, k_bind, m, km, n]
+            (m is scaled by b for mechanisms C and D)
+
+        """
+        [_, b, k_bind, m, km, n] = self.parameters
+        if self.m_scaled_by_b:
+            m = m * b
+
+        return np.array([b, k_bind, m, km, n], dtype=float)
+
+    def define_ode_functions(self) -> Tuple[Callable, Callable, tuple]:
+        """Defines the gradient, Jacobian and gradient arguments used by the solver
+        for the current parameters and inputs, depending on the model backend
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        gradient
+            the function defining the gradient
+
+        jacobian
+            the function defining the Jacobian of the gradient
+
+        args
+            a tuple defining the extra arguments passed to gradient and jacobian
+
+        """
+        if self.model_backend == "numba":
+            gradient, jacobian = self.compiled_kernels
+            packed_parameters = np.concatenate(
+                (self.pack_parameters(), np.asarray(self.inputs, dtype=float))
+            )
+            return gradient, jacobian, (packed_parameters,)
+
+        return self.gradient, self.jacobian, (self.parameters, self.inputs, self.mechanismID)
+
+    def define_sensitivity_functions(self) -> Tuple[Callable, Callable, tuple]:
+        """Defines the gradient, Jacobian and gradient arguments of the system augmented
+        with the forward sensitivity equations, depending on the model backend
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        gradient
+            the function defining the gradient of the augmented system
+
+        jacobian
+            the function defining the approximate Jacobian of the augmented system
+
+        args
+            a tuple defining the extra arguments passed to gradient and jacobian
+
+        """
+        if self.model_backend == "numba":
+            gradient, jacobian = self.compiled_kernels_sensitivity
+            packed_parameters = np.concatenate(
+                (
+                    self.pack_parameters(),
+                    np.asarray(self.inputs, dtype=float),
+                    [float(self.m_scaled_by_b), self.parameters[3]],
+                )
+            )
+            return gradient, jacobian, (packed_parameters,)
+
+        return (
+            self.gradient_sensitivity,
+            self.jacobian_sensitivity,
+            (self.parameters, self.inputs, self.mechanismID),
+        )
+
     @staticmethod
     def gradient(
         y: np.ndarray, t: np.ndarray, parameters: list, inputs: list, mechanismID: str
@@ -199,6 +413,643 @@ class synTF_chem:
 
         return dydt
 
+    @staticmethod
+    def fractional_activation_promoter_derivatives(
+        y1: np.ndarray, y5: np.ndarray, b: float, m: float, km: float, n: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Defines the derivatives of the fractional promoter activation with
+        respect to the A protein (y1) and the activator (y5)
+
+        Parameters
+        ----------
+        y1
+            a float or an array of floats defining the A protein
+
+        y5
+            a float or an array of floats defining the activator
+
+        b
+            a float defining the basal promoter activation
+
+        m
+            a float defining the maximum promoter activation
+
+        km
+            a float defining the activation constant
+
+        n
+            a float defining the cooperativity
+
+        Returns
+        -------
+        derivative_y1
+            the derivative with respect to y1 (0 where it is undefined)
+
+        derivative_y5
+            the derivative with respect to y5 (0 where it is undefined)
+
+        """
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            y1 = np.asarray(y1, dtype=float)
+            y5 = np.asarray(y5, dtype=float)
+            activator_term = (y5 / km) ** n
+            denominator = 1 + activator_term + (y1 / km) ** n
+            fractional_activation_promoter = (b + m * activator_term) / denominator
+            derivative_y1 = (
+                -fractional_activation_promoter * n * (y1 / km) ** (n - 1) / km / denominator
+            )
+            derivative_y5 = (
+                (m - fractional_activation_promoter) * n * (y5 / km) ** (n - 1) / km / denominator
+            )
+
+        derivative_y1 = np.where(np.isfinite(derivative_y1), derivative_y1, 0)
+        derivative_y5 = np.where(np.isfinite(derivative_y5), derivative_y5, 0)
+
+        return derivative_y1, derivative_y5
+
+    @staticmethod
+    def jacobian(
+        y: np.ndarray, t: np.ndarray, parameters: list, inputs: list, mechanismID: str
+    ) -> np.ndarray:
+        """Defines the Jacobian of the gradient for synTF_Chem model.
+
+        Parameters
+        ----------
+        y
+            an array defining the model states
+
+        t
+            an array defining the time (necessary parameter to use ODEint to solve gradient)
+
+        parameters
+            a list of floats defining the parameters
+
+        inputs
+            a list of floats defining the inputs
+
+        mechanismID
+            a string defining the mechanism identity
+
+        Returns
+        -------
+        jacobian
+            an array in which element [i, j] is the derivative of the gradient
+            of state i with respect to state j
+
+        """
+        if mechanismID == "A" or mechanismID == "B":
+            [_, b, k_bind, m, km, n] = parameters
+
+        if mechanismID == "C" or mechanismID == "D":
+            [_, b, k_bind, m_star, km, n] = parameters
+            m = m_star * b
+
+        k_txn = 1
+        k_trans = 1
+        kdeg_rna = 2.7
+        kdeg_protein = 0.35
+        kdeg_reporter = 0.029
+        kdeg_ligand = 0.01
+
+        # derivatives of the ligand binding rate (k_bind * y1 * y3 * y4)
+        binding_y1 = k_bind * y[3] * y[4]
+        binding_y3 = k_bind * y[1] * y[4]
+        binding_y4 = k_bind * y[1] * y[3]
+
+        # derivatives of the fractional promoter activation (0 where undefined)
+        activator_term = (y[5] / km) ** n
+        denominator = 1 + activator_term + (y[1] / km) ** n
+        fractional_activation_promoter = (b + m * activator_term) / denominator
+        promoter_y1 = 0
+        promoter_y5 = 0
+        if not math.isnan(fractional_activation_promoter):
+            if y[1] > 0 or n >= 1:
+                promoter_y1 = (
+                    -fractional_activation_promoter * n * (y[1] / km) ** (n - 1) / km / denominator
+                )
+            if y[5] > 0 or n >= 1:
+                promoter_y5 = (
+                    (m - fractional_activation_promoter)
+                    * n
+                    * (y[5] / km) ** (n - 1)
+                    / km
+                    / denominator
+                )
+            if not math.isfinite(promoter_y1):
+                promoter_y1 = 0
+            if not math.isfinite(promoter_y5):
+                promoter_y5 = 0
+
+        jacobian = np.array(
+            [
+                [-kdeg_rna, 0, 0, 0, 0, 0, 0, 0],  # y0 A mRNA
+                [
+                    k_trans,
+                    -kdeg_protein - binding_y1,
+                    0,
+                    -binding_y3,
+                    -binding_y4,
+                    0,
+                    0,
+                    0,
+                ],  # y1 A protein
+                [0, 0, -kdeg_rna, 0, 0, 0, 0, 0],  # y2 B mRNA
+                [
+                    0,
+                    -binding_y1,
+                    k_trans,
+                    -kdeg_protein - binding_y3,
+                    -binding_y4,
+                    0,
+                    0,
+                    0,
+                ],  # y3 B protein
+                [0, -binding_y1, 0, -binding_y3, -binding_y4 - kdeg_ligand, 0, 0, 0],  # y4 Ligand
+                [0, binding_y1, 0, binding_y3, binding_y4, -kdeg_protein, 0, 0],  # y5 Activator
+                [
+                    0,
+                    k_txn * promoter_y1,
+                    0,
+                    0,
+                    0,
+                    k_txn * promoter_y5,
+                    -kdeg_rna,
+                    0,
+                ],  # y6 Reporter mRNA
+                [0, 0, 0, 0, 0, 0, k_trans, -kdeg_reporter],  # y7 Reporter protein
+            ]
+        )
+
+        return jacobian
+
+    @staticmethod
+    def parameter_jacobian(
+        y: np.ndarray, t: np.ndarray, parameters: list, inputs: list, mechanismID: str
+    ) -> np.ndarray:
+        """Defines the derivatives of the gradient for synTF_Chem model with respect
+        to the parameters.
+
+        Parameters
+        ----------
+        y
+            an array defining the model states
+
+        t
+            an array defining the time (necessary parameter to use ODEint to solve gradient)
+
+        parameters
+            a list of floats defining the parameters
+
+        inputs
+            a list of floats defining the inputs
+
+        mechanismID
+            a string defining the mechanism identity
+
+        Returns
+        -------
+        parameter_jacobian
+            an array in which element [i, j] is the derivative of the gradient
+            of state i with respect to parameter j (e does not appear in the gradient,
+            it only defines the ligand at the time of ligand addition)
+
+        """
+        [_, b, k_bind, m, km, n] = parameters
+        m_star = m
+        if mechanismID == "C" or mechanismID == "D":
+            m = m_star * b
+
+        k_txn = 1
+
+        activator_term = (y[5] / km) ** n
+        repressor_term = (y[1] / km) ** n
+        denominator = 1 + activator_term + repressor_term
+        fractional_activation_promoter = (b + m * activator_term) / denominator
+        activator_term_n = activator_term * math.log(y[5] / km) if y[5] > 0 else 0
+        repressor_term_n = repressor_term * math.log(y[1] / km) if y[1] > 0 else 0
+        promoter_b = 1 / denominator
+        promoter_m = activator_term / denominator
+        promoter_km = (
+            -n
+            / km
+            * (
+                m * activator_term
+                - fractional_activation_promoter * (activator_term + repressor_term)
+            )
+            / denominator
+        )
+        promoter_n = (
+            m * activator_term_n
+            - fractional_activation_promoter * (activator_term_n + repressor_term_n)
+        ) / denominator
+        promoter_derivatives = [promoter_b, promoter_m, promoter_km, promoter_n]
+        if math.isnan(fractional_activation_promoter) or not all(
+            math.isfinite(derivative) for derivative in promoter_derivatives
+        ):
+            promoter_b, promoter_m, promoter_km, promoter_n = 0, 0, 0, 0
+
+        if mechanismID == "C" or mechanismID == "D":
+            promoter_b = promoter_b + m_star * promoter_m
+            promoter_m = b * promoter_m
+
+        binding_k_bind = y[1] * y[3] * y[4]
+
+        # columns are e, b, k_bind, m, km, n
+        parameter_jacobian = np.array(
+            [
+                [0, 0, 0, 0, 0, 0],  # y0 A mRNA
+                [0, 0, -binding_k_bind, 0, 0, 0],  # y1 A protein
+                [0, 0, 0, 0, 0, 0],  # y2 B mRNA
+                [0, 0, -binding_k_bind, 0, 0, 0],  # y3 B protein
+                [0, 0, -binding_k_bind, 0, 0, 0],  # y4 Ligand
+                [0, 0, binding_k_bind, 0, 0, 0],  # y5 Activator
+                [
+                    0,
+                    k_txn * promoter_b,
+                    0,
+                    k_txn * promoter_m,
+                    k_txn * promoter_km,
+                    k_txn * promoter_n,
+                ],  # y6 Reporter mRNA
+                [0, 0, 0, 0, 0, 0],  # y7 Reporter protein
+            ]
+        )
+
+        return parameter_jacobian
+
+    @staticmethod
+    def gradient_sensitivity(
+        z: np.ndarray, t: np.ndarray, parameters: list, inputs: list, mechanismID: str
+    ) -> np.ndarray:
+        """Defines the gradient for synTF_Chem model augmented with the forward
+        sensitivity equations dS/dt = J S + df/dp
+
+        Parameters
+        ----------
+        z
+            a 1D array defining the model states followed by the sensitivities of
+            each model state to each parameter (flattened by row, rows are model states)
+
+        t
+            an array defining the time (necessary parameter to use ODEint to solve gradient)
+
+        parameters
+            a list of floats defining the parameters
+
+        inputs
+            a list of floats defining the inputs
+
+        mechanismID
+            a string defining the mechanism identity
+
+        Returns
+        -------
+        dzdt
+            a 1D array corresponding to the gradient of each model state and
+            sensitivity at time t
+
+        """
+        y = z[:8]
+        sensitivities = z[8:].reshape(8, -1)
+        dydt = synTF_chem.gradient(y, t, parameters, inputs, mechanismID)
+        dsdt = synTF_chem.jacobian(
+            y, t, parameters, inputs, mechanismID
+        ) @ sensitivities + synTF_chem.parameter_jacobian(y, t, parameters, inputs, mechanismID)
+
+        return np.concatenate((dydt, dsdt.ravel()))
+
+    @staticmethod
+    def jacobian_sensitivity(
+        z: np.ndarray, t: np.ndarray, parameters: list, inputs: list, mechanismID: str
+    ) -> np.ndarray:
+        """Defines the Jacobian used by the solver for the augmented system in
+        gradient_sensitivity(). The Jacobian of the model states is repeated along the
+        diagonal and the second derivative terms are neglected, which only affects the
+        convergence of the corrector iterations, not the accuracy of the solution.
+
+        Parameters
+        ----------
+        z
+            a 1D array defining the model states followed by the sensitivities
+
+        t
+            an array defining the time (necessary parameter to use ODEint to solve gradient)
+
+        parameters
+            a list of floats defining the parameters
+
+        inputs
+            a list of floats defining the inputs
+
+        mechanismID
+            a string defining the mechanism identity
+
+        Returns
+        -------
+        jacobian
+            an array defining the approximate Jacobian of the augmented system
+
+        """
+        number_of_parameters = len(parameters)
+        jacobian = synTF_chem.jacobian(z[:8], t, parameters, inputs, mechanismID)
+        jacobian_sensitivity = np.zeros((8 * (number_of_parameters + 1),) * 2)
+        jacobian_sensitivity[:8, :8] = jacobian
+        jacobian_sensitivity[8:, 8:] = np.kron(jacobian, np.eye(number_of_parameters))
+
+        return jacobian_sensitivity
+
+    @staticmethod
+    def gradient_batch(
+        y: np.ndarray,
+        t: np.ndarray,
+        parameters: list,
+        inputs: np.ndarray,
+        mechanismID: str,
+        rate_matrix: np.ndarray,
+    ) -> np.ndarray:
+        """Defines the gradient for synTF_Chem model for a batch of conditions.
+
+        Parameters
+        ----------
+        y
+            a 1D array defining the model states for all conditions
+            (the states of each condition are stored contiguously)
+
+        t
+            an array defining the time (necessary parameter to use ODEint to solve gradient)
+
+        parameters
+            a list of floats defining the parameters
+
+        inputs
+            an array of floats defining the inputs (rows are conditions,
+            columns are dose_a and dose_b)
+
+        mechanismID
+            a string defining the mechanism identity
+
+        rate_matrix
+            an array mapping the model states, inputs, ligand binding rate and
+            fractional promoter activation to the gradient of each model state
+            (defined by define_rate_matrix())
+
+        Returns
+        -------
+        dydt
+            a 1D array corresponding to the gradient of each model state
+            for all conditions at time t
+
+        """
+        y = y.reshape(-1, 8)
+        if mechanismID == "A" or mechanismID == "B":
+            [_, b, k_bind, m, km, n] = parameters
+
+        if mechanismID == "C" or mechanismID == "D":
+            [_, b, k_bind, m_star, km, n] = parameters
+            m = m_star * b
+
+        activator_term = (y[:, 5] / km) ** n
+        fractional_activation_promoter = (b + m * activator_term) / (
+            1 + activator_term + (y[:, 1] / km) ** n
+        )
+        fractional_activation_promoter[np.isnan(fractional_activation_promoter)] = 0
+        binding = k_bind * y[:, 1] * y[:, 3] * y[:, 4]
+
+        dydt = np.column_stack((y, inputs, binding, fractional_activation_promoter)) @ rate_matrix
+
+        return dydt.ravel()
+
+    @staticmethod
+    def jacobian_batch(
+        y: np.ndarray,
+        t: np.ndarray,
+        parameters: list,
+        inputs: np.ndarray,
+        mechanismID: str,
+        rate_matrix: np.ndarray,
+    ) -> np.ndarray:
+        """Defines the Jacobian of the gradient for synTF_Chem model for a batch of
+        conditions in the banded format used by ODEint (ml = mu = 7)
+
+        Parameters
+        ----------
+        y
+            a 1D array defining the model states for all conditions
+            (the states of each condition are stored contiguously)
+
+        t
+            an array defining the time (necessary parameter to use ODEint to solve gradient)
+
+        parameters
+            a list of floats defining the parameters
+
+        inputs
+            an array of floats defining the inputs (rows are conditions,
+            columns are dose_a and dose_b)
+
+        mechanismID
+            a string defining the mechanism identity
+
+        rate_matrix
+            an array mapping the model states, inputs, ligand binding rate and
+            fractional promoter activation to the gradient of each model state
+            (defined by define_rate_matrix())
+
+        Returns
+        -------
+        jacobian_banded
+            an array in which element [i - j + 7, j] is the derivative of the
+            gradient of state i with respect to state j
+
+        """
+        y = y.reshape(-1, 8)
+        number_of_conditions = y.shape[0]
+        if mechanismID == "A" or mechanismID == "B":
+            [_, b, k_bind, m, km, n] = parameters
+
+        if mechanismID == "C" or mechanismID == "D":
+            [_, b, k_bind, m_star, km, n] = parameters
+            m = m_star * b
+
+        # derivatives of the ligand binding rate with respect to y1, y3 and y4
+        binding_derivatives = k_bind * np.column_stack(
+            (y[:, 3] * y[:, 4], y[:, 1] * y[:, 4], y[:, 1] * y[:, 3])
+        )
+        # derivatives of the fractional promoter activation with respect to y1 and y5
+        promoter_derivatives = np.column_stack(
+            synTF_chem.fractional_activation_promoter_derivatives(y[:, 1], y[:, 5], b, m, km, n)
+        )
+
+        # the linear terms of the gradient are the same for all conditions
+        jacobian = np.tile(rate_matrix[:8].T, (number_of_conditions, 1, 1))
+        jacobian[:, :, [1, 3, 4]] += rate_matrix[10][None, :, None] * binding_derivatives[:, None]
+        jacobian[:, :, [1, 5]] += rate_matrix[11][None, :, None] * promoter_derivatives[:, None]
+
+        rows, columns = np.indices((8, 8)).reshape(2, -1)
+        offsets = 8 * np.arange(number_of_conditions)[:, None]
+        jacobian_banded = np.zeros((15, y.size))
+        jacobian_banded[rows - columns + 7, offsets + columns] = jacobian[:, rows, columns]
+
+        return jacobian_banded
+
+    @staticmethod
+    def define_rate_matrix() -> np.ndarray:
+        """Defines the matrix used by gradient_batch() to calculate the gradient
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        rate_matrix
+            an array in which rows correspond to the model states (y0-y7), the inputs
+            (dose_a, dose_b), the ligand binding rate and the fractional promoter
+            activation, and columns correspond to the gradient of each model state
+
+        """
+        k_txn = 1
+        k_trans = 1
+        kdeg_rna = 2.7
+        kdeg_protein = 0.35
+        kdeg_reporter = 0.029
+        kdeg_ligand = 0.01
+
+        rate_matrix = np.zeros((12, 8))
+        rate_matrix[0, 0] = -kdeg_rna  # y0 A mRNA
+        rate_matrix[0, 1] = k_trans
+        rate_matrix[1, 1] = -kdeg_protein  # y1 A protein
+        rate_matrix[2, 2] = -kdeg_rna  # y2 B mRNA
+        rate_matrix[2, 3] = k_trans
+        rate_matrix[3, 3] = -kdeg_protein  # y3 B protein
+        rate_matrix[4, 4] = -kdeg_ligand  # y4 Ligand
+        rate_matrix[5, 5] = -kdeg_protein  # y5 Activator
+        rate_matrix[6, 6] = -kdeg_rna  # y6 Reporter mRNA
+        rate_matrix[6, 7] = k_trans
+        rate_matrix[7, 7] = -kdeg_reporter  # y7 Reporter protein
+        rate_matrix[8, 0] = k_txn  # dose_a
+        rate_matrix[9, 2] = k_txn  # dose_b
+        rate_matrix[10, [1, 3, 4]] = -1  # ligand binding
+        rate_matrix[10, 5] = 1
+        rate_matrix[11, 6] = k_txn  # fractional promoter activation
+
+        return rate_matrix
+
+    @staticmethod
+    def define_conditions(x: list, dataID: str) -> List[Tuple[List[float], float]]:
+        """Defines the inputs and input ligand for each condition in an experiment
+
+        Parameters
+        ----------
+        x
+            a list of floats containing the independent variable
+
+        dataID
+            a string defining the dataID
+
+        Returns
+        -------
+        conditions
+            a list of tuples, each containing the inputs (list of floats)
+            and the input ligand (float) for a single condition
+
+        """
+        conditions = []
+
+        if dataID in ("ligand dose response", "ligand dose response and DBD dose response"):
+            for ligand in x[:11]:
+                conditions.append(([50, 50], ligand))  # ng
+
+        if dataID == "ligand dose response and DBD dose response":
+            for ad_dose in [20, 10]:  # ng
+                for dbd_dose in x[11:19]:
+                    conditions.append(([dbd_dose, ad_dose], 100))
+
+        return conditions
+
+    def solve_batch(
+        self, conditions: List[Tuple[List[float], float]], parameter_labels: List[str]
+    ) -> List[float]:
+        """Solves synTF_Chem model for all conditions of an experiment in a single
+        ODE system, including the same 2 steps as solve_single()
+
+        Parameters
+        ----------
+        conditions
+            a list of tuples, each containing the inputs (list of floats)
+            and the input ligand (float) for a single condition
+
+        parameter_labels
+            a list of strings defining the parameter labels
+
+        Returns
+        -------
+        solutions
+            A list of floats containing the value of the reporter protein
+            at the final timepoint for each condition
+
+        """
+        if len(conditions) == 0:
+            return []
+
+        number_of_states = len(self.state_labels)
+        inputs = np.array([condition[0] for condition in conditions], dtype=float)
+        input_ligand = np.array([condition[1] for condition in conditions], dtype=float)
+        # the solution before ligand addition does not depend on the ligand dose,
+        # so it is only solved once for each unique set of plasmid inputs
+        unique_inputs, condition_indices = np.unique(inputs, axis=0, return_inverse=True)
+        if self.model_backend == "numba":
+            gradient, jacobian = self.compiled_kernels_batch
+            args_before_ligand_addition = (self.pack_parameters(), unique_inputs)
+            args_after_ligand_addition = (self.pack_parameters(), inputs)
+        else:
+            gradient, jacobian = self.gradient_batch, self.jacobian_batch
+            rate_matrix = self.define_rate_matrix()
+            args_before_ligand_addition = (
+                self.parameters,
+                unique_inputs,
+                self.mechanismID,
+                rate_matrix,
+            )
+            args_after_ligand_addition = (self.parameters, inputs, self.mechanismID, rate_matrix)
+
+        # solve before ligand addition
+        end_time1 = 18
+        initial_conditions = np.zeros(len(unique_inputs) * number_of_states)
+        solution_before_ligand_addition, _ = solve_ode(
+            gradient,
+            jacobian,
+            initial_conditions,
+            end_time1,
+            args_before_ligand_addition,
+            self.solver,
+            self.solver["output"],
+            bandwidth=number_of_states - 1,
+        )
+
+        # solve after ligand addition
+        for i, label in enumerate(parameter_labels):
+            if label == "e":
+                input_ligand_transformed = input_ligand * self.parameters[i]
+
+        end_time2 = 24
+        initial_conditions_after_ligand_addition = solution_before_ligand_addition[-1, :].reshape(
+            -1, number_of_states
+        )[condition_indices.ravel()]
+        initial_conditions_after_ligand_addition[:, 4] = input_ligand_transformed
+        solution_after_ligand_addition, _ = solve_ode(
+            gradient,
+            jacobian,
+            initial_conditions_after_ligand_addition.ravel(),
+            end_time2,
+            args_after_ligand_addition,
+            self.solver,
+            self.solver["output"],
+            bandwidth=number_of_states - 1,
+        )
+
+        return list(solution_after_ligand_addition[-1, :].reshape(-1, number_of_states)[:, -1])
+
     def solve_experiment(self, x: list, dataID: str, parameter_labels: List[str]) -> list:
         """Solve synTF_Chem model for a list of ligand values.
 
@@ -220,26 +1071,150 @@ class synTF_chem:
             at the final timepoint for each ligand amount
 
         """
+        conditions = self.define_conditions(x, dataID)
+        return self.solve_experiment_conditions(
+            x, dataID, parameter_labels, list(range(len(conditions)))
+        )
 
-        solutions = []
+    def solve_experiment_conditions(
+        self, x: list, dataID: str, parameter_labels: List[str], indices: List[int]
+    ) -> list:
+        """Solve synTF_Chem model for the conditions of an experiment with the given indices
+        (used to solve an experiment in stages)
 
-        if dataID in ("ligand dose response", "ligand dose response and DBD dose response"):
-            self.inputs = [50, 50]  # ng
-            for ligand in x[:11]:
-                self.input_ligand = ligand
-                _, _, _, sol = self.solve_single(parameter_labels)
-                solutions.append(sol[-1, -1])
+        Parameters
+        ----------
+        x
+            a list of floats containing the independent variable
 
-        if dataID == "ligand dose response and DBD dose response":
-            for ad_dose in [20, 10]:  # ng
-                for dbd_dose in x[11:19]:
-                    self.inputs = [dbd_dose, ad_dose]
-                    self.input_ligand = 100
-                    _, _, _, sol = self.solve_single(parameter_labels)
-                    solutions.append(sol[-1, -1])
+        dataID
+            a string defining the dataID
+
+        parameter_labels
+            a list of strings defining the parameter labels
+
+        indices
+            a list of ints defining the indices of the conditions (datapoints) to solve
+
+        Returns
+        -------
+        solutions
+            A list of floats containing the value of the reporter protein
+            at the final timepoint for each of the given conditions
+
+        """
+        all_conditions = self.define_conditions(x, dataID)
+        conditions = [all_conditions[i] for i in indices]
+        if self.solve_mode == "batch":
+            return self.solve_batch(conditions, parameter_labels)
+
+        solutions = []
+        for inputs, input_ligand in conditions:
+            self.inputs = inputs
+            self.input_ligand = input_ligand
+            _, _, _, sol = self.solve_single(parameter_labels, self.solver["output"])
+            solutions.append(sol[-1, -1])
 
         return solutions
 
+    def solve_single_sensitivities(
+        self, parameter_labels: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Solves synTF_Chem model and the forward sensitivity equations for a single set
+        of parameters and inputs, including the same 2 steps as solve_single()
+
+        Parameters
+        ----------
+        parameter_labels
+            a list of strings defining the parameter labels
+
+        Returns
+        -------
+        solution
+            a 1D array defining the model states at the final timepoint
+
+        sensitivities
+            an array defining the derivatives of the model states at the final timepoint
+            with respect to the parameters (rows are model states and columns are parameters)
+
+        """
+        number_of_states = len(self.state_labels)
+        number_of_parameters = len(parameter_labels)
+        gradient, jacobian, args = self.define_sensitivity_functions()
+
+        # solve before ligand addition
+        solution_before_ligand_addition, _ = self.solve_before_ligand_addition(
+            gradient, jacobian, args, "sensitivity"
+        )
+
+        # solve after ligand addition (the ligand is reset to input_ligand * e,
+        # so its sensitivities are reset to the derivative of input_ligand * e)
+        end_time2 = 24
+        initial_conditions_after_ligand_addition = np.array(solution_before_ligand_addition[-1, :])
+        sensitivities = initial_conditions_after_ligand_addition[number_of_states:].reshape(
+            number_of_states, number_of_parameters
+        )
+        sensitivities[4, :] = 0
+        for i, label in enumerate(parameter_labels):
+            if label == "e":
+                initial_conditions_after_ligand_addition[4] = self.input_ligand * self.parameters[i]
+                sensitivities[4, i] = self.input_ligand
+        solution_after_ligand_addition, _ = solve_ode(
+            gradient,
+            jacobian,
+            initial_conditions_after_ligand_addition,
+            end_time2,
+            args,
+            self.solver,
+            "final",
+        )
+
+        solution = solution_after_ligand_addition[-1, :number_of_states]
+        sensitivities = solution_after_ligand_addition[-1, number_of_states:].reshape(
+            number_of_states, number_of_parameters
+        )
+
+        return solution, sensitivities
+
+    def solve_experiment_sensitivities(
+        self, x: list, dataID: str, parameter_labels: List[str]
+    ) -> Tuple[List[float], np.ndarray]:
+        """Solve synTF_Chem model and the forward sensitivity equations for a list
+        of ligand values.
+
+        Parameters
+        ----------
+        x
+            a list of floats containing the independent variable
+
+        dataID
+            a string defining the dataID
+
+        parameter_labels
+            a list of strings defining the parameter labels
+
+        Returns
+        -------
+        solutions
+            A list of floats containing the value of the reporter protein
+            at the final timepoint for each ligand amount
+
+        sensitivities
+            an array defining the derivatives of the reporter protein at the final
+            timepoint (rows) with respect to each parameter (columns)
+
+        """
+        solutions = []
+        sensitivities = []
+        for inputs, input_ligand in self.define_conditions(x, dataID):
+            self.inputs = inputs
+            self.input_ligand = input_ligand
+            solution, sensitivities_single = self.solve_single_sensitivities(parameter_labels)
+            solutions.append(solution[-1])
+            sensitivities.append(sensitivities_single[-1])
+
+        return solutions, np.reshape(sensitivities, (len(solutions), len(parameter_labels)))
+
     @staticmethod
     def normalize_data(solutions_raw: List[float], dataID: str) -> List[float]:
         """Normalizes data by maximum value
@@ -276,6 +1251,75 @@ class synTF_chem:
 
         return solutions_norm
 
+    @staticmethod
+    def define_normalization_groups(dataID: str, num_datapoints: int) -> List[List[int]]:
+        """Defines the datapoints that are normalized together by normalize_data()
+
+        Parameters
+        ----------
+        dataID
+            a string defining the dataID
+
+        num_datapoints
+            an int defining the number of datapoints
+
+        Returns
+        -------
+        normalization_groups
+            a list of lists defining the start and stop index of each group of datapoints
+            normalized by their maximum value
+
+        """
+        if dataID == "ligand dose response and DBD dose response":
+            return [[0, 11], [11, num_datapoints]]
+
+        return [[0, num_datapoints]]
+
+    @staticmethod
+    def normalize_sensitivities(
+        solutions_raw: List[float], sensitivities_raw: np.ndarray, dataID: str
+    ) -> np.ndarray:
+        """Calculates the derivatives of the normalized data (defined by normalize_data())
+        with respect to the parameters
+
+        Parameters
+        ----------
+        solutions_raw
+            a list of floats defining the solutions before normalization
+
+        sensitivities_raw
+            an array defining the derivatives of the solutions before normalization
+            (rows) with respect to each parameter (columns)
+
+        dataID
+            a string defining the dataID
+
+        Returns
+        -------
+        sensitivities_norm
+            an array defining the derivatives of the normalized solutions
+            (rows) with respect to each parameter (columns)
+
+        """
+        if dataID == "ligand dose response and DBD dose response":
+            groups = [slice(0, 11), slice(11, len(solutions_raw))]
+
+        elif dataID == "ligand dose response":
+            groups = [slice(0, len(solutions_raw))]
+
+        solutions_raw = np.asarray(solutions_raw, dtype=float)
+        sensitivities_norm = np.zeros(np.shape(sensitivities_raw))
+        for group in groups:
+            solutions = solutions_raw[group]
+            sensitivities = sensitivities_raw[group]
+            index_max = np.argmax(solutions)
+            solution_max = solutions[index_max]
+            sensitivities_norm[group] = (
+                sensitivities * solution_max - solutions[:, None] * sensitivities[index_max]
+            ) / solution_max**2
+
+        return sensitivities_norm
+
     @staticmethod
     def plot_training_data(
         x: list,
@@ -5,13 +5,33 @@ Created on Fri Jun  3 15:25:19 2022
 
 @author: kate
 """
-from typing import Tuple, List
+from typing import Any, Optional, Tuple, List
+import hashlib
+import heapq
+import json
 import multiprocessing as mp
+import os
 import numpy as np
 import pandas as pd
-from SALib.sample import latin
-from games.models.set_model import model
-from games.modules.solve_single import solve_single_parameter_set
+from games.modules.parameter_estimation.samplers import SAMPLERS, sample_parameters
+from games.modules.parameter_estimation.surrogate import (
+    calc_ranking_agreement,
+    fit_surrogate,
+    select_candidates,
+)
+from games.modules.solve_single import (
+    solve_single_parameter_set,
+    solve_single_parameter_set_early_abort,
+)
+from games.utilities.cache import configure_cache
+from games.utilities.parallel import (
+    attach_shared_arrays,
+    imap_unordered_tagged,
+    shared_arrays,
+)
+
+# default seed for the sample of the global search
+GLOBAL_SEARCH_SEED = 456767
 
 
 def replace_parameter_values_for_sweep(
@@ -46,11 +66,13 @@ def replace_parameter_values_for_sweep(
         and rows defining the parameter values for each set in
         the sweep
     """
-    df_parameters = df_parameters_default
-    for i in range(0, num_parameters):
-        for label in free_parameter_labels:
-            if free_parameter_labels[i] == label:
-                df_parameters[label] = params_linear[:, i]
+    parameter_array = df_parameters_default.to_numpy(dtype=float, copy=True)
+    free_parameter_indices = [
+        df_parameters_default.columns.get_loc(label)
+        for label in free_parameter_labels[:num_parameters]
+    ]
+    parameter_array[:, free_parameter_indices] = params_linear[:, :num_parameters]
+    df_parameters = pd.DataFrame(parameter_array, columns=df_parameters_default.columns)
 
     return df_parameters
 
@@ -81,14 +103,9 @@ def create_default_df(
         with only the default values
     """
 
-    # Create an empty dataframe to store results of the parameter sweep
-    df_parameters = pd.DataFrame()
-
-    # Fill each column of the dataframe with the initial values set in settings["
-    for i, param in enumerate(all_parameter_labels):
-        param_array = np.full((1, n_search), all_parameters[i])
-        param_array = param_array.tolist()
-        df_parameters[param] = param_array[0]
+    # Fill each column of the dataframe with the initial values set in settings["parameters"]
+    parameter_array = np.tile(np.asarray(all_parameters, dtype=float), (n_search, 1))
+    df_parameters = pd.DataFrame(parameter_array, columns=all_parameter_labels)
     return df_parameters
 
 
@@ -108,10 +125,7 @@ def convert_parameters_to_linear(param_values_global_search: List[list]) -> np.n
         search parameter sweep in linear scale
     """
 
-    params_linear = []
-    for item in param_values_global_search:
-        params_linear.append([10 ** (val) for val in item])
-    params_linear_array = np.asarray(params_linear)
+    params_linear_array = 10 ** np.asarray(param_values_global_search, dtype=float)
 
     return params_linear_array
 
@@ -140,11 +154,22 @@ def generate_parameter_sets(
         df with columns defining to parameter identities
         and rows defining the parameter values for each set in the sweep
     """
+    if "global_search_sampler" not in settings:
+        settings["global_search_sampler"] = "latin"
+
+    if "global_search_seed" not in settings:
+        settings["global_search_seed"] = GLOBAL_SEARCH_SEED
+
     n_search = settings["num_parameter_sets_global_search"]
     df_parameters_default = create_default_df(
         n_search, settings["parameter_labels"], all_parameters
     )
-    param_values_global_search = latin.sample(problem_global_search, n_search, seed=456767)
+    param_values_global_search = sample_parameters(
+        problem_global_search,
+        n_search,
+        settings["global_search_sampler"],
+        settings["global_search_seed"],
+    )
     params_linear = convert_parameters_to_linear(param_values_global_search)
     df_parameters = replace_parameter_values_for_sweep(
         df_parameters_default,
@@ -157,15 +182,91 @@ def generate_parameter_sets(
     return df_parameters
 
 
-def solve_single_for_global_search(row: tuple) -> Tuple[List[float], float]:
+# experiment data and model used by solve_single_for_global_search() in the current process,
+# defined once per worker by initialize_global_search()
+_global_search_data: dict = {}
+
+
+def initialize_global_search(
+    model: Any,
+    x: List[float],
+    exp_data: List[float],
+    exp_error: List[float],
+    settings: dict,
+    chi_sq_threshold: float = np.inf,
+    shared_array_specs: Optional[dict] = None,
+    shared_chi_sq_threshold: Optional[Any] = None,
+) -> None:
+    """Stores the model and experiment data used for each parameter set in the
+    global search - used as the initializer for each worker process so that these
+    items are sent to each worker once instead of once per parameter set
+
+    Parameters
+    ----------
+    model
+        object defining the model
+
+    x
+        a list of floats containing the values of the independent variable
+
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    exp_error
+        a list of floats containing the values of the measurement error
+        for the dependent variable
+
+    settings
+        a dictionary defining the run settings
+
+    chi_sq_threshold
+        a float defining the chi_sq value above which the evaluation of a parameter set is
+        aborted, if settings["global_search_early_abort"] is "yes"
+
+    shared_array_specs
+        a dictionary defining the shared memory arrays with the parameter sets and the
+        results (see games.utilities.parallel.share_arrays()), used by
+        solve_index_for_global_search() in worker processes
+
+    shared_chi_sq_threshold
+        a multiprocessing.Value defining the chi_sq threshold for the early abort, which
+        is lowered by the main process as results come in and read by
+        solve_index_for_global_search() before each parameter set
+
+    Returns
+    -------
+    None
+
+    """
+    configure_cache(settings)
+    _global_search_data["model"] = model
+    _global_search_data["chi_sq_threshold"] = chi_sq_threshold
+    _global_search_data["num_stages"] = 0
+    if settings.get("global_search_early_abort", "no") == "yes":
+        _global_search_data["num_stages"] = settings["global_search_early_abort_stages"]
+    _global_search_data["data"] = [
+        x,
+        exp_data,
+        exp_error,
+        settings["dataID"],
+        settings["weight_by_error"],
+        settings["parameter_labels"],
+    ]
+    if shared_array_specs is not None:
+        _global_search_data["arrays"] = attach_shared_arrays(shared_array_specs)
+    _global_search_data["shared_chi_sq_threshold"] = shared_chi_sq_threshold
+
+
+def solve_single_for_global_search(parameters: np.ndarray) -> Tuple[List[float], float]:
     """
-    Solves equation for a single parameter set - structure is
-    necessary for upstream multiprocessing code
+    Solves equation for a single parameter set with the model and experiment data
+    defined by initialize_global_search() - structure is necessary for upstream
+    multiprocessing code
 
     Parameters
     ----------
-    row
-        tuple defining the parameters and experimental data
+    parameters
+        an array defining the parameters
 
     Returns
     -------
@@ -173,21 +274,278 @@ def solve_single_for_global_search(row: tuple) -> Tuple[List[float], float]:
         a list of floats defining the simulation solutions
 
     chi_sq
-        a float defining the chi_sq value
+        a float defining the chi_sq value (inf if the evaluation was aborted because
+        chi_sq is greater than the threshold defined by initialize_global_search(),
+        in which case the solutions are nan)
 
     """
-    # Unpack row
-    model.parameters = list(row[1:-6])
-    [x, exp_data, exp_error, dataID, weight_by_error, parameter_labels] = row[-6:]
+    # data contains x, exp_data, exp_error, dataID, weight_by_error and parameter_labels
+    if _global_search_data["num_stages"] > 0 and np.isfinite(
+        _global_search_data["chi_sq_threshold"]
+    ):
+        solutions, chi_sq = solve_single_parameter_set_early_abort(
+            _global_search_data["model"],
+            list(parameters),
+            *_global_search_data["data"],
+            _global_search_data["chi_sq_threshold"],
+            _global_search_data["num_stages"],
+        )
+        if solutions is None:
+            return [np.nan] * len(_global_search_data["data"][1]), np.inf
+        return solutions, chi_sq
 
-    # Solve equations
     solutions, chi_sq, _ = solve_single_parameter_set(
-        x, exp_data, exp_error, dataID, weight_by_error, parameter_labels
+        _global_search_data["model"], list(parameters), *_global_search_data["data"]
     )
     return solutions, chi_sq
 
 
+def solve_index_for_global_search(index: int) -> float:
+    """
+    Solves the parameter set with the given index in the shared parameter array and
+    writes the results to the shared results arrays (defined by initialize_global_search()),
+    so that only the index is sent to each worker process and only chi_sq is sent back
+
+    Parameters
+    ----------
+    index
+        an int defining the index of the parameter set
+
+    Returns
+    -------
+    chi_sq
+        a float defining the chi_sq value (inf if the evaluation was aborted)
+
+    """
+    if _global_search_data.get("shared_chi_sq_threshold") is not None:
+        _global_search_data["chi_sq_threshold"] = _global_search_data[
+            "shared_chi_sq_threshold"
+        ].value
+    arrays = _global_search_data["arrays"]
+    solutions, chi_sq = solve_single_for_global_search(arrays["parameters"][index])
+    arrays["solutions"][index] = solutions
+    arrays["chi_sq"][index] = round(chi_sq, 4)
+    return arrays["chi_sq"][index]
+
+
+def update_top_chi_sq(top_chi_sq_heap: List[float], chi_sq: float, top_k: int) -> float:
+    """Adds a chi_sq value to the max heap of the top_k lowest chi_sq values
+    and returns the early abort threshold
+
+    Parameters
+    ----------
+    top_chi_sq_heap
+        a list defining the max heap (negated values) of the lowest chi_sq values so far,
+        updated in place
+
+    chi_sq
+        a float defining the chi_sq value of the parameter set solved last
+
+    top_k
+        an int defining the number of lowest chi_sq values kept
+
+    Returns
+    -------
+    chi_sq_threshold
+        a float defining the largest of the top_k lowest chi_sq values
+        (inf if fewer than top_k values are known)
+
+    """
+    if np.isfinite(chi_sq):
+        if len(top_chi_sq_heap) < top_k:
+            heapq.heappush(top_chi_sq_heap, -chi_sq)
+        elif chi_sq < -top_chi_sq_heap[0]:
+            heapq.heapreplace(top_chi_sq_heap, -chi_sq)
+
+    return -top_chi_sq_heap[0] if 0 < top_k <= len(top_chi_sq_heap) else np.inf
+
+
+def solve_global_search_array(
+    model: Any,
+    parameter_array: np.ndarray,
+    x: List[float],
+    exp_data: List[float],
+    exp_error: List[float],
+    settings: dict,
+    top_chi_sq: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solves the model for each parameter set in the global search
+
+    If settings["global_search_early_abort"] is "yes" and top_chi_sq is given, the
+    evaluation of each parameter set is aborted as soon as its chi_sq can no longer be
+    among the settings["global_search_top_k"] lowest chi_sq values (of top_chi_sq and the
+    parameter sets solved so far). The threshold is updated after each parameter set (with
+    parallelization, as the results come back from the worker processes).
+
+    With parallelization, the parameter sets are sent to the worker processes in chunks
+    of settings["parallel_chunksize"] parameter sets (0 to define the chunk size from the
+    measured time per parameter set) and the results are collected in the order they finish.
+
+    Parameters
+    ----------
+    model
+        object defining the model
+
+    parameter_array
+        an array defining the parameter sets (rows are parameter sets
+        and columns are the parameters in settings["parameter_labels"])
+
+    x
+        a list of floats containing the values of the independent variable
+
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    exp_error
+        a list of floats containing the values of the measurement error
+        for the dependent variable
+
+    settings
+        a dictionary defining the run settings
+
+    top_chi_sq
+        an array defining the chi_sq values of the best parameter sets solved before
+        (for example, in previous chunks), or None to solve every parameter set in full
+
+    Returns
+    -------
+    chi_sq_array
+        an array defining the chi_sq value for each parameter set
+        (inf for parameter sets with an aborted evaluation)
+
+    solutions_array
+        an array defining the normalized solutions for each parameter set
+        (rows are parameter sets and columns are data points)
+
+    """
+    num_parameter_sets = len(parameter_array)
+    chi_sq_array = np.empty(num_parameter_sets)
+    solutions_array = np.empty((num_parameter_sets, len(exp_data)))
+
+    # max heap (negated) of the top_k lowest chi_sq values, the largest of which is the
+    # threshold for the early abort
+    top_k = 0
+    top_chi_sq_heap: List[float] = []
+    if top_chi_sq is not None and settings.get("global_search_early_abort", "no") == "yes":
+        top_k = settings["global_search_top_k"]
+        top_chi_sq_heap = [-chi_sq for chi_sq in heapq.nsmallest(top_k, top_chi_sq)]
+        heapq.heapify(top_chi_sq_heap)
+    chi_sq_threshold = update_top_chi_sq(top_chi_sq_heap, np.inf, top_k)
+    initargs = (model, x, exp_data, exp_error, settings, chi_sq_threshold)
+
+    if settings["parallelization"] == "no":
+        initialize_global_search(*initargs)
+        for i, parameters in enumerate(parameter_array):
+            solutions_array[i], chi_sq_array[i] = solve_single_for_global_search(parameters)
+            if top_k > 0:
+                _global_search_data["chi_sq_threshold"] = update_top_chi_sq(
+                    top_chi_sq_heap, chi_sq_array[i], top_k
+                )
+
+    elif settings["parallelization"] == "yes":
+        # the parameter sets and results are shared with the workers, so each task is an index
+        shared_chi_sq_threshold = mp.Value("d", chi_sq_threshold, lock=False)
+        arrays = {
+            "parameters": np.asarray(parameter_array, dtype=float),
+            "chi_sq": chi_sq_array,
+            "solutions": solutions_array,
+        }
+        with shared_arrays(arrays, ("chi_sq", "solutions")) as (specs, results):
+            with mp.Pool(
+                settings["num_cores"],
+                initializer=initialize_global_search,
+                initargs=initargs + (specs, shared_chi_sq_threshold),
+            ) as pool:
+                for _, chi_sq in imap_unordered_tagged(
+                    pool,
+                    solve_index_for_global_search,
+                    num_parameter_sets,
+                    settings["num_cores"],
+                    settings.get("parallel_chunksize", 0) or None,
+                ):
+                    if top_k > 0:
+                        shared_chi_sq_threshold.value = update_top_chi_sq(
+                            top_chi_sq_heap, chi_sq, top_k
+                        )
+                pool.close()
+                pool.join()
+        chi_sq_array = results["chi_sq"]
+        solutions_array = results["solutions"]
+
+    return chi_sq_array, solutions_array
+
+
+def structure_global_search_results(
+    df_parameters: pd.DataFrame,
+    chi_sq_array: np.ndarray,
+    solutions_array: np.ndarray,
+    x: List[float],
+    exp_data: List[float],
+    exp_error: List[float],
+    settings: dict,
+) -> pd.DataFrame:
+    """
+    Adds the experimental data and global search results to the df of parameter sets
+
+    Parameters
+    ----------
+    df_parameters
+        df with columns defining to parameter identities
+        and rows defining the parameter values for each set in the sweep
+
+    chi_sq_array
+        an array defining the chi_sq value for each parameter set
+        (inf for parameter sets with an aborted evaluation)
+
+    solutions_array
+        an array defining the normalized solutions for each parameter set
+        (rows are parameter sets and columns are data points)
+
+    x
+        a list of floats containing the values of the independent variable
+
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    exp_error
+        a list of floats containing the values of the measurement error
+        for the dependent variable
+
+    settings
+        a dictionary defining the run settings
+
+    Returns
+    -------
+    df_global_search_results
+        df that contains the information in df_parameters,
+        along with an extra column defining the cost function
+        for each parameter set and an "aborted" column defining whether the evaluation
+        of each parameter set was aborted (see solve_global_search_array()), in which case
+        chi_sq is inf and the solutions are nan: chi_sq is only known to be above the
+        early abort threshold, not its value
+
+    """
+    df_global_search_results = df_parameters
+    num_parameter_sets = len(df_global_search_results.index)
+    # added before the other columns, which optimization reads by position from the end
+    df_global_search_results["aborted"] = np.isinf(chi_sq_array)
+    df_global_search_results["x"] = [x] * num_parameter_sets
+    df_global_search_results["exp_data"] = [exp_data] * num_parameter_sets
+    df_global_search_results["exp_error"] = [exp_error] * num_parameter_sets
+    df_global_search_results["dataID"] = [settings["dataID"]] * num_parameter_sets
+    df_global_search_results["weight_by_error"] = [settings["weight_by_error"]] * num_parameter_sets
+    df_global_search_results["parameter_labels"] = [
+        settings["parameter_labels"]
+    ] * num_parameter_sets
+    df_global_search_results["chi_sq"] = chi_sq_array
+    df_global_search_results["normalized solutions"] = solutions_array.tolist()
+
+    return df_global_search_results
+
+
 def solve_global_search(
+    model: Any,
     df_parameters: pd.DataFrame,
     x: List[float],
     exp_data: List[float],
@@ -195,10 +553,13 @@ def solve_global_search(
     settings: dict,
 ) -> pd.DataFrame:
     """
-    Generates parameter sets for global search
+    Solves the model for each parameter set in the global search and structures the results
 
     Parameters
     ----------
+    model
+        object defining the model
+
     df_parameters
         df with columns defining to parameter identities
         and rows defining the parameter values for each set in the sweep
@@ -223,38 +584,744 @@ def solve_global_search(
         for each parameter set
 
     """
-    # Add experimental data items to df
-    df_parameters["x"] = [x] * len(df_parameters.index)
-    df_parameters["exp_data"] = [exp_data] * len(df_parameters.index)
-    df_parameters["exp_error"] = [exp_error] * len(df_parameters.index)
-    df_parameters["dataID"] = [settings["dataID"]] * len(df_parameters.index)
-    df_parameters["weight_by_error"] = [settings["weight_by_error"]] * len(df_parameters.index)
-    df_parameters["parameter_labels"] = [settings["parameter_labels"]] * len(df_parameters.index)
-
     # Solve for each parameter set in global search
-    chi_sq_list = []
-    solutions_list = []
-    if settings["parallelization"] == "no":
-        for row in df_parameters.itertuples(name=None):
-            solutions, chi_sq = solve_single_for_global_search(row)
-            solutions_list.append(solutions)
-            chi_sq_list.append(chi_sq)
+    parameter_array = df_parameters[settings["parameter_labels"]].to_numpy(dtype=float)
+    chi_sq_array, solutions_array = solve_global_search_array(
+        model, parameter_array, x, exp_data, exp_error, settings, np.empty(0)
+    )
 
-    elif settings["parallelization"] == "yes":
-        with mp.Pool(settings["num_cores"]) as pool:
-            result = pool.imap(solve_single_for_global_search, df_parameters.itertuples(name=None))
-            pool.close()
-            pool.join()
-            output = [[list(x[0]), round(x[1], 4)] for x in result]
+    # structure results
+    df_global_search_results = structure_global_search_results(
+        df_parameters, chi_sq_array, solutions_array, x, exp_data, exp_error, settings
+    )
 
-        for _, item in enumerate(output):
-            solutions_list.append(item[0])
-            chi_sq_list.append(item[1])
+    df_global_search_results.to_csv("global search results.csv")
+    return df_global_search_results
 
-    # structure results
-    df_global_search_results = df_parameters
-    df_global_search_results["chi_sq"] = chi_sq_list
-    df_global_search_results["normalized solutions"] = solutions_list
 
+def define_checkpoint_folder(
+    problem_global_search: dict,
+    settings: dict,
+    all_parameters: List[float],
+    x: List[float],
+    exp_data: List[float],
+    exp_error: List[float],
+) -> str:
+    """
+    Defines the folder for the checkpoints of a chunked global search, named by a hash
+    of everything that determines the global search results, so that checkpoints are
+    only reused for the same global search
+
+    Parameters
+    ----------
+    problem_global_search
+        a dictionary including the number, labels, and bounds for the free parameters
+
+    settings
+        a dictionary defining the run settings
+
+    all_parameters
+        a list of floats containing all initial parameter values,
+        including fixed and free parameters
+
+    x
+        a list of floats containing the values of the independent variable
+
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    exp_error
+        a list of floats containing the values of the measurement error
+        for the dependent variable
+
+    Returns
+    -------
+    checkpoint_folder
+        a string defining the path to the checkpoint folder
+
+    """
+    global_search_definition = {
+        "problem": problem_global_search,
+        "all_parameters": all_parameters,
+        "x": x,
+        "exp_data": exp_data,
+        "exp_error": exp_error,
+    }
+    for key in [
+        "num_parameter_sets_global_search",
+        "global_search_chunk_size",
+        "global_search_sampler",
+        "global_search_seed",
+        "global_search_early_abort",
+        "global_search_early_abort_stages",
+        "global_search_top_k",
+        "parameter_labels",
+        "dataID",
+        "weight_by_error",
+        "modelID",
+        "mechanismID",
+        "model_definition",
+        "solve_mode",
+        "solver",
+    ]:
+        global_search_definition[key] = settings.get(key)
+    key_hash = hashlib.sha256(
+        json.dumps(global_search_definition, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:16]
+
+    return os.path.join(settings["context"], "results", "global search checkpoints", key_hash)
+
+
+def load_checkpoint(
+    checkpoint_folder: str, start: int, stop: int
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Loads the results of a chunk of the global search from its checkpoint, if saved
+
+    Parameters
+    ----------
+    checkpoint_folder
+        a string defining the path to the checkpoint folder
+
+    start
+        an int defining the index of the first parameter set in the chunk
+
+    stop
+        an int defining the index after the last parameter set in the chunk
+
+    Returns
+    -------
+    chi_sq_array, solutions_array
+        arrays defining the chi_sq value and normalized solutions for each parameter
+        set in the chunk, or None if the chunk has not been saved
+
+    """
+    filename = os.path.join(checkpoint_folder, "chunk " + str(start) + ".npz")
+    if not os.path.exists(filename):
+        return None
+
+    with np.load(filename) as checkpoint:
+        if not np.array_equal(checkpoint["indices"], np.arange(start, stop)):
+            return None
+        return checkpoint["chi_sq"], checkpoint["solutions"]
+
+
+def save_checkpoint(
+    checkpoint_folder: str,
+    start: int,
+    stop: int,
+    chi_sq_array: np.ndarray,
+    solutions_array: np.ndarray,
+) -> None:
+    """
+    Saves the results of a chunk of the global search as a checkpoint
+
+    Parameters
+    ----------
+    checkpoint_folder
+        a string defining the path to the checkpoint folder
+
+    start
+        an int defining the index of the first parameter set in the chunk
+
+    stop
+        an int defining the index after the last parameter set in the chunk
+
+    chi_sq_array
+        an array defining the chi_sq value for each parameter set in the chunk
+
+    solutions_array
+        an array defining the normalized solutions for each parameter set in the chunk
+
+    Returns
+    -------
+    None
+
+    """
+    os.makedirs(checkpoint_folder, exist_ok=True)
+    filename = os.path.join(checkpoint_folder, "chunk " + str(start) + ".npz")
+
+    # the checkpoint is written to a temporary file first so that
+    # an interrupted save never leaves an incomplete checkpoint
+    with open(filename + ".tmp", "wb") as file:
+        np.savez(
+            file, indices=np.arange(start, stop), chi_sq=chi_sq_array, solutions=solutions_array
+        )
+    os.replace(filename + ".tmp", filename)
+
+
+def solve_global_search_chunked(
+    model: Any,
+    problem_global_search: dict,
+    settings: dict,
+    all_parameters: List[float],
+    x: List[float],
+    exp_data: List[float],
+    exp_error: List[float],
+) -> pd.DataFrame:
+    """
+    Solves the global search in chunks of settings["global_search_chunk_size"] parameter
+    sets, appending the results of each chunk to "parameter sweep.csv" and "global search
+    results.csv" and keeping only the settings["global_search_top_k"] parameter sets
+    with the lowest chi_sq in memory
+
+    If settings["global_search_checkpoints"] is "yes", the results of each chunk are
+    also saved as a checkpoint (see define_checkpoint_folder()) and chunks with a saved
+    checkpoint are loaded instead of solved, so an interrupted global search can be resumed.
+
+    The parameter sets are the same as those from generate_parameter_sets(). For the
+    samplers that can be generated in blocks ("sobol" and "halton"), the parameter sets
+    of each chunk are sampled with the chunk. For the Latin hypercube samplers, the sample
+    (in log scale) is generated for the full sweep at once, because the strata of each
+    parameter are shuffled across the full sweep.
+
+    Parameters
+    ----------
+    model
+        object defining the model
+
+    problem_global_search
+        a dictionary including the number, labels, and bounds for the free parameters
+
+    settings
+        a dictionary defining the run settings
+
+    all_parameters
+        a list of floats containing all initial parameter values,
+        including fixed and free parameters
+
+    x
+        a list of floats containing the values of the independent variable
+
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    exp_error
+        a list of floats containing the values of the measurement error
+        for the dependent variable
+
+    Returns
+    -------
+    df_global_search_results
+        df containing the global search results for the settings["global_search_top_k"]
+        parameter sets with the lowest chi_sq, sorted by chi_sq
+
+    """
+    n_search = settings["num_parameter_sets_global_search"]
+    chunk_size = settings["global_search_chunk_size"]
+    top_k = settings["global_search_top_k"]
+    sampler = settings["global_search_sampler"]
+    if not SAMPLERS[sampler]["extensible"]:
+        param_values_global_search = sample_parameters(
+            problem_global_search, n_search, sampler, settings["global_search_seed"]
+        )
+    free_parameter_indices = [
+        settings["parameter_labels"].index(label) for label in problem_global_search["names"]
+    ]
+    if settings["global_search_checkpoints"] == "yes":
+        checkpoint_folder = define_checkpoint_folder(
+            problem_global_search, settings, all_parameters, x, exp_data, exp_error
+        )
+
+    top_parameters = np.empty((0, len(all_parameters)))
+    top_chi_sq = np.empty(0)
+    top_solutions = np.empty((0, len(exp_data)))
+    for start in range(0, n_search, chunk_size):
+        stop = min(start + chunk_size, n_search)
+
+        # Define the parameter sets in this chunk
+        parameter_array = np.tile(np.asarray(all_parameters, dtype=float), (stop - start, 1))
+        if SAMPLERS[sampler]["extensible"]:
+            param_values_chunk = sample_parameters(
+                problem_global_search,
+                n_search,
+                sampler,
+                settings["global_search_seed"],
+                start,
+                stop,
+            )
+        else:
+            param_values_chunk = param_values_global_search[start:stop]
+        parameter_array[:, free_parameter_indices] = convert_parameters_to_linear(
+            param_values_chunk
+        )
+        checkpoint = None
+        if settings["global_search_checkpoints"] == "yes":
+            checkpoint = load_checkpoint(checkpoint_folder, start, stop)
+        if checkpoint is not None:
+            chi_sq_array, solutions_array = checkpoint
+        else:
+            chi_sq_array, solutions_array = solve_global_search_array(
+                model, parameter_array, x, exp_data, exp_error, settings, top_chi_sq
+            )
+            if settings["global_search_checkpoints"] == "yes":
+                save_checkpoint(checkpoint_folder, start, stop, chi_sq_array, solutions_array)
+
+        # Append the results of this chunk to the results files
+        df_parameters = pd.DataFrame(
+            parameter_array, columns=settings["parameter_labels"], index=range(start, stop)
+        )
+        mode, header = ("w", True) if start == 0 else ("a", False)
+        df_parameters.to_csv("parameter sweep.csv", mode=mode, header=header)
+        structure_global_search_results(
+            df_parameters, chi_sq_array, solutions_array, x, exp_data, exp_error, settings
+        ).to_csv("global search results.csv", mode=mode, header=header)
+
+        # Keep the top_k parameter sets with the lowest chi_sq
+        top_parameters = np.vstack([top_parameters, parameter_array])
+        top_chi_sq = np.concatenate([top_chi_sq, chi_sq_array])
+        top_solutions = np.vstack([top_solutions, solutions_array])
+        order = np.argsort(top_chi_sq, kind="stable")[:top_k]
+        top_parameters = top_parameters[order]
+        top_chi_sq = top_chi_sq[order]
+        top_solutions = top_solutions[order]
+
+        print(
+            "Global search: "
+            + str(stop)
+            + " of "
+            + str(n_search)
+            + " parameter sets solved"
+            + (" (loaded from checkpoint)" if checkpoint is not None else "")
+        )
+
+    df_parameters = pd.DataFrame(top_parameters, columns=settings["parameter_labels"])
+    return structure_global_search_results(
+        df_parameters, top_chi_sq, top_solutions, x, exp_data, exp_error, settings
+    )
+
+
+def shrink_bounds(
+    samples_log: np.ndarray,
+    chi_sq_array: np.ndarray,
+    bounds: List[list],
+    bounds_initial: List[list],
+    num_best: int,
+) -> List[list]:
+    """
+    Defines the bounds for the next round of an adaptive global search as the box
+    containing the num_best parameter sets with the lowest chi_sq, padded on each side
+    by 10% of the width of the current bounds and limited to the initial bounds
+
+    Parameters
+    ----------
+    samples_log
+        an array defining the free parameter values (log scale) of all parameter sets
+        solved so far (rows are parameter sets)
+
+    chi_sq_array
+        an array defining the chi_sq value for each parameter set in samples_log
+
+    bounds
+        a list of lists defining the current bounds (log scale) for each free parameter
+
+    bounds_initial
+        a list of lists defining the initial bounds (log scale) for each free parameter
+
+    num_best
+        an int defining the number of parameter sets used to define the new bounds
+
+    Returns
+    -------
+    bounds_new
+        a list of lists defining the new bounds (log scale) for each free parameter
+
+    """
+    best_samples = samples_log[np.argsort(chi_sq_array, kind="stable")[:num_best]]
+    bounds = np.asarray(bounds, dtype=float)
+    bounds_initial = np.asarray(bounds_initial, dtype=float)
+    padding = 0.1 * (bounds[:, 1] - bounds[:, 0])
+    lower = np.maximum(best_samples.min(axis=0) - padding, bounds_initial[:, 0])
+    upper = np.minimum(best_samples.max(axis=0) + padding, bounds_initial[:, 1])
+
+    return np.column_stack([lower, upper]).tolist()
+
+
+def solve_global_search_adaptive(
+    model: Any,
+    problem_global_search: dict,
+    settings: dict,
+    all_parameters: List[float],
+    x: List[float],
+    exp_data: List[float],
+    exp_error: List[float],
+) -> pd.DataFrame:
+    """
+    Solves an adaptive global search with settings["global_search_rounds"] rounds.
+    Half of the settings["num_parameter_sets_global_search"] parameter sets are drawn
+    with settings["global_search_sampler"] over the full bounds in the first round, and the
+    rest are split evenly across the following rounds, in which they are drawn within bounds
+    shrunk around the settings["global_search_top_k"] parameter sets with the lowest chi_sq
+    so far (see shrink_bounds())
+
+    Parameters
+    ----------
+    model
+        object defining the model
+
+    problem_global_search
+        a dictionary including the number, labels, and bounds for the free parameters
+
+    settings
+        a dictionary defining the run settings
+
+    all_parameters
+        a list of floats containing all initial parameter values,
+        including fixed and free parameters
+
+    x
+        a list of floats containing the values of the independent variable
+
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    exp_error
+        a list of floats containing the values of the measurement error
+        for the dependent variable
+
+    Returns
+    -------
+    df_global_search_results
+        df containing the global search results for the parameter sets from all rounds
+
+    """
+    n_search = settings["num_parameter_sets_global_search"]
+    num_rounds = settings["global_search_rounds"]
+    if num_rounds > 1:
+        num_parameter_sets_round = [n_search - n_search // 2] + [
+            len(i) for i in np.array_split(np.arange(n_search // 2), num_rounds - 1)
+        ]
+    else:
+        num_parameter_sets_round = [n_search]
+    free_parameter_indices = [
+        settings["parameter_labels"].index(label) for label in problem_global_search["names"]
+    ]
+
+    bounds = problem_global_search["bounds"]
+    samples_log = np.empty((0, problem_global_search["num_vars"]))
+    parameter_array = np.empty((0, len(all_parameters)))
+    chi_sq_array = np.empty(0)
+    solutions_array = np.empty((0, len(exp_data)))
+    for round_index, num_parameter_sets in enumerate(num_parameter_sets_round):
+        if num_parameter_sets == 0:
+            continue
+
+        # Define and solve the parameter sets for this round
+        problem_round = dict(problem_global_search, bounds=bounds)
+        samples_log_round = sample_parameters(
+            problem_round,
+            num_parameter_sets,
+            settings["global_search_sampler"],
+            settings["global_search_seed"] + round_index,
+        )
+        parameter_array_round = np.tile(
+            np.asarray(all_parameters, dtype=float), (num_parameter_sets, 1)
+        )
+        parameter_array_round[:, free_parameter_indices] = convert_parameters_to_linear(
+            samples_log_round
+        )
+        chi_sq_array_round, solutions_array_round = solve_global_search_array(
+            model, parameter_array_round, x, exp_data, exp_error, settings, chi_sq_array
+        )
+
+        samples_log = np.vstack([samples_log, samples_log_round])
+        parameter_array = np.vstack([parameter_array, parameter_array_round])
+        chi_sq_array = np.concatenate([chi_sq_array, chi_sq_array_round])
+        solutions_array = np.vstack([solutions_array, solutions_array_round])
+        print(
+            "Global search round "
+            + str(round_index + 1)
+            + ": min chi_sq = "
+            + str(round(float(np.min(chi_sq_array)), 4))
+        )
+
+        # Shrink the bounds around the best parameter sets so far
+        bounds = shrink_bounds(
+            samples_log,
+            chi_sq_array,
+            bounds,
+            problem_global_search["bounds"],
+            settings["global_search_top_k"],
+        )
+
+    df_parameters = pd.DataFrame(parameter_array, columns=settings["parameter_labels"])
+    df_parameters.to_csv("parameter sweep.csv")
+    df_global_search_results = structure_global_search_results(
+        df_parameters, chi_sq_array, solutions_array, x, exp_data, exp_error, settings
+    )
+    df_global_search_results.to_csv("global search results.csv")
+
+    return df_global_search_results
+
+
+def solve_global_search_surrogate(
+    model: Any,
+    problem_global_search: dict,
+    settings: dict,
+    all_parameters: List[float],
+    x: List[float],
+    exp_data: List[float],
+    exp_error: List[float],
+) -> pd.DataFrame:
+    """
+    Solves a global search with surrogate prescreening. Of the
+    settings["num_parameter_sets_global_search"] candidate parameter sets, a pilot fraction
+    (settings["global_search_surrogate_pilot_fraction"]) is solved and used to fit a regressor
+    from the free parameter values (log scale) to log10(chi_sq). A fraction
+    (settings["global_search_surrogate_solve_fraction"]) of the other candidates is then solved:
+    those with the lowest predicted chi_sq, plus a random fraction
+    (settings["global_search_surrogate_exploration"]) of the rest. The agreement between the
+    ranking of the surrogate and the true ranking of the solved candidates is printed, and
+    the predictions are saved in "global search surrogate.csv". With early abort, candidates
+    with an aborted evaluation are left out of the agreement (their number is printed).
+
+    Parameters
+    ----------
+    model
+        object defining the model
+
+    problem_global_search
+        a dictionary including the number, labels, and bounds for the free parameters
+
+    settings
+        a dictionary defining the run settings
+
+    all_parameters
+        a list of floats containing all initial parameter values,
+        including fixed and free parameters
+
+    x
+        a list of floats containing the values of the independent variable
+
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    exp_error
+        a list of floats containing the values of the measurement error
+        for the dependent variable
+
+    Returns
+    -------
+    df_global_search_results
+        df containing the global search results for the solved parameter sets
+        (the pilot parameter sets followed by the prescreened parameter sets)
+
+    """
+    n_search = settings["num_parameter_sets_global_search"]
+    num_pilot = min(
+        n_search, max(2, int(round(settings["global_search_surrogate_pilot_fraction"] * n_search)))
+    )
+    samples_log = sample_parameters(
+        problem_global_search,
+        n_search,
+        settings["global_search_sampler"],
+        settings["global_search_seed"],
+    )
+    parameter_array = np.tile(np.asarray(all_parameters, dtype=float), (n_search, 1))
+    free_parameter_indices = [
+        settings["parameter_labels"].index(label) for label in problem_global_search["names"]
+    ]
+    parameter_array[:, free_parameter_indices] = convert_parameters_to_linear(samples_log)
+
+    # Solve the pilot parameter sets and fit the surrogate
+    chi_sq_pilot, solutions_pilot = solve_global_search_array(
+        model, parameter_array[:num_pilot], x, exp_data, exp_error, settings
+    )
+    surrogate = fit_surrogate(
+        samples_log[:num_pilot],
+        chi_sq_pilot,
+        settings["global_search_surrogate_model"],
+        settings["global_search_seed"],
+    )
+
+    # Solve the candidates ranked as promising, plus the exploration candidates
+    predicted_log_chi_sq = surrogate.predict(samples_log[num_pilot:])
+    num_selected = int(
+        round(settings["global_search_surrogate_solve_fraction"] * (n_search - num_pilot))
+    )
+    exploit_indices, explore_indices = select_candidates(
+        predicted_log_chi_sq,
+        num_selected,
+        settings["global_search_surrogate_exploration"],
+        settings["global_search_seed"],
+    )
+    selected_indices = np.concatenate([exploit_indices, explore_indices])
+    chi_sq_selected, solutions_selected = solve_global_search_array(
+        model,
+        parameter_array[num_pilot + selected_indices],
+        x,
+        exp_data,
+        exp_error,
+        settings,
+        chi_sq_pilot,
+    )
+
+    # Report the agreement between the surrogate and the true ranking
+    df_surrogate = pd.DataFrame(
+        {
+            "selection": ["promising"] * len(exploit_indices)
+            + ["exploration"] * len(explore_indices),
+            "predicted chi_sq": 10 ** predicted_log_chi_sq[selected_indices],
+            "chi_sq": chi_sq_selected,
+            "aborted": np.isinf(chi_sq_selected),
+        }
+    )
+    df_surrogate.to_csv("global search surrogate.csv")
+    pairwise_agreement, spearman = calc_ranking_agreement(
+        predicted_log_chi_sq[selected_indices], chi_sq_selected
+    )
+    pairwise_agreement_exploration, _ = calc_ranking_agreement(
+        predicted_log_chi_sq[explore_indices], chi_sq_selected[len(exploit_indices) :]
+    )
+    print(
+        "Surrogate prescreen: solved "
+        + str(num_pilot + len(selected_indices))
+        + " of "
+        + str(n_search)
+        + " parameter sets, ranking agreement = "
+        + str(round(pairwise_agreement, 3))
+        + " (exploration candidates: "
+        + str(round(pairwise_agreement_exploration, 3))
+        + "), Spearman = "
+        + str(round(spearman, 3))
+        + " ("
+        + str(int(np.sum(np.isinf(chi_sq_selected))))
+        + " aborted parameter sets left out)"
+    )
+
+    solved_indices = np.concatenate([np.arange(num_pilot), num_pilot + selected_indices])
+    df_parameters = pd.DataFrame(
+        parameter_array[solved_indices], columns=settings["parameter_labels"]
+    )
+    df_parameters.to_csv("parameter sweep.csv")
+    df_global_search_results = structure_global_search_results(
+        df_parameters,
+        np.concatenate([chi_sq_pilot, chi_sq_selected]),
+        np.vstack([solutions_pilot, solutions_selected]),
+        x,
+        exp_data,
+        exp_error,
+        settings,
+    )
     df_global_search_results.to_csv("global search results.csv")
+
     return df_global_search_results
+
+
+def run_global_search(
+    model: Any,
+    problem_global_search: dict,
+    settings: dict,
+    all_parameters: List[float],
+    x: List[float],
+    exp_data: List[float],
+    exp_error: List[float],
+) -> pd.DataFrame:
+    """
+    Generates and solves the parameter sets for the global search, either all at
+    once or in chunks (with optional checkpoints) if settings["global_search_chunk_size"] is set,
+    or in successive rounds if settings["global_search_method"] is "adaptive", or with
+    surrogate prescreening if settings["global_search_method"] is "surrogate". Checkpoints
+    are saved for each chunk, so they raise a ValueError without chunks.
+
+    Parameters
+    ----------
+    model
+        object defining the model
+
+    problem_global_search
+        a dictionary including the number, labels, and bounds for the free parameters
+
+    settings
+        a dictionary defining the run settings
+
+    all_parameters
+        a list of floats containing all initial parameter values,
+        including fixed and free parameters
+
+    x
+        a list of floats containing the values of the independent variable
+
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    exp_error
+        a list of floats containing the values of the measurement error
+        for the dependent variable
+
+    Returns
+    -------
+    df_global_search_results
+        df containing the global search results
+
+    """
+    if "global_search_chunk_size" not in settings:
+        settings["global_search_chunk_size"] = 0
+
+    if "global_search_top_k" not in settings:
+        num_pem_evaluation_datasets = settings.get("num_pem_evaluation_datasets", 0)
+        settings["global_search_top_k"] = (
+            settings["num_parameter_sets_optimization"] + num_pem_evaluation_datasets
+        )
+
+    if "global_search_checkpoints" not in settings:
+        settings["global_search_checkpoints"] = "no"
+
+    if "global_search_sampler" not in settings:
+        settings["global_search_sampler"] = "latin"
+
+    if "global_search_seed" not in settings:
+        settings["global_search_seed"] = GLOBAL_SEARCH_SEED
+
+    if "global_search_method" not in settings:
+        settings["global_search_method"] = "LHS"
+
+    if "global_search_rounds" not in settings:
+        settings["global_search_rounds"] = 4
+
+    if "parallel_chunksize" not in settings:
+        settings["parallel_chunksize"] = 0
+
+    if "global_search_early_abort" not in settings:
+        settings["global_search_early_abort"] = "no"
+
+    if "global_search_early_abort_stages" not in settings:
+        settings["global_search_early_abort_stages"] = 1
+
+    if "global_search_surrogate_model" not in settings:
+        settings["global_search_surrogate_model"] = "gradient boosting"
+
+    if "global_search_surrogate_pilot_fraction" not in settings:
+        settings["global_search_surrogate_pilot_fraction"] = 0.1
+
+    if "global_search_surrogate_solve_fraction" not in settings:
+        settings["global_search_surrogate_solve_fraction"] = 0.2
+
+    if "global_search_surrogate_exploration" not in settings:
+        settings["global_search_surrogate_exploration"] = 0.2
+
+    if settings["global_search_checkpoints"] == "yes" and (
+        settings["global_search_method"] != "LHS" or settings["global_search_chunk_size"] <= 0
+    ):
+        raise ValueError(
+            'global_search_checkpoints "yes" requires global_search_method "LHS" and '
+            + "global_search_chunk_size > 0, because checkpoints are saved for each chunk"
+        )
+
+    if settings["global_search_method"] == "adaptive":
+        return solve_global_search_adaptive(
+            model, problem_global_search, settings, all_parameters, x, exp_data, exp_error
+        )
+
+    if settings["global_search_method"] == "surrogate":
+        return solve_global_search_surrogate(
+            model, problem_global_search, settings, all_parameters, x, exp_data, exp_error
+        )
+
+    if settings["global_search_chunk_size"] > 0:
+        return solve_global_search_chunked(
+            model, problem_global_search, settings, all_parameters, x, exp_data, exp_error
+        )
+
+    df_parameters = generate_parameter_sets(problem_global_search, settings, all_parameters)
+    return solve_global_search(model, df_parameters, x, exp_data, exp_error, settings)
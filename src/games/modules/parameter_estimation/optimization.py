@@ -5,15 +5,22 @@ Created on Fri Jun  3 15:25:37 2022
 
 @author: kate
 """
-from typing import Tuple, Type, List, Any
+from typing import Tuple, Type, List, Any, Optional
+from contextlib import ExitStack
 import multiprocessing as mp
+import time
 import numpy as np
 import pandas as pd
 import lmfit
-from lmfit import Model as Model_lmfit
 from lmfit import Parameters as Parameters_lmfit
-from games.models.set_model import model
 from games.modules.solve_single import solve_single_parameter_set
+from games.utilities.cache import configure_cache, configure_cache_from_settings
+from games.utilities.parallel import (
+    attach_shared_arrays,
+    imap_unordered_tagged,
+    shared_arrays,
+)
+from games.utilities.saving import save_optimization_trajectories
 from games.plots.plots_parameter_estimation import (
     plot_parameter_distributions_after_optimization,
     plot_chi_sq_trajectory,
@@ -55,13 +62,16 @@ def generalize_parameter_labels(
 
 
 def define_best_optimization_results(
-    df_optimization_results: pd.DataFrame, run_type: str, settings: dict
+    model: Any, df_optimization_results: pd.DataFrame, run_type: str, settings: dict
 ) -> Tuple[float, float, List[float]]:
     """Prints best parameter set from optimization to
     console and plots the best fit to training data
 
     Parameters
     ----------
+    model
+        object defining the model
+
     df_optimization_results
         df containing the results of all optimization runs
 
@@ -124,13 +134,20 @@ def define_best_optimization_results(
 
 
 def optimize_all(
-    df_global_search_results: pd.DataFrame, settings: dict, problem: dict, run_type: str = "default"
+    model: Any,
+    df_global_search_results: pd.DataFrame,
+    settings: dict,
+    problem: dict,
+    run_type: str = "default",
 ) -> Tuple[float, float, pd.DataFrame, List[float]]:
 
     """Runs optimization for each initial guess and saves results
 
     Parameters
     ----------
+    model
+        object defining the model
+
     df_global_search_results
         df containing the results of the global search
 
@@ -169,6 +186,20 @@ def optimize_all(
     df_global_search_results["optimization_method"] = ([settings["optimization_method"]] * 
                                                        len(df_global_search_results.index)
     )
+
+    if "optimizer_jacobian" not in settings:
+        settings["optimizer_jacobian"] = "finite difference"
+
+    df_global_search_results["optimizer_jacobian"] = [settings["optimizer_jacobian"]] * len(
+        df_global_search_results.index
+    )
+
+    if "optimization_parameter_scale" not in settings:
+        settings["optimization_parameter_scale"] = "linear"
+
+    df_global_search_results["optimization_parameter_scale"] = [
+        settings["optimization_parameter_scale"]
+    ] * len(df_global_search_results.index)
     if run_type != "ppl threshold":
         df_global_search_results = df_global_search_results.sort_values(by=["chi_sq"])
         df_global_search_results = df_global_search_results.reset_index(drop=True)
@@ -184,27 +215,103 @@ def optimize_all(
         # add run_type settings to df
         df_global_search_results["run_type"] = [run_type] * settings["num_noise_realizations"]
 
+    if "parallel_chunksize" not in settings:
+        settings["parallel_chunksize"] = 0
+
+    if "optimization_pruning" not in settings:
+        settings["optimization_pruning"] = "no"
+
+    if "optimization_pruning_radius" not in settings:
+        settings["optimization_pruning_radius"] = 0.05
+
+    if "optimization_pruning_dominance" not in settings:
+        settings["optimization_pruning_dominance"] = 10
+
+    if "optimization_trajectories" not in settings:
+        settings["optimization_trajectories"] = "no"
+    record_trajectories = settings["optimization_trajectories"] == "yes"
+
+    cache_settings = configure_cache(settings)
+
+    # basins found by the completed runs, shared by all runs (each "ppl threshold" run is
+    # fit to a different noise realization, so those runs are never pruned)
+    pruning = None
+    if settings["optimization_pruning"] == "yes" and run_type != "ppl threshold":
+        pruning = {
+            "basins": [],
+            "radius": settings["optimization_pruning_radius"],
+            "dominance": settings["optimization_pruning_dominance"],
+        }
+
     all_opt_results = []
     if settings["parallelization"] == "no":
-        for row in df_global_search_results.itertuples(name=None):
-            results_row, results_row_labels = optimize_single_initial_guess(row)
-            all_opt_results.append(results_row)
+        _optimization_data["pruning"] = pruning
+        _optimization_data["record_trajectories"] = record_trajectories
+        try:
+            for row in df_global_search_results.itertuples(name=None):
+                results_row, results_row_labels = optimize_single_initial_guess(model, row)
+                all_opt_results.append(results_row)
+        finally:
+            _optimization_data["pruning"] = None
+            _optimization_data["record_trajectories"] = False
 
     elif settings["parallelization"] == "yes":
-        with mp.Pool(settings["num_cores"]) as pool:
-            result = pool.imap(
-                optimize_single_initial_guess,
-                df_global_search_results.itertuples(name=None),
-            )
-            pool.close()
-            pool.join()
-            output = [[list(x[0]), list(x[1])] for x in result]
+        # the initial guesses and data are shared with the workers, so each task is a row index
+        num_rows = len(df_global_search_results.index)
+        arrays = {
+            "parameters": df_global_search_results[settings["parameter_labels"]].to_numpy(
+                dtype=float
+            ),
+            "x": np.array(list(df_global_search_results["x"]), dtype=float),
+            "exp_data": np.array(list(df_global_search_results["exp_data"]), dtype=float),
+            "exp_error": np.array(list(df_global_search_results["exp_error"]), dtype=float),
+        }
+        row_settings = [
+            settings["dataID"],
+            settings["weight_by_error"],
+            settings["parameter_labels"],
+            problem,
+            settings["optimization_method"],
+            settings["optimizer_jacobian"],
+            settings["optimization_parameter_scale"],
+            run_type,
+        ]
+        with ExitStack() as stack:
+            specs, _ = stack.enter_context(shared_arrays(arrays))
+            if pruning is not None:
+                pruning["basins"] = stack.enter_context(mp.Manager()).list()
+            with mp.Pool(
+                settings["num_cores"],
+                initializer=initialize_optimization,
+                initargs=(
+                    model,
+                    row_settings,
+                    specs,
+                    pruning,
+                    cache_settings,
+                    record_trajectories,
+                ),
+            ) as pool:
+                # runs are collected as they finish and stored in the order of the rows
+                output = [None] * num_rows
+                for index, item in imap_unordered_tagged(
+                    pool,
+                    optimize_index,
+                    num_rows,
+                    settings["num_cores"],
+                    settings["parallel_chunksize"] or None,
+                ):
+                    output[index] = item
+                pool.close()
+                pool.join()
         for _, item in enumerate(output):
-            all_opt_results.append(item[0])
-        results_row_labels = output[0][1]
+            all_opt_results.append(list(item[0]))
+        results_row_labels = list(output[0][1])
 
     print("Optimization complete.")
     df_optimization_results = pd.DataFrame(all_opt_results, columns=results_row_labels)
+    if pruning is not None:
+        print_pruning_summary(df_optimization_results)
     if run_type != "ppl threshold":
         df_optimization_results = df_optimization_results.sort_values(by=["chi_sq"], ascending=True)
         df_optimization_results = df_optimization_results.reset_index(drop=True)
@@ -215,7 +322,7 @@ def optimize_all(
     df_optimization_results["exp_error"] = df_global_search_results["exp_error"]
 
     r_sq_opt, chi_sq_opt_min, best_case_parameters = define_best_optimization_results(
-        df_optimization_results, run_type, settings
+        model, df_optimization_results, run_type, settings
     )
     if run_type == "default":
         plot_parameter_distributions_after_optimization(
@@ -224,7 +331,16 @@ def optimize_all(
         if settings["modelID"] == "synTF_chem" and settings["dataID"] == "ligand dose response":
             plot_training_data_fits(df_optimization_results)
 
-    df_optimization_results.to_csv("optimization results.csv")
+    if record_trajectories:
+        # the CSV holds only scalars and references to the trajectory file
+        save_optimization_trajectories(
+            df_optimization_results,
+            settings["parameter_labels"],
+            "optimization trajectories.npz",
+        ).to_csv("optimization results.csv")
+        df_optimization_results = df_optimization_results.drop(columns=["trajectory"])
+    else:
+        df_optimization_results.to_csv("optimization results.csv")
 
     return r_sq_opt, chi_sq_opt_min, df_optimization_results, best_case_parameters
 
@@ -234,6 +350,7 @@ def define_parameters_for_opt(
     free_parameter_labels: List[str],
     free_parameter_bounds: List[list],
     parameter_labels: List[str],
+    parameter_scale: str = "linear",
 ) -> Tuple[List[bool], Type[Parameters_lmfit]]:
     """Defines parameters for optimization with structure necessary for LMFit optimization code
 
@@ -251,6 +368,10 @@ def define_parameters_for_opt(
     parameter_labels
         a lists of strings containing the labels for all parameters
 
+    parameter_scale
+        a string defining whether the free parameters are optimized in linear scale
+        ("linear") or as log10 values ("log"), the fixed parameters are always in linear scale
+
     Returns
     -------
     vary_list
@@ -272,6 +393,7 @@ def define_parameters_for_opt(
     bound_min_list = [0] * num_parameters
     bound_max_list = [np.inf] * num_parameters
     vary_list = [False] * num_parameters
+    values = list(initial_parameters[:num_parameters])
 
     # Set min and max bounds and vary_index by comparing free parameters
     # lists with list of all parameters
@@ -281,39 +403,52 @@ def define_parameters_for_opt(
             # if param is free param, change vary to True and update bounds
             if param_label == free_param_label:
                 vary_list[param_index] = True
-                bound_min_list[param_index] = 10 ** free_parameter_bounds[free_param_index][0]
-                bound_max_list[param_index] = 10 ** free_parameter_bounds[free_param_index][1]
+                if parameter_scale == "log":
+                    values[param_index] = np.log10(initial_parameters[param_index])
+                    bound_min_list[param_index] = free_parameter_bounds[free_param_index][0]
+                    bound_max_list[param_index] = free_parameter_bounds[free_param_index][1]
+                else:
+                    bound_min_list[param_index] = 10 ** free_parameter_bounds[free_param_index][0]
+                    bound_max_list[param_index] = 10 ** free_parameter_bounds[free_param_index][1]
 
     # Add parameters to the parameters class
     params_for_opt = Parameters_lmfit()
     for index_param, param_label in enumerate(general_parameter_labels):
         params_for_opt.add(
             param_label,
-            value=initial_parameters[index_param],
+            value=values[index_param],
             vary=vary_list[index_param],
             min=bound_min_list[index_param],
             max=bound_max_list[index_param],
         )
 
-    for null_index in range(len(general_parameter_labels), 10):
-        params_for_opt.add("p_" + str(null_index + 1), value=0, vary=False, min=0, max=1)
-
     return vary_list, params_for_opt
 
 
 def define_results_row(
-    results: lmfit.model.ModelResult,
+    model: Any,
+    results: lmfit.minimizer.MinimizerResult,
+    best_parameters: List[float],
     initial_parameters: List[float],
     chi_sq_list: List[float],
     data_information: List[list],
     results_row_settings: List,
+    trajectory: Optional[dict] = None,
 ) -> Tuple[List[Any], List[str]]:
     """Defines results for each optimization run
 
     Parameters
     ----------
+    model
+        object defining the model
+
     results
         a results class containing results of the given optimization run
+        (aborted is True if the run was pruned, and evaluations_saved is the estimated
+        number of model evaluations saved by pruning)
+
+    best_parameters
+        a list of floats containing the optimized values of each parameter (linear scale)
 
     initial_parameters
         a list of floats containing the initial guesses for each parameter
@@ -343,6 +478,11 @@ def define_results_row(
         weight_by_error
             a string defining whether the cost function should be weighted by error or not
 
+    trajectory
+        a dictionary defining the number of the optimization run ("run"), the parameters
+        ("parameters", one row per function evaluation) and the time since the start of
+        the run ("time") for each function evaluation, or None if not recorded
+
     Returns
     -------
     results_row
@@ -363,14 +503,13 @@ def define_results_row(
         results_row_labels.append(parameter_labels[i])
 
     # Solve ODEs with final optimized parameters
-    model.parameters = list(results.params.valuesdict().values())[: len(initial_parameters)]
     [x, exp_data, exp_error] = data_information
     solutions_norm, chi_sq, r_sq = solve_single_parameter_set(
-        x, exp_data, exp_error, dataID, weight_by_error, parameter_labels
+        model, best_parameters, x, exp_data, exp_error, dataID, weight_by_error, parameter_labels
     )
 
     # append best fit parameters to results_row for saving
-    for index, best_val in enumerate(model.parameters):
+    for index, best_val in enumerate(best_parameters):
         results_row.append(best_val)
         label = parameter_labels[index] + "*"
         results_row_labels.append(label)
@@ -379,17 +518,33 @@ def define_results_row(
     # Results.redchi_sq is the chi2 value directly from LMFit.
     # Results.redchi_sq * the number of data points should match the
     # chi_sq calculated in this code
-    items = [chi_sq, r_sq, results.redchi, results.success, model, chi_sq_list, solutions_norm]
+    items = [
+        chi_sq,
+        r_sq,
+        results.redchi,
+        results.success,
+        bool(getattr(results, "aborted", False)),
+        getattr(results, "evaluations_saved", 0),
+        model.with_parameters(best_parameters),
+        chi_sq_list,
+        solutions_norm,
+    ]
     item_labels = [
         "chi_sq",
         "r_sq",
         "redchi_sq",
         "success",
+        "pruned",
+        "evaluations saved",
         "model",
         "chi_sq_list",
         "Simulation results",
     ]
 
+    if trajectory is not None:
+        items += [trajectory["run"], trajectory]
+        item_labels += ["run", "trajectory"]
+
     for i, item in enumerate(items):
         results_row.append(item)
         results_row_labels.append(item_labels[i])
@@ -397,11 +552,197 @@ def define_results_row(
     return results_row, results_row_labels
 
 
-def optimize_single_initial_guess(row: tuple) -> Tuple[List[Any], List[Any]]:
+# minimum number of model evaluations before an optimization run can be pruned, which is
+# also the number of evaluations over which a run is checked for progress
+PRUNING_WINDOW = 20
+
+
+class OptimizationPruned(Exception):
+    """Raised in the residual function to stop an optimization run that is pruned"""
+
+
+def check_pruning(
+    log_parameters: np.ndarray,
+    chi_sq_list: List[float],
+    basins: List[dict],
+    radius: float,
+    dominance: float,
+) -> Optional[int]:
+    """Checks whether an optimization run should be stopped, either because the best
+    parameters of the run are within radius of a basin already found by another run, or
+    because the lowest chi_sq of the run is more than dominance times the lowest chi_sq of the
+    basins and has improved by less than 1% in the last PRUNING_WINDOW model evaluations
+
+    Parameters
+    ----------
+    log_parameters
+        an array defining the free parameter values (log scale) with the lowest chi_sq so far
+        in the run
+
+    chi_sq_list
+        a list of floats defining the chi_sq value of each model evaluation in the run
+
+    basins
+        a list of dictionaries defining the free parameter values (log scale, "parameters"),
+        the chi_sq value ("chi_sq"), the number of model evaluations ("num_evaluations") and
+        the number of model evaluations within radius of the end point
+        ("num_evaluations_in_radius") of each completed run
+
+    radius
+        a float defining the largest difference (log scale) of any free parameter from
+        a basin for the run to be heading into that basin
+
+    dominance
+        a float defining the ratio of the lowest chi_sq of the run to the lowest chi_sq of
+        the basins above which a run that has stopped improving is stopped
+
+    Returns
+    -------
+    evaluations_saved
+        an int defining the estimated number of model evaluations saved by stopping the run
+        (the evaluations the run of the basin needed to converge from within radius, or the
+        median number of evaluations of the completed runs minus the evaluations so far),
+        or None if the run should continue
+
+    """
+    if len(chi_sq_list) <= PRUNING_WINDOW or len(basins) == 0:
+        return None
+
+    distances = [np.max(np.abs(basin["parameters"] - log_parameters)) for basin in basins]
+    if np.min(distances) < radius:
+        return int(basins[int(np.argmin(distances))]["num_evaluations_in_radius"])
+
+    best_chi_sq = np.nanmin(chi_sq_list)
+    improvement = np.nanmin(chi_sq_list[:-PRUNING_WINDOW]) - best_chi_sq
+    if improvement < 0.01 * best_chi_sq and best_chi_sq > dominance * min(
+        basin["chi_sq"] for basin in basins
+    ):
+        num_evaluations = np.median([basin["num_evaluations"] for basin in basins])
+        return int(max(0, num_evaluations - len(chi_sq_list)))
+
+    return None
+
+
+def print_pruning_summary(df_optimization_results: pd.DataFrame) -> None:
+    """Prints the number of pruned optimization runs and the estimated number of model
+    evaluations saved (see check_pruning())
+
+    Parameters
+    ----------
+    df_optimization_results
+        df containing the results of all optimization runs
+
+    Returns
+    -------
+    None
+
+    """
+    print(
+        "Pruned "
+        + str(int(df_optimization_results["pruned"].sum()))
+        + " of "
+        + str(len(df_optimization_results.index))
+        + " optimization runs ("
+        + str(int(df_optimization_results["chi_sq_list"].apply(len).sum()))
+        + " model evaluations, about "
+        + str(int(df_optimization_results["evaluations saved"].sum()))
+        + " saved)"
+    )
+
+
+# model, settings and shared arrays used by optimize_index() in the current process,
+# defined once per worker by initialize_optimization()
+_optimization_data: dict = {}
+
+
+def initialize_optimization(
+    model: Any,
+    row_settings: list,
+    shared_array_specs: dict,
+    pruning: Optional[dict] = None,
+    cache_settings: Optional[dict] = None,
+    record_trajectories: bool = False,
+) -> None:
+    """Stores the model, the settings and the shared arrays used for each initial guess in
+    optimization - used as the initializer for each worker process
+
+    Parameters
+    ----------
+    model
+        object defining the model
+
+    row_settings
+        a list defining the settings that are the same for each initial guess
+        (dataID, weight_by_error, parameter_labels, problem, optimization_method,
+        optimizer_jacobian, optimization_parameter_scale and run_type)
+
+    shared_array_specs
+        a dictionary defining the shared memory arrays with the initial guesses ("parameters")
+        and the data ("x", "exp_data", "exp_error") for each initial guess
+        (see games.utilities.parallel.share_arrays())
+
+    pruning
+        a dictionary defining the basins found so far ("basins", a list shared by
+        the worker processes), "radius" and "dominance" (see check_pruning()),
+        or None to run each initial guess to convergence
+
+    cache_settings
+        a dictionary defining the settings of the solution cache of the worker process
+        (see games.utilities.cache.configure_cache()), or None to leave the cache unchanged
+
+    record_trajectories
+        a bool defining whether the parameters and time of each function evaluation
+        are recorded (see games.utilities.saving.save_optimization_trajectories())
+
+    Returns
+    -------
+    None
+
+    """
+    configure_cache_from_settings(cache_settings)
+    _optimization_data["model"] = model
+    _optimization_data["row_settings"] = row_settings
+    _optimization_data["arrays"] = attach_shared_arrays(shared_array_specs)
+    _optimization_data["pruning"] = pruning
+    _optimization_data["record_trajectories"] = record_trajectories
+
+
+def optimize_index(index: int) -> Tuple[List[Any], List[Any]]:
+    """Runs optimization for the initial guess with the given index in the shared arrays
+    (defined by initialize_optimization())
+
+    Parameters
+    ----------
+    index
+        an int defining the index of the initial guess
+
+    Returns
+    -------
+    results_row
+        a list of floats and lists containing the results for the given optimization run
+
+    results_row_labels
+        a list of strings defining the labels for each item in results_row
+
+    """
+    arrays = _optimization_data["arrays"]
+    return optimize_initial_guess(
+        _optimization_data["model"],
+        index + 1,
+        list(arrays["parameters"][index]),
+        [list(arrays[key][index]) for key in ["x", "exp_data", "exp_error"]],
+        _optimization_data["row_settings"],
+    )
+
+
+def optimize_single_initial_guess(model: Any, row: tuple) -> Tuple[List[Any], List[Any]]:
     """Runs optimization for a single initial guess
 
     Parameters
     ----------
+    model
+        object defining the model
+
     row
         a tuple of floats containing the initial guesses for each parameter
         (represents a row of the global search results)
@@ -414,7 +755,6 @@ def optimize_single_initial_guess(row: tuple) -> Tuple[List[Any], List[Any]]:
     results_row_labels
         a list of strings defining the labels for each item in results_row"""
 
-    count = row[0] + 1
     [
         x,
         exp_data,
@@ -426,67 +766,224 @@ def optimize_single_initial_guess(row: tuple) -> Tuple[List[Any], List[Any]]:
         _,
         problem,
         optimization_method,
+        optimizer_jacobian,
+        optimization_parameter_scale,
         run_type,
-    ] = row[-11:]
+    ] = row[-13:]
     initial_parameters = list(row[1 : len(parameter_labels) + 1])
+
+    return optimize_initial_guess(
+        model,
+        row[0] + 1,
+        initial_parameters,
+        [x, exp_data, exp_error],
+        [
+            dataID,
+            weight_by_error,
+            parameter_labels,
+            problem,
+            optimization_method,
+            optimizer_jacobian,
+            optimization_parameter_scale,
+            run_type,
+        ],
+    )
+
+
+def optimize_initial_guess(
+    model: Any,
+    count: int,
+    initial_parameters: List[float],
+    data_information: List[list],
+    row_settings: list,
+) -> Tuple[List[Any], List[Any]]:
+    """Runs optimization for a single initial guess
+
+    Parameters
+    ----------
+    model
+        object defining the model
+
+    count
+        an int defining the number of the optimization run (used for printing)
+
+    initial_parameters
+        a list of floats containing the initial guesses for each parameter
+
+    data_information
+        a list of lists containing x, exp_data, and exp_error
+
+    row_settings
+        a list defining dataID, weight_by_error, parameter_labels, problem,
+        optimization_method, optimizer_jacobian, optimization_parameter_scale and run_type
+
+    Returns
+    -------
+    results_row
+        a list of floats and lists containing the results for the given optimization run
+
+    results_row_labels
+        a list of strings defining the labels for each item in results_row"""
+
+    [x, exp_data, exp_error] = data_information
+    [
+        dataID,
+        weight_by_error,
+        parameter_labels,
+        problem,
+        optimization_method,
+        optimizer_jacobian,
+        optimization_parameter_scale,
+        run_type,
+    ] = row_settings
     free_parameter_bounds = problem["bounds"]
     free_parameter_labels = problem["names"]
 
+    general_parameter_labels, _ = generalize_parameter_labels(
+        parameter_labels, free_parameter_labels
+    )
+    free_parameter_indices = [
+        i for i, label in enumerate(parameter_labels) if label in free_parameter_labels
+    ]
+    # free parameters optimized as log10 values, converted to linear scale for the model
+    log_scale = np.zeros(len(parameter_labels), dtype=bool)
+    if optimization_parameter_scale == "log":
+        log_scale[free_parameter_indices] = True
+    exp_data_array = np.asarray(exp_data, dtype=float)
+    if weight_by_error == "no":
+        weights = np.ones(len(exp_error))
+    elif weight_by_error == "yes":
+        weights = 1 / np.asarray(exp_error, dtype=float)
+
     chi_sq_list = []
+    pruning = _optimization_data.get("pruning")
+    best_evaluation = {"chi_sq": np.inf, "parameters": None}
+    log_parameters_list = []
+    trajectory = None
+    if _optimization_data.get("record_trajectories", False):
+        trajectory = {"run": count, "parameters": [], "time": []}
+    start_time = time.perf_counter()
+
+    def define_parameter_array(params: Type[Parameters_lmfit]) -> np.ndarray:
+        parameters = np.fromiter(
+            (params[label].value for label in general_parameter_labels),
+            dtype=float,
+            count=len(general_parameter_labels),
+        )
+        parameters[log_scale] = 10 ** parameters[log_scale]
+        return parameters
 
-    def solve_for_opt(
-        x: List[float],
-        p_1: float = 0,
-        p_2: float = 0,
-        p_3: float = 0,
-        p_4: float = 0,
-        p_5: float = 0,
-        p_6: float = 0,
-        p_7: float = 0,
-        p_8: float = 0,
-        p_9: float = 0,
-        p_10: float = 0,
-    ) -> np.ndarray:
-        p_opt = [p_1, p_2, p_3, p_4, p_5, p_6, p_7, p_8, p_9, p_10]
-        model.parameters = p_opt[: len(parameter_labels)]
+    def residuals_for_opt(params: Type[Parameters_lmfit]) -> np.ndarray:
+        # weighted residuals (same as lmfit Model.fit): (simulation - data) * weights
+        parameters = define_parameter_array(params)
         solutions_norm, chi_sq, _ = solve_single_parameter_set(
-            x, exp_data, exp_error, dataID, weight_by_error, parameter_labels
+            model,
+            parameters,
+            x,
+            exp_data,
+            exp_error,
+            dataID,
+            weight_by_error,
+            parameter_labels,
         )
         chi_sq_list.append(chi_sq)
-        return np.array(solutions_norm)
+        if trajectory is not None:
+            trajectory["parameters"].append(parameters)
+            trajectory["time"].append(time.perf_counter() - start_time)
+        if pruning is not None:
+            log_parameters_list.append(np.log10(parameters[free_parameter_indices]))
+            if chi_sq < best_evaluation["chi_sq"]:
+                best_evaluation["chi_sq"] = chi_sq
+                best_evaluation["parameters"] = parameters
+            if best_evaluation["parameters"] is not None:
+                evaluations_saved = check_pruning(
+                    np.log10(best_evaluation["parameters"][free_parameter_indices]),
+                    chi_sq_list,
+                    list(pruning["basins"]),
+                    pruning["radius"],
+                    pruning["dominance"],
+                )
+                if evaluations_saved is not None:
+                    raise OptimizationPruned(evaluations_saved)
+        return (np.asarray(solutions_norm) - exp_data_array) * weights
+
+    def jacobian_for_opt(params: Type[Parameters_lmfit]) -> np.ndarray:
+        # Jacobian of the weighted residuals with respect to the free parameters,
+        # calculated by solving the forward sensitivity equations
+        parameters = define_parameter_array(params)
+        given_model = model.with_parameters(parameters)
+        solutions, sensitivities = given_model.solve_experiment_sensitivities(
+            x, dataID, parameter_labels
+        )
+        sensitivities_norm = given_model.normalize_sensitivities(solutions, sensitivities, dataID)
+        jacobian = sensitivities_norm[:, free_parameter_indices] * weights[:, None]
+        if optimization_parameter_scale == "log":
+            # d/d(log10 p) = ln(10) * p * d/dp
+            jacobian = jacobian * (np.log(10) * parameters[free_parameter_indices])
+        return jacobian
 
     _, params_for_opt = define_parameters_for_opt(
         initial_parameters,
         free_parameter_labels,
         free_parameter_bounds,
         parameter_labels,
+        optimization_parameter_scale,
     )
-    model_lmfit = Model_lmfit(solve_for_opt, nan_policy="propagate")
-
-    if weight_by_error == "no":
-        weights_ = [1] * len(exp_error)
-    elif weight_by_error == "yes":
-        weights_ = [1 / i for i in exp_error]
 
     if optimization_method == "default":
         method_ = "leastsq"
     else:
         method_ = optimization_method
-        
-    results = model_lmfit.fit(
-        exp_data,
-        params_for_opt,
-        method=method_,
-        x=x,
-        weights=weights_,
-    )
+
+    # exact Jacobians are only passed to the Levenberg-Marquardt (leastsq) method
+    fit_kws = {}
+    if optimizer_jacobian == "sensitivity" and method_ == "leastsq":
+        fit_kws = {"Dfun": jacobian_for_opt}
+
+    try:
+        results = lmfit.minimize(
+            residuals_for_opt, params_for_opt, method=method_, nan_policy="propagate", **fit_kws
+        )
+        best_parameters = list(define_parameter_array(results.params))
+        results.evaluations_saved = 0
+        if pruning is not None and best_evaluation["parameters"] is not None:
+            log_best_parameters = np.log10(best_evaluation["parameters"][free_parameter_indices])
+            outside_radius = np.flatnonzero(
+                np.max(np.abs(np.array(log_parameters_list) - log_best_parameters), axis=1)
+                >= pruning["radius"]
+            )
+            num_evaluations_outside = outside_radius[-1] + 1 if len(outside_radius) > 0 else 0
+            pruning["basins"].append(
+                {
+                    "parameters": log_best_parameters,
+                    "chi_sq": best_evaluation["chi_sq"],
+                    "num_evaluations": len(chi_sq_list),
+                    "num_evaluations_in_radius": len(chi_sq_list) - num_evaluations_outside,
+                }
+            )
+    except OptimizationPruned as pruned:
+        # the run is stopped at the parameters with the lowest chi_sq so far
+        best_parameters = list(best_evaluation["parameters"])
+        results = lmfit.minimizer.MinimizerResult(
+            redchi=best_evaluation["chi_sq"] / max(1, len(exp_data) - len(free_parameter_indices)),
+            success=False,
+            aborted=True,
+            evaluations_saved=pruned.args[0],
+        )
+
+    if trajectory is not None:
+        trajectory["parameters"] = np.array(trajectory["parameters"], dtype=float)
+        trajectory["time"] = np.array(trajectory["time"], dtype=float)
 
     results_row, results_row_labels = define_results_row(
+        model,
         results,
+        best_parameters,
         initial_parameters,
         chi_sq_list,
         [x, exp_data, exp_error],
         [parameter_labels, dataID, weight_by_error],
+        trajectory,
     )
 
     if run_type != "ppl":
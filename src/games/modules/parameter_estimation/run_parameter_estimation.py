@@ -5,24 +5,24 @@ Created on Tue Jun 14 12:39:44 2022
 
 @author: kate
 """
-from typing import Tuple, List
+from typing import Any, Tuple, List
 import os
 from games.config.experimental_data import define_experimental_data
 from games.utilities.saving import create_folder
 from games.modules.parameter_estimation.optimization import optimize_all
-from games.modules.parameter_estimation.global_search import (
-    generate_parameter_sets,
-    solve_global_search,
-)
+from games.modules.parameter_estimation.global_search import run_global_search
 
 
 def run_parameter_estimation(
-    settings: dict, folder_path: str, parameter_estimation_problem_definition: dict
+    model: Any, settings: dict, folder_path: str, parameter_estimation_problem_definition: dict
 ) -> Tuple[float, List[float]]:
     """Runs parameter estimation method (multi-start optimization)
 
     Parameters
     ----------
+    model
+        object defining the model
+
     settings
         a dictionary of run settings
 
@@ -47,15 +47,20 @@ def run_parameter_estimation(
 
     print("Starting global search...")
     x, exp_data, exp_error = define_experimental_data(settings)
-    df_parameters = generate_parameter_sets(
-        parameter_estimation_problem_definition, settings, settings["parameters"]
+    df_global_search_results = run_global_search(
+        model,
+        parameter_estimation_problem_definition,
+        settings,
+        settings["parameters"],
+        x,
+        exp_data,
+        exp_error,
     )
-    df_global_search_results = solve_global_search(df_parameters, x, exp_data, exp_error, settings)
     print("Global search complete.")
 
     print("Starting optimization...")
     _, calibrated_chi_sq, _, calibrated_parameters = optimize_all(
-        df_global_search_results, settings, parameter_estimation_problem_definition
+        model, df_global_search_results, settings, parameter_estimation_problem_definition
     )
 
     return calibrated_chi_sq, calibrated_parameters
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:05:37 2026
+
+Samplers for the parameter sets of the global search (log scale)
+"""
+from typing import Callable, Dict, Optional
+import warnings
+import numpy as np
+from scipy.stats import qmc
+from SALib.sample import latin
+
+
+def sample_latin(problem: dict, n_total: int, start: int, stop: int, seed: int) -> np.ndarray:
+    """Latin hypercube sample from SALib (the sampler used in the GAMES paper)
+
+    Parameters
+    ----------
+    problem
+        a dictionary including the number, labels, and bounds (log scale) for the free parameters
+
+    n_total
+        an int defining the number of parameter sets in the full sample
+
+    start
+        an int defining the index of the first parameter set to return
+
+    stop
+        an int defining the index after the last parameter set to return
+
+    seed
+        an int defining the seed
+
+    Returns
+    -------
+    samples
+        an array defining the parameter sets start to stop of the sample (log scale)
+
+    """
+    return latin.sample(problem, n_total, seed=seed)[start:stop]
+
+
+def sample_latin_optimized(
+    problem: dict, n_total: int, start: int, stop: int, seed: int
+) -> np.ndarray:
+    """Latin hypercube sample optimized to reduce the centered discrepancy
+    (scipy.stats.qmc.LatinHypercube with optimization="random-cd")
+
+    Parameters
+    ----------
+    problem
+        a dictionary including the number, labels, and bounds (log scale) for the free parameters
+
+    n_total
+        an int defining the number of parameter sets in the full sample
+
+    start
+        an int defining the index of the first parameter set to return
+
+    stop
+        an int defining the index after the last parameter set to return
+
+    seed
+        an int defining the seed
+
+    Returns
+    -------
+    samples
+        an array defining the parameter sets start to stop of the sample (log scale)
+
+    """
+    sampler = qmc.LatinHypercube(problem["num_vars"], optimization="random-cd", seed=seed)
+    return scale_samples(sampler.random(n_total)[start:stop], problem)
+
+
+def sample_sobol(problem: dict, n_total: int, start: int, stop: int, seed: int) -> np.ndarray:
+    """Scrambled Sobol sequence (scipy.stats.qmc.Sobol) - parameter sets start to stop
+    are generated without generating the parameter sets before start
+
+    Parameters
+    ----------
+    problem
+        a dictionary including the number, labels, and bounds (log scale) for the free parameters
+
+    n_total
+        an int defining the number of parameter sets in the full sample (not used, because
+        the sequence does not depend on the number of parameter sets)
+
+    start
+        an int defining the index of the first parameter set to return
+
+    stop
+        an int defining the index after the last parameter set to return
+
+    seed
+        an int defining the seed
+
+    Returns
+    -------
+    samples
+        an array defining the parameter sets start to stop of the sample (log scale)
+
+    """
+    sampler = qmc.Sobol(problem["num_vars"], scramble=True, seed=seed)
+    if start > 0:
+        # fast_forward(0) raises an OverflowError in scipy 1.11
+        sampler.fast_forward(start)
+    with warnings.catch_warnings():
+        # the balance properties of the sequence only hold for blocks of 2^m points,
+        # which is not required here
+        warnings.simplefilter("ignore", UserWarning)
+        return scale_samples(sampler.random(stop - start), problem)
+
+
+def sample_halton(problem: dict, n_total: int, start: int, stop: int, seed: int) -> np.ndarray:
+    """Scrambled Halton sequence (scipy.stats.qmc.Halton) - parameter sets start to stop
+    are generated without generating the parameter sets before start
+
+    Parameters
+    ----------
+    problem
+        a dictionary including the number, labels, and bounds (log scale) for the free parameters
+
+    n_total
+        an int defining the number of parameter sets in the full sample (not used, because
+        the sequence does not depend on the number of parameter sets)
+
+    start
+        an int defining the index of the first parameter set to return
+
+    stop
+        an int defining the index after the last parameter set to return
+
+    seed
+        an int defining the seed
+
+    Returns
+    -------
+    samples
+        an array defining the parameter sets start to stop of the sample (log scale)
+
+    """
+    sampler = qmc.Halton(problem["num_vars"], scramble=True, seed=seed)
+    sampler.fast_forward(start)
+    return scale_samples(sampler.random(stop - start), problem)
+
+
+def scale_samples(samples: np.ndarray, problem: dict) -> np.ndarray:
+    """Scales samples in the unit hypercube to the parameter bounds
+
+    Parameters
+    ----------
+    samples
+        an array defining the samples in the unit hypercube (rows are parameter sets)
+
+    problem
+        a dictionary including the number, labels, and bounds (log scale) for the free parameters
+
+    Returns
+    -------
+    samples_scaled
+        an array defining the samples within the parameter bounds (log scale)
+
+    """
+    bounds = np.asarray(problem["bounds"], dtype=float)
+    return qmc.scale(samples, bounds[:, 0], bounds[:, 1])
+
+
+# sampler functions and whether parameter sets start to stop of each sampler can be
+# generated without generating the full sample ("extensible")
+SAMPLERS: Dict[str, dict] = {
+    "latin": {"sample": sample_latin, "extensible": False},
+    "LHS-optimized": {"sample": sample_latin_optimized, "extensible": False},
+    "sobol": {"sample": sample_sobol, "extensible": True},
+    "halton": {"sample": sample_halton, "extensible": True},
+}
+
+
+def define_sampler(sampler: str) -> Callable:
+    """Defines the sampler function for the given sampler name
+
+    Parameters
+    ----------
+    sampler
+        a string defining the sampler (a key of SAMPLERS)
+
+    Returns
+    -------
+    sample
+        the sampler function
+
+    """
+    if sampler not in SAMPLERS:
+        raise ValueError(
+            "Unknown global search sampler "
+            + str(sampler)
+            + ". Must be one of: "
+            + ", ".join(SAMPLERS.keys())
+        )
+    return SAMPLERS[sampler]["sample"]
+
+
+def sample_parameters(
+    problem: dict,
+    n_total: int,
+    sampler: str = "latin",
+    seed: int = 456767,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> np.ndarray:
+    """Samples parameter sets start to stop (log scale) for the global search
+
+    For the "sobol" and "halton" samplers, a sample can be extended by sampling from
+    start = the number of parameter sets already sampled, and a sample can be generated
+    in blocks, because each block does not depend on the other blocks or on n_total.
+    For the "latin" and "LHS-optimized" samplers, the full sample of n_total parameter sets
+    is generated and parameter sets start to stop are returned.
+
+    Parameters
+    ----------
+    problem
+        a dictionary including the number, labels, and bounds (log scale) for the free parameters
+
+    n_total
+        an int defining the number of parameter sets in the full sample
+
+    sampler
+        a string defining the sampler (a key of SAMPLERS)
+
+    seed
+        an int defining the seed
+
+    start
+        an int defining the index of the first parameter set to return
+
+    stop
+        an int defining the index after the last parameter set to return
+        (defaults to n_total)
+
+    Returns
+    -------
+    samples
+        an array defining the parameter sets (rows are parameter sets and columns are
+        the free parameters in problem["names"]) in log scale
+
+    """
+    if stop is None:
+        stop = n_total
+    return define_sampler(sampler)(problem, n_total, start, stop, seed)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:48:03 2026
+
+Surrogate models used to prescreen the parameter sets of the global search
+"""
+from typing import Any, Tuple
+import numpy as np
+from scipy.stats import kendalltau, spearmanr
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import ConstantKernel, Matern, WhiteKernel
+
+
+def fit_surrogate(
+    samples_log: np.ndarray, chi_sq_array: np.ndarray, surrogate_model: str, seed: int
+) -> Any:
+    """Fits a regressor from the free parameter values (log scale) to log10(chi_sq)
+
+    Parameters
+    ----------
+    samples_log
+        an array defining the free parameter values (log scale) of the solved parameter sets
+        (rows are parameter sets)
+
+    chi_sq_array
+        an array defining the chi_sq value for each parameter set in samples_log
+
+    surrogate_model
+        a string defining the regressor ("gradient boosting" or "gaussian process")
+
+    seed
+        an int defining the seed of the regressor
+
+    Returns
+    -------
+    surrogate
+        the fitted regressor (predicts log10(chi_sq))
+
+    """
+    # chi_sq spans orders of magnitude, so the regressor is fit in log scale, with failed
+    # solutions (non-finite chi_sq) set to the worst finite value
+    chi_sq_array = np.asarray(chi_sq_array, dtype=float)
+    finite = np.isfinite(chi_sq_array)
+    if not np.any(finite):
+        raise ValueError("No finite chi_sq values to fit the surrogate model")
+    chi_sq_array = np.where(finite, chi_sq_array, np.max(chi_sq_array[finite]))
+    log_chi_sq = np.log10(np.maximum(chi_sq_array, 1e-12))
+
+    if surrogate_model == "gradient boosting":
+        surrogate = GradientBoostingRegressor(
+            n_estimators=200, max_depth=3, learning_rate=0.05, subsample=0.8, random_state=seed
+        )
+    elif surrogate_model == "gaussian process":
+        kernel = (
+            ConstantKernel() * Matern(length_scale=np.ones(samples_log.shape[1]), nu=2.5)
+            + WhiteKernel()
+        )
+        surrogate = GaussianProcessRegressor(kernel=kernel, normalize_y=True, random_state=seed)
+    else:
+        raise ValueError(
+            "Unknown surrogate model "
+            + str(surrogate_model)
+            + ". Must be one of: gradient boosting, gaussian process"
+        )
+    surrogate.fit(samples_log, log_chi_sq)
+
+    return surrogate
+
+
+def select_candidates(
+    predicted_log_chi_sq: np.ndarray, num_selected: int, exploration_fraction: float, seed: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Selects the candidates with the lowest predicted chi_sq, plus a random subset of
+    the other candidates for exploration
+
+    Parameters
+    ----------
+    predicted_log_chi_sq
+        an array defining the predicted log10(chi_sq) for each candidate
+
+    num_selected
+        an int defining the total number of candidates to select
+
+    exploration_fraction
+        a float defining the fraction of the selected candidates chosen at random from
+        the candidates not ranked as promising
+
+    seed
+        an int defining the seed for the random selection
+
+    Returns
+    -------
+    exploit_indices
+        an array defining the indices of the candidates with the lowest predicted chi_sq
+
+    explore_indices
+        an array defining the indices of the randomly selected candidates
+
+    """
+    num_candidates = len(predicted_log_chi_sq)
+    num_selected = min(num_selected, num_candidates)
+    num_explore = int(round(exploration_fraction * num_selected))
+    num_exploit = num_selected - num_explore
+
+    order = np.argsort(predicted_log_chi_sq, kind="stable")
+    exploit_indices = np.sort(order[:num_exploit])
+    rng = np.random.default_rng(seed)
+    explore_indices = np.sort(rng.choice(order[num_exploit:], num_explore, replace=False))
+
+    return exploit_indices, explore_indices
+
+
+def calc_ranking_agreement(
+    predicted_log_chi_sq: np.ndarray, chi_sq_array: np.ndarray
+) -> Tuple[float, float]:
+    """Calculates how often the ranking of the surrogate agrees with the true ranking
+
+    Candidates with an aborted evaluation (chi_sq = inf, see global_search_early_abort) are
+    left out, because their chi_sq is only known to be above the early abort threshold.
+
+    Parameters
+    ----------
+    predicted_log_chi_sq
+        an array defining the predicted log10(chi_sq) for each solved candidate
+
+    chi_sq_array
+        an array defining the chi_sq value for each solved candidate
+
+    Returns
+    -------
+    pairwise_agreement
+        a float defining the fraction of pairs of candidates that the surrogate ranks in
+        the same order as their chi_sq values, (1 + Kendall's tau) / 2 (0.5 for a random ranking)
+
+    spearman
+        a float defining the Spearman rank correlation between the predicted and
+        the true chi_sq values
+
+    """
+    chi_sq_array = np.asarray(chi_sq_array, dtype=float)
+    not_aborted = ~np.isinf(chi_sq_array)
+    predicted_log_chi_sq = np.asarray(predicted_log_chi_sq)[not_aborted]
+    chi_sq_array = chi_sq_array[not_aborted]
+    if len(chi_sq_array) < 2:
+        return np.nan, np.nan
+
+    # failed solutions (nan) rank last
+    chi_sq_array = np.nan_to_num(chi_sq_array, nan=np.inf)
+    pairwise_agreement = float((1 + kendalltau(predicted_log_chi_sq, chi_sq_array).correlation) / 2)
+    spearman = float(spearmanr(predicted_log_chi_sq, chi_sq_array).correlation)
+
+    return pairwise_agreement, spearman
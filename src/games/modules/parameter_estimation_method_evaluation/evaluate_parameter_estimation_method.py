@@ -5,7 +5,7 @@ Created on Wed Jun 15 16:13:15 2022
 
 @author: kate
 """
-from typing import List
+from typing import Any, List
 import os
 import pandas as pd
 import numpy as np
@@ -46,6 +46,20 @@ def define_initial_guesses_for_pem_eval(
 
     """
 
+    # parameter sets with an aborted evaluation (early abort) have no solutions to compare
+    # with the PEM evaluation data
+    if "aborted" in df_global_search_results:
+        num_aborted = int(df_global_search_results["aborted"].sum())
+        if num_aborted > 0:
+            print(
+                str(num_aborted)
+                + " parameter sets with an aborted global search evaluation are not used"
+                + " as initial guesses for the PEM evaluation"
+            )
+        df_global_search_results = df_global_search_results[
+            ~df_global_search_results["aborted"].astype(bool)
+        ].reset_index(drop=True)
+
     df_initial_guesses_list = []
     for _, pem_evaluation_data in enumerate(pem_evaluation_data_list):
         df_new = df_global_search_results.copy()
@@ -73,6 +87,7 @@ def define_initial_guesses_for_pem_eval(
 
 
 def optimize_pem_evaluation_data(
+    model: Any,
     df_initial_guesses_list: List[pd.DataFrame],
     chi_sq_pem_evaluation_criterion: float,
     folder_path: str,
@@ -83,6 +98,9 @@ def optimize_pem_evaluation_data(
 
     Parameters
     ----------
+    model
+        object defining the model
+
     df_initial_guesses_list
         a list of dfs containing the initial guesses for each pem evaluation data set
 
@@ -120,7 +138,7 @@ def optimize_pem_evaluation_data(
 
         print("PEM evaluation dataset " + str(i + 1))
         r_sq_mean, chi_sq_mean, df_optimization_results, _ = optimize_all(
-            df_pem_evaluation, settings, problem, run_type="PEM evaluation"
+            model, df_pem_evaluation, settings, problem, run_type="PEM evaluation"
         )
         df_list.append(df_optimization_results)
         r_sq_pem_evaluation.append(r_sq_mean)
@@ -5,22 +5,26 @@ Created on Wed Jun 15 16:13:15 2022
 
 @author: kate
 """
-from typing import Tuple, List
+from typing import Any, Tuple, List
 from math import sqrt
 import pandas as pd
 import numpy as np
-from games.models.set_model import model
 from games.modules.solve_single import solve_single_parameter_set
 from games.utilities.metrics import calc_chi_sq, calc_r_sq
 from games.utilities.saving import save_pem_evaluation_data
 
 
-def add_noise(solutions_norm_raw: List[float], noise: List[float], dataID: str) -> List[float]:
+def add_noise(
+    model: Any, solutions_norm_raw: List[float], noise: List[float], dataID: str
+) -> List[float]:
     """
     Adds noise to a set of simulated data
 
     Parameters
     ----------
+    model
+        object defining the model
+
     solutions_norm_raw
         a list of floats defining data to add noise to
 
@@ -145,12 +149,15 @@ def filter_global_search_results(
 
 
 def generate_pem_evaluation_data(
-    df_global_search_results: pd.DataFrame, settings: dict
+    model: Any, df_global_search_results: pd.DataFrame, settings: dict
 ) -> Tuple[list, float]:
     """Generates PEM evaluation data based on results of a global search
 
     Parameters
     ----------
+    model
+        object defining the model
+
     df_global_search_results
         a dataframe containing global search results
         
@@ -179,13 +186,14 @@ def generate_pem_evaluation_data(
     for row in df_global_search_results_filtered.itertuples(name=None):
         # Define parameters
         p = list(row[1 : len(settings["parameters"]) + 1])
-        model.parameters = p
 
         # Solve for raw data
         x = list(df_global_search_results["x"].iloc[0])
         exp_data = list(df_global_search_results["exp_data"].iloc[0])
         exp_error = list(df_global_search_results["exp_error"].iloc[0])
         solutions_norm_raw, chi_sq, r_sq = solve_single_parameter_set(
+            model,
+            p,
             x,
             exp_data,
             exp_error,
@@ -196,7 +204,7 @@ def generate_pem_evaluation_data(
 
         # Add noise
         noise = generate_noise_pem_evaluation(exp_error, count, settings["modelID"])
-        solutions_norm_noise = add_noise(solutions_norm_raw, noise, settings["dataID"])
+        solutions_norm_noise = add_noise(model, solutions_norm_raw, noise, settings["dataID"])
 
         # Calculate cost function metrics between PEM evaluation
         # training data with and without noise
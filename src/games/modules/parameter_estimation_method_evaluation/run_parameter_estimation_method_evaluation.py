@@ -5,12 +5,10 @@ Created on Mon Jun 13 10:49:45 2022
 
 @author: kate
 """
+from typing import Any
 import os
 from games.utilities.saving import create_folder
-from games.modules.parameter_estimation.global_search import (
-    generate_parameter_sets,
-    solve_global_search,
-)
+from games.modules.parameter_estimation.global_search import run_global_search
 from games.config.experimental_data import define_experimental_data
 from games.plots.plots_pem_evaluation import plot_pem_evaluation
 from games.modules.parameter_estimation_method_evaluation.generate_pem_evaluation_data import (
@@ -23,7 +21,7 @@ from games.modules.parameter_estimation_method_evaluation.evaluate_parameter_est
 
 
 def run_parameter_estimation_method_evaluation(
-    settings: dict, folder_path: str, parameter_estimation_problem_definition: dict
+    model: Any, settings: dict, folder_path: str, parameter_estimation_problem_definition: dict
 ) -> None:
     """Runs parameter estimation method evaluation by first generating
     PEM evaluation data and then running multi-start optimization
@@ -31,6 +29,9 @@ def run_parameter_estimation_method_evaluation(
 
     Parameters
     ----------
+    model
+        object defining the model
+
     settings
         a dictionary of run settings
 
@@ -50,13 +51,18 @@ def run_parameter_estimation_method_evaluation(
     os.chdir(path)
 
     print("Generating PEM evaluation data...")
-    df_parameters = generate_parameter_sets(
-        parameter_estimation_problem_definition, settings, settings["parameters"]
-    )
     x, exp_data, exp_error = define_experimental_data(settings)
-    df_global_search_results = solve_global_search(df_parameters, x, exp_data, exp_error, settings)
+    df_global_search_results = run_global_search(
+        model,
+        parameter_estimation_problem_definition,
+        settings,
+        settings["parameters"],
+        x,
+        exp_data,
+        exp_error,
+    )
     pem_evaluation_data_list, chi_sq_pem_evaluation_criterion = generate_pem_evaluation_data(
-        df_global_search_results, settings
+        model, df_global_search_results, settings
     )
     print("PEM evaluation data generated.")
 
@@ -68,6 +74,7 @@ def run_parameter_estimation_method_evaluation(
         settings["weight_by_error"],
     )
     df_list = optimize_pem_evaluation_data(
+        model,
         df_initial_guesses_list,
         chi_sq_pem_evaluation_criterion,
         folder_path,
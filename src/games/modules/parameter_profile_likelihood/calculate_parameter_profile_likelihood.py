@@ -5,14 +5,11 @@ Created on Wed Jun 15 16:03:09 2022
 
 @author: kate
 """
-from typing import Tuple, List, Union
+from typing import Any, Tuple, List, Union
 import datetime
 import pandas as pd
 from games.modules.parameter_estimation.optimization import optimize_all
-from games.modules.parameter_estimation.global_search import (
-    generate_parameter_sets,
-    solve_global_search,
-)
+from games.modules.parameter_estimation.global_search import run_global_search
 from games.plots.plots_parameter_profile_likelihood import plot_parameter_profile_likelihood
 from games.plots.plots_parameter_profile_likelihood import plot_parameter_relationships
 from games.plots.plots_parameter_profile_likelihood import plot_internal_states_along_ppl
@@ -104,6 +101,7 @@ def set_ppl_settings(
 
 
 def calculate_chi_sq_ppl_single_datapoint(
+    model: Any,
     fixed_val: float,
     fixed_index_in_free_parameter_list: int,
     parameters: list,
@@ -115,6 +113,9 @@ def calculate_chi_sq_ppl_single_datapoint(
 
     Parameters
     ----------
+    model
+        object defining the model
+
     fixed_val
         a float defining the value that the fixed index should be fixed at
 
@@ -164,10 +165,12 @@ def calculate_chi_sq_ppl_single_datapoint(
     ]
 
     # Run PEM
-    df_parameters = generate_parameter_sets(problem_ppl, settings, parameters)
     x, exp_data, exp_error = define_experimental_data(settings)
-    df_global_search_results = solve_global_search(df_parameters, x, exp_data, exp_error, settings)
+    df_global_search_results = run_global_search(
+        model, problem_ppl, settings, parameters, x, exp_data, exp_error
+    )
     _, calibrated_chi_sq, _, calibrated_parameters = optimize_all(
+        model,
         df_global_search_results,
         settings,
         problem=problem_ppl,
@@ -178,6 +181,7 @@ def calculate_chi_sq_ppl_single_datapoint(
 
 
 def calculate_ppl(
+    model: Any,
     parameter_label: str,
     calibrated_parameter_values: list,
     calibrated_chi_sq: float,
@@ -189,6 +193,9 @@ def calculate_ppl(
 
     Parameters
     ----------
+    model
+        object defining the model
+
     parameter_label
         a string defining the parameter label
 
@@ -401,6 +408,7 @@ def calculate_ppl(
                                 ]  # Replace with cal val
 
                 param_val, chi_sq_ppl_val, param_vals = calculate_chi_sq_ppl_single_datapoint(
+                    model,
                     fixed_val,
                     fixed_index_in_free_parameter_list,
                     parameters_single_datapoint,
@@ -715,6 +723,8 @@ def calculate_ppl(
 
     plot_parameter_relationships(df_ppl, parameter_label, settings)
     if settings["modelID"] == "synTF_chem":
-        plot_internal_states_along_ppl(df_ppl, parameter_label, settings["parameter_labels"])
+        plot_internal_states_along_ppl(
+            model, df_ppl, parameter_label, settings["parameter_labels"]
+        )
 
     return elapsed_time_total
@@ -5,11 +5,10 @@ Created on Wed Jun 15 16:02:58 2022
 
 @author: kate
 """
-from typing import List, Tuple
+from typing import Any, List, Tuple
 from math import sqrt
 import pandas as pd
 import numpy as np
-from games.models.set_model import model
 from games.modules.parameter_estimation.optimization import optimize_all
 from games.modules.solve_single import solve_single_parameter_set
 from games.config.experimental_data import define_experimental_data
@@ -90,6 +89,7 @@ def define_noise_array(exp_error: List[float], num_data_sets: int, modelID: str)
 
 
 def generate_noise_realizations_and_calc_chi_sq_ref(
+    model: Any,
     exp_data_to_generate_noise_realizations: List[float],
     norm_solutions_ref: List[float],
     exp_error: List[float],
@@ -99,6 +99,9 @@ def generate_noise_realizations_and_calc_chi_sq_ref(
 
     Parameters
     ----------
+    model
+        object defining the model
+
     exp_data_to_generate_noise_realizations
         a list of floats defining the experimental data used to generate noise realizations
         these data are the starting points upon which noise is added
@@ -135,7 +138,10 @@ def generate_noise_realizations_and_calc_chi_sq_ref(
 
     for i in range(0, settings["num_noise_realizations"]):
         exp_data_noise_norm = add_noise(
-            exp_data_to_generate_noise_realizations, list(noise_array[i, :]), settings["dataID"]
+            model,
+            exp_data_to_generate_noise_realizations,
+            list(noise_array[i, :]),
+            settings["dataID"],
         )
         exp_data_noise_list.append(exp_data_noise_norm)
 
@@ -149,6 +155,7 @@ def generate_noise_realizations_and_calc_chi_sq_ref(
 
 
 def calculate_chi_sq_fit(
+    model: Any,
     calibrated_parameters: List[float],
     exp_data_noise_list: List[list],
     settings: dict,
@@ -159,6 +166,9 @@ def calculate_chi_sq_fit(
 
     Parameters
     ----------
+    model
+        object defining the model
+
     calibrated_parameters
         a list of floats defining the calibrated parameter values
 
@@ -201,7 +211,7 @@ def calculate_chi_sq_fit(
     df_noise["placeholder 2"] = [0] * len(df_noise.index)
 
     _, _, df_optimization_results, _ = optimize_all(
-        df_noise, settings, parameter_estimation_problem_definition, "ppl threshold"
+        model, df_noise, settings, parameter_estimation_problem_definition, "ppl threshold"
     )
     chi_sq_fit_list = list(df_optimization_results["chi_sq"])
 
@@ -209,6 +219,7 @@ def calculate_chi_sq_fit(
 
 
 def calculate_threshold_chi_sq(
+    model: Any,
     settings: dict,
     parameter_estimation_problem_definition: dict,
     calibrated_parameters: List[float],
@@ -227,10 +238,13 @@ def calculate_threshold_chi_sq(
     can be removed from config.json and the following code can be removed from this function:
 
     if settings["modelID"] == 'synTF_chem':
-        model.parameters = settings["parameters_reference"]
+        reference_parameters = settings["parameters_reference"]
 
     Parameters
     ----------
+    model
+        object defining the model
+
     settings
         a dictionary defining the run settings
 
@@ -251,9 +265,11 @@ def calculate_threshold_chi_sq(
     """
 
     if settings["modelID"] == "synTF_chem":
-        model.parameters = settings["parameters_reference"]
+        reference_parameters = settings["parameters_reference"]
         x, exp_data, exp_error = define_experimental_data(settings)
         norm_solutions_ref, chi_sq_ref, _ = solve_single_parameter_set(
+            model,
+            reference_parameters,
             x,
             exp_data,
             exp_error,
@@ -266,9 +282,11 @@ def calculate_threshold_chi_sq(
 
     else:
         # solve model with calibrated parameters
-        model.parameters = calibrated_parameters
+        reference_parameters = calibrated_parameters
         x, exp_data, exp_error = define_experimental_data(settings)
         norm_solutions_cal, _, _ = solve_single_parameter_set(
+            model,
+            reference_parameters,
             x,
             exp_data,
             exp_error,
@@ -281,7 +299,7 @@ def calculate_threshold_chi_sq(
         # reference data are generated
         noise_array = define_noise_array(exp_error, 1, settings["modelID"])
         exp_data_to_generate_noise_realizations = add_noise(
-            norm_solutions_cal, list(noise_array[0, :]), settings["dataID"]
+            model, norm_solutions_cal, list(noise_array[0, :]), settings["dataID"]
         )
 
         # Determine chi_sq_ref by calculating the chi_sq between the new reference data,
@@ -289,6 +307,8 @@ def calculate_threshold_chi_sq(
         # (simulated data generated with calibrated parameters + added noise) and
         # the simulated data with the reference parameters (in this case, the calibrated parameters)
         norm_solutions_ref, chi_sq_ref, _ = solve_single_parameter_set(
+            model,
+            reference_parameters,
             x,
             exp_data_to_generate_noise_realizations,
             exp_error,
@@ -299,11 +319,16 @@ def calculate_threshold_chi_sq(
 
     print("Generating noise realizations and calculating chi_sq_ref...")
     exp_data_noise_list, chi_sq_ref_list = generate_noise_realizations_and_calc_chi_sq_ref(
-        exp_data_to_generate_noise_realizations, norm_solutions_ref, exp_error, settings
+        model,
+        exp_data_to_generate_noise_realizations,
+        norm_solutions_ref,
+        exp_error,
+        settings,
     )
 
     print("Calculating chi_sq_fit...")
     chi_sq_fit_list = calculate_chi_sq_fit(
+        model,
         calibrated_parameters,
         exp_data_noise_list,
         settings,
@@ -5,7 +5,7 @@ Created on Mon Jun 13 14:24:39 2022
 
 @author: kate
 """
-from typing import List
+from typing import Any, List
 import os
 import numpy as np
 from games.utilities.saving import create_folder
@@ -18,6 +18,7 @@ from games.modules.parameter_profile_likelihood.calculate_threshold import (
 
 
 def run_parameter_profile_likelihood(
+    model: Any,
     settings: dict,
     folder_path: str,
     parameter_estimation_problem_definition: dict,
@@ -28,6 +29,9 @@ def run_parameter_profile_likelihood(
 
     Parameters
     ----------
+    model
+        object defining the model
+
     settings
         a dictionary defining the run settings
 
@@ -52,12 +56,17 @@ def run_parameter_profile_likelihood(
     os.chdir(path)
 
     threshold_chi_sq = calculate_threshold_chi_sq(
-        settings, parameter_estimation_problem_definition, calibrated_parameters, calibrated_chi_sq
+        model,
+        settings,
+        parameter_estimation_problem_definition,
+        calibrated_parameters,
+        calibrated_chi_sq,
     )
 
     time_list = []
     for parameter_label in settings["parameter_labels_for_ppl"]:
         time = calculate_ppl(
+            model,
             parameter_label,
             calibrated_parameters,
             calibrated_chi_sq,
@@ -6,16 +6,17 @@ Created on Fri Jun  3 15:25:47 2022
 @author: kate
 """
 import os
-from typing import Tuple, List
+from typing import Any, Optional, Tuple, List
 import numpy as np
-from games.models.set_model import model
 from games.utilities.saving import create_folder
-from games.utilities.metrics import calc_chi_sq, calc_r_sq
-from games.plots.plots_timecourses import plot_timecourses
+from games.utilities.metrics import calc_chi_sq, calc_chi_sq_lower_bound, calc_r_sq
+from games.utilities.cache import cache_enabled, define_cache_key, solve_cached
 from games.config.experimental_data import define_experimental_data
 
 
 def solve_single_parameter_set(
+    model: Any,
+    parameters: List[float],
     x: List[float],
     exp_data: List[float],
     exp_error: List[float],
@@ -28,6 +29,12 @@ def solve_single_parameter_set(
 
     Parameters
     ----------
+    model
+        object defining the model (not changed by this function)
+
+    parameters
+        a list of floats defining the parameters
+
     x
         a list of floats containing the values of the independent variable
 
@@ -58,21 +65,161 @@ def solve_single_parameter_set(
 
     r_sq
         a float defining the value of the correlation coefficient (r_sq)
+
+    If the solution cache is enabled (see games.utilities.cache.configure_cache()), the
+    results are returned from the cache when the same model, parameters (rounded) and data
+    were solved before.
+    """
+
+    def solve() -> Tuple[List[float], float, float]:
+        given_model = model.with_parameters(parameters)
+        solutions = given_model.solve_experiment(x, dataID, parameter_labels)
+        solutions_norm = given_model.normalize_data(solutions, dataID)
+        chi_sq = calc_chi_sq(exp_data, solutions_norm, exp_error, weight_by_error)
+        r_sq = calc_r_sq(exp_data, solutions_norm)
+        return solutions_norm, chi_sq, r_sq
+
+    if cache_enabled():
+        key = define_cache_key(
+            model, parameters, x, exp_data, exp_error, dataID, weight_by_error, parameter_labels
+        )
+        return solve_cached(key, solve)
+
+    return solve()
+
+
+def define_condition_stages(
+    exp_data: List[float], normalization_groups: Optional[List[List[int]]], num_stages: int
+) -> List[List[int]]:
+    """Defines the order in which the conditions of an experiment are solved for an
+    early-abort chi_sq evaluation. The lower bound on chi_sq for a normalization group
+    (see calc_chi_sq_lower_bound()) is only tight once all of its conditions are solved,
+    because the maximum used for normalization is not known before, so the groups are solved
+    one at a time, smallest first, each split into num_stages stages. The first stage of each
+    group starts with the condition with the highest experimental value, which is the most
+    likely to define the maximum.
+
+    Parameters
+    ----------
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    normalization_groups
+        a list of lists defining the start and stop index of each group of datapoints
+        normalized by their maximum value, or None if the data are not normalized
+
+    num_stages
+        an int defining the number of stages for each normalization group
+
+    Returns
+    -------
+    stages
+        a list of lists of ints defining the indices of the conditions solved in each stage
+
+    """
+    exp_data = np.asarray(exp_data, dtype=float)
+    if normalization_groups is None:
+        normalization_groups = [[0, len(exp_data)]]
+
+    stages = []
+    for start, stop in sorted(normalization_groups, key=lambda group: group[1] - group[0]):
+        index_max = start + int(np.argmax(exp_data[start:stop]))
+        group = [index_max] + [i for i in range(start, stop) if i != index_max]
+        stages += [list(stage) for stage in np.array_split(group, num_stages) if len(stage) > 0]
+
+    return stages
+
+
+def solve_single_parameter_set_early_abort(
+    model: Any,
+    parameters: List[float],
+    x: List[float],
+    exp_data: List[float],
+    exp_error: List[float],
+    dataID: str,
+    weight_by_error: str,
+    parameter_labels: List[str],
+    chi_sq_threshold: float,
+    num_stages: int,
+) -> Tuple[Optional[List[float]], float]:
     """
+    Solves model for a single parameter set in stages of conditions (see
+    define_condition_stages()), and stops as soon as a lower bound on chi_sq
+    (see calc_chi_sq_lower_bound()) is greater than chi_sq_threshold
 
-    solutions = model.solve_experiment(x, dataID, parameter_labels)
-    solutions_norm = model.normalize_data(solutions, dataID)
+    Parameters
+    ----------
+    model
+        object defining the model (not changed by this function)
+
+    parameters
+        a list of floats defining the parameters
+
+    x
+        a list of floats containing the values of the independent variable
+
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    exp_error
+        a list of floats containing the values of the measurement error
+        for the dependent variable
+
+    dataID
+        a string defining the dataID
+
+    weight_by_error
+        a string defining whether the cost function should be weighted by error or not
+
+    parameter_labels
+        a list of strings defining the parameter labels
+
+    chi_sq_threshold
+        a float defining the chi_sq value above which the parameter set is not needed
+
+    num_stages
+        an int defining the number of stages of conditions
+
+    Returns
+    -------
+    solutions_norm
+        a list of floats containing the normalized simulation values
+        corresponding to the dataID defined in Settings (None if the evaluation was aborted)
+
+    chi_sq
+        a float defining the value of the cost function (or the lower bound on the
+        cost function if the evaluation was aborted)
+
+    """
+    given_model = model.with_parameters(parameters)
+    normalization_groups = given_model.define_normalization_groups(dataID, len(exp_data))
+    solutions = np.full(len(exp_data), np.nan)
+    for stage in define_condition_stages(exp_data, normalization_groups, num_stages):
+        solutions[stage] = given_model.solve_experiment_conditions(
+            x, dataID, parameter_labels, stage
+        )
+        chi_sq_lower_bound = calc_chi_sq_lower_bound(
+            exp_data, solutions, exp_error, weight_by_error, normalization_groups
+        )
+        if chi_sq_lower_bound > chi_sq_threshold:
+            return None, chi_sq_lower_bound
+
+    solutions_norm = given_model.normalize_data(list(solutions), dataID)
     chi_sq = calc_chi_sq(exp_data, solutions_norm, exp_error, weight_by_error)
-    r_sq = calc_r_sq(exp_data, solutions_norm)
 
-    return solutions_norm, chi_sq, r_sq
+    return solutions_norm, chi_sq
 
 
-def run_single_parameter_set(settings: dict, folder_path: str) -> Tuple[List[float], float, float]:
+def run_single_parameter_set(
+    model: Any, settings: dict, folder_path: str
+) -> Tuple[List[float], float, float]:
     """Solves model for a single parameter set using dataID defined in settings["
 
     Parameters
     ----------
+    model
+        object defining the model
+
     settings
         a dictionary of run settings
 
@@ -92,12 +239,16 @@ def run_single_parameter_set(settings: dict, folder_path: str) -> Tuple[List[flo
         a float defining the value of the correlation coefficient (r_sq)
 
     """
+    # imported here so that importing this module (as in pool workers) does not load matplotlib
+    from games.plots.plots_timecourses import plot_timecourses
+
     sub_folder_name = "TEST SINGLE PARAMETER SET"
     path = create_folder(folder_path, sub_folder_name)
     os.chdir(path)
-    model.parameters = settings["parameters"]
     x, exp_data, exp_error = define_experimental_data(settings)
     solutions_norm, chi_sq, r_sq = solve_single_parameter_set(
+        model,
+        settings["parameters"],
         x,
         exp_data,
         exp_error,
@@ -107,7 +258,11 @@ def run_single_parameter_set(settings: dict, folder_path: str) -> Tuple[List[flo
     )
     filename = "fit to training data"
     run_type = "default"
-    plot_timecourses(settings["modelID"], settings["parameter_labels"])
+    plot_timecourses(
+        model.with_parameters(settings["parameters"]),
+        settings["modelID"],
+        settings["parameter_labels"],
+    )
     model.plot_training_data(
         x,
         solutions_norm,
@@ -123,7 +278,7 @@ def run_single_parameter_set(settings: dict, folder_path: str) -> Tuple[List[flo
     print("*************************")
     print("Parameters")
     for i, label in enumerate(settings["parameter_labels"]):
-        print(label + " = " + str(model.parameters[i]))
+        print(label + " = " + str(settings["parameters"][i]))
     print("")
     print("Metrics")
     print("R_sq = " + str(np.round(r_sq, 4)))
@@ -8,11 +8,7 @@ Created on Wed Jun 15 15:19:16 2022
 from typing import List
 from math import log10
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from games.models.set_model import settings
-
-plt.style.use(settings["context"] + "paper.mplstyle.py")
+from games.plots.style import use_paper_style
 
 
 def plot_chi_sq_trajectory(chi_sq_list: List[float]) -> None:
@@ -27,6 +23,9 @@ def plot_chi_sq_trajectory(chi_sq_list: List[float]) -> None:
     -------
     None
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    use_paper_style()
     plt.figure(figsize=(3, 3))
     plt.plot(
         range(0, len(chi_sq_list)),
@@ -56,6 +55,10 @@ def plot_training_data_fits(df_opt: pd.DataFrame) -> None:
     None
 
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    import seaborn as sns  # pylint: disable=import-outside-toplevel
+
+    use_paper_style()
 
     # Only keep rows for which r_sq >= .99
     df_opt = df_opt[df_opt["r_sq"] >= 0.99]
@@ -118,6 +121,10 @@ def plot_parameter_distributions_after_optimization(
     -------
     None
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    import seaborn as sns  # pylint: disable=import-outside-toplevel
+
+    use_paper_style()
 
     # Only keep rows for which r_sq >= .99
     df_opt = df_opt[df_opt["r_sq"] >= 0.99]
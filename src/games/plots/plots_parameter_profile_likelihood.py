@@ -6,15 +6,11 @@ Created on Thu May 26 09:48:43 2022
 @author: kate
 """
 from math import log10
-from typing import List
+from typing import Any, List
 import cycler
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-from games.models.set_model import model, settings
-
-plt.style.use(settings["context"] + "paper.mplstyle.py")
+from games.plots.style import use_paper_style
 
 
 def plot_parameter_relationships(
@@ -38,6 +34,10 @@ def plot_parameter_relationships(
     None
 
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    import seaborn as sns  # pylint: disable=import-outside-toplevel
+
+    use_paper_style()
     # Define indices of free parameters
     indices = []
     for i, label in enumerate(settings["parameter_labels"]):
@@ -87,6 +87,9 @@ def plot_chi_sq_distribution(chi_sq_distribution: List[float], threshold_chi_sq:
     None
 
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    use_paper_style()
 
     plt.figure(figsize=(5, 3))
     plt.xlabel("chi_sq_ref - chi_sq_fit")
@@ -141,6 +144,9 @@ def plot_parameter_profile_likelihood(
     None
 
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    use_paper_style()
     # Restructure data
     calibrated_parameter_value_log = log10(calibrated_parameter_value)
     x = fixed_parameter_values_both_directions
@@ -178,11 +184,16 @@ def plot_parameter_profile_likelihood(
     plt.savefig("profile likelihood plot " + parameter_label + ".svg")
 
 
-def plot_internal_states_along_ppl(df_results: pd.DataFrame, parameter_label: str, parameter_labels: List[str]) -> None:
+def plot_internal_states_along_ppl(
+    model: Any, df_results: pd.DataFrame, parameter_label: str, parameter_labels: List[str]
+) -> None:
     """Plot parameter relationships for along PPL for a given parameter
 
     Parameters
     ----------
+    model
+        object defining the model
+
     df_results
         a dataframe containing the PPL results for the given parameter
 
@@ -197,6 +208,9 @@ def plot_internal_states_along_ppl(df_results: pd.DataFrame, parameter_label: st
     None
 
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    use_paper_style()
     y = list(df_results["fixed " + parameter_label + " all parameters"])
     n = len(y)
 
@@ -207,15 +221,15 @@ def plot_internal_states_along_ppl(df_results: pd.DataFrame, parameter_label: st
     plt.rcParams["axes.prop_cycle"] = cycler.cycler("color", color)
 
     for parameters in y:
-        model.inputs = [50, 50]
-        model.input_ligand = 1000
-        model.parameters = parameters
+        given_model = model.with_parameters(parameters)
+        given_model.inputs = [50, 50]
+        given_model.input_ligand = 1000
         (
             tspace_before_ligand_addition,
             tspace_after_ligand_addition,
             solution_before_ligand_addition,
             solution_after_ligand_addition,
-        ) = model.solve_single(parameter_labels)
+        ) = given_model.solve_single(parameter_labels)
         tspace_after_ligand_addition = [
             i + max(tspace_before_ligand_addition) for i in list(tspace_after_ligand_addition)
         ]
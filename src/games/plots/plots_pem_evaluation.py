@@ -7,11 +7,7 @@ Created on Thu May 26 09:48:43 2022
 """
 from typing import List
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from games.models.set_model import settings
-
-plt.style.use(settings["context"] + "paper.mplstyle.py")
+from games.plots.style import use_paper_style
 
 
 def plot_pem_evaluation(
@@ -31,6 +27,10 @@ def plot_pem_evaluation(
     -------
     None
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    import seaborn as sns  # pylint: disable=import-outside-toplevel
+
+    use_paper_style()
     run: List[int] = []
     chi_sq_list: List[float] = []
     r_sq_list: List[float] = []
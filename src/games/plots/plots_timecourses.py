@@ -5,18 +5,21 @@ Created on Thu Jun 16 14:48:46 2022
 
 @author: kate
 """
-from typing import List
-import matplotlib.pyplot as plt
-from games.models.set_model import model, settings
+import math
+from typing import Any, List
+from games.models.defined_model import DefinedModel
+from games.plots.style import use_paper_style
 
-plt.style.use(settings["context"] + "paper.mplstyle.py")
 
-
-def plot_timecourses(modelID: str, parameter_labels: List[str]) -> None:
+def plot_timecourses(model: Any, modelID: str, parameter_labels: List[str]) -> None:
     """Plots timecourses of internal states for a single set of inputs
 
     Parameters
     ----------
+     model
+        object defining the model with the parameters to plot (the inputs
+        of the model are changed by this function)
+
      modelID
         a string defining the modelID
 
@@ -28,14 +31,32 @@ def plot_timecourses(modelID: str, parameter_labels: List[str]) -> None:
     None
 
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    use_paper_style()
 
     fig, axs = plt.subplots(
-        nrows=2, ncols=int(len(model.state_labels) / 2), sharex=True, sharey=False, figsize=(8, 4)
+        nrows=2,
+        ncols=math.ceil(len(model.state_labels) / 2),
+        sharex=True,
+        sharey=False,
+        figsize=(8, 4),
     )
     fig.subplots_adjust(hspace=0.25)
     fig.subplots_adjust(wspace=0.2)
     axs = axs.ravel()
-    if modelID == "synTF_chem":
+    if isinstance(model, DefinedModel):
+        # phases of the protocol are plotted as one continuous timecourse
+        solution, t = model.solve_single()
+        for i, label in enumerate(model.state_labels):
+            axs[i].plot(t, solution[:, i], linestyle="solid", marker="None", color="black")
+            if i in (0, len(axs) // 2):
+                axs[i].set_ylabel("Simulation value (a.u.)", fontsize=8)
+            if i >= len(axs) // 2:
+                axs[i].set_xlabel("Time (hours)", fontsize=8)
+            axs[i].set_title(label, fontweight="bold", fontsize=8)
+
+    elif modelID == "synTF_chem":
         model.inputs = [50, 50]
         model.input_ligand = 1000
         (
@@ -6,7 +6,6 @@ Created on Wed Jun 15 15:17:53 2022
 @author: kate
 """
 from typing import List, Tuple
-import matplotlib.pyplot as plt
 
 
 def plot_training_data_2d(
@@ -47,6 +46,9 @@ def plot_training_data_2d(
     -------
     None
     """
+    # matplotlib is imported here so that importing the model classes does not import it
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
     plt.style.use(context + "paper.mplstyle.py")
     x_label, y_label, x_scale, plot_color, marker_type = plot_settings
     plt.figure(figsize=(3, 3))
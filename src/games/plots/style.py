@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:42:10 2026
+
+Plot style shared by the plotting modules, applied when a plot is made rather than on import
+"""
+import os
+
+PAPER_STYLE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "paper.mplstyle.py")
+
+
+def use_paper_style() -> None:
+    """Applies the plot style in src/games/paper.mplstyle.py
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+
+    """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    plt.style.use(PAPER_STYLE)
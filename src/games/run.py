@@ -7,9 +7,12 @@ Created on Thu May 26 09:38:59 2022
 """
 import warnings
 import json
+import os
 import click
+from games.models.set_model import set_model
 from games.modules.solve_single import run_single_parameter_set
 from games.config.settings import define_settings
+from games.utilities.cache import cache_enabled, configure_cache, print_cache_statistics
 from games.modules.parameter_estimation.run_parameter_estimation import run_parameter_estimation
 from games.modules.parameter_estimation_method_evaluation.run_parameter_estimation_method_evaluation import (
     run_parameter_estimation_method_evaluation,
@@ -45,23 +48,27 @@ def run(modules: str) -> None:
 
     """
     # Open default config file
-    config_filepath = "./config/config.json"
+    config_filepath = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "config", "config.json"
+    )
     file = open(config_filepath, encoding="utf-8")
     settings_import = json.load(file)
     settings, folder_path, parameter_estimation_problem_definition = define_settings(
         settings_import
     )
+    model = set_model(settings)
+    configure_cache(settings)
 
     if "0" in modules:
         print("Starting Module 0...")
-        run_single_parameter_set(settings, folder_path)
+        run_single_parameter_set(model, settings, folder_path)
         print("Module 0 completed")
         print("")
 
     if "1" in modules:
         print("Starting Module 1...")
         run_parameter_estimation_method_evaluation(
-            settings, folder_path, parameter_estimation_problem_definition
+            model, settings, folder_path, parameter_estimation_problem_definition
         )
         print("Module 1 completed")
         print("")
@@ -69,7 +76,7 @@ def run(modules: str) -> None:
     if "2" in modules:
         print("Starting Module 2...")
         calibrated_chi_sq, calibrated_parameters = run_parameter_estimation(
-            settings, folder_path, parameter_estimation_problem_definition
+            model, settings, folder_path, parameter_estimation_problem_definition
         )
         print("Module 2 completed")
         print("")
@@ -77,6 +84,7 @@ def run(modules: str) -> None:
     if "3" in modules:
         print("Starting Module 3...")
         run_parameter_profile_likelihood(
+            model,
             settings,
             folder_path,
             parameter_estimation_problem_definition,
@@ -86,6 +94,9 @@ def run(modules: str) -> None:
         print("Module 3 completed")
         print("")
 
+    if cache_enabled():
+        print_cache_statistics()
+
 
 # pylint: disable=no-value-for-parameter
 if __name__ == "__main__":
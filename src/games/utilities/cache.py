@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:37:26 2026
+
+Cache of the results of solve_single_parameter_set() keyed on the parameter values and data
+"""
+from typing import Any, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+
+# settings and statistics of the cache in the current process, defined by configure_cache()
+_cache_settings: dict = {"max_size": 0, "digits": 12, "path": ""}
+_cache_statistics: dict = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+_cache: "OrderedDict[str, tuple]" = OrderedDict()
+# sqlite connection of the current process (a connection is not shared with forked processes)
+_connection: dict = {"pid": None, "connection": None}
+
+
+def configure_cache(settings: dict) -> dict:
+    """Defines the cache settings of the current process from the run settings
+
+    Parameters
+    ----------
+    settings
+        a dictionary of run settings (solution_cache_size, solution_cache_digits and
+        solution_cache_path, which are set to their defaults if not included)
+
+    Returns
+    -------
+    cache_settings
+        a dictionary defining the cache settings (see configure_cache_from_settings())
+
+    """
+    if "solution_cache_size" not in settings:
+        settings["solution_cache_size"] = 0
+
+    if "solution_cache_digits" not in settings:
+        settings["solution_cache_digits"] = 12
+
+    if "solution_cache_path" not in settings:
+        settings["solution_cache_path"] = ""
+
+    path = settings["solution_cache_path"]
+    if path != "" and "context" in settings:
+        # relative paths are relative to settings["context"]
+        path = os.path.join(settings["context"], path)
+
+    cache_settings = {
+        "max_size": settings["solution_cache_size"],
+        "digits": settings["solution_cache_digits"],
+        "path": path,
+    }
+    configure_cache_from_settings(cache_settings)
+
+    return cache_settings
+
+
+def configure_cache_from_settings(cache_settings: Optional[dict]) -> None:
+    """Defines the cache settings of the current process and clears the cache if the
+    settings changed (so the cache is kept across calls with the same settings, and
+    a worker process started by fork keeps the entries of the main process)
+
+    Parameters
+    ----------
+    cache_settings
+        a dictionary defining the maximum number of entries kept in memory ("max_size",
+        0 to disable the cache), the number of significant digits of the parameter values
+        in the keys ("digits") and the path to the sqlite file shared by all processes
+        ("path", "" to keep the cache in memory only), or None to leave the cache unchanged
+
+    Returns
+    -------
+    None
+
+    """
+    if cache_settings is None or cache_settings == _cache_settings:
+        return
+    if cache_settings.get("path") != _cache_settings["path"]:
+        _connection["pid"] = None
+    _cache_settings.update(cache_settings)
+    _cache.clear()
+    for key in _cache_statistics:
+        _cache_statistics[key] = 0
+
+
+def cache_enabled() -> bool:
+    """Returns whether the cache is enabled in the current process
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    enabled
+        a bool defining whether the cache is enabled
+
+    """
+    return _cache_settings["max_size"] > 0
+
+
+def define_model_key(model: Any) -> str:
+    """Defines the part of the cache key that identifies the model (not the parameters)
+
+    Parameters
+    ----------
+    model
+        object defining the model
+
+    Returns
+    -------
+    model_key
+        a string defining the model class, modelID, mechanismID, inputs, solver and
+        solve mode, and the model definition for models built from a definition file
+
+    """
+    items = [type(model).__name__]
+    for attribute in ["modelID", "mechanismID", "inputs", "solver", "solve_mode"]:
+        items.append(repr(getattr(model, attribute, None)))
+    if hasattr(model, "definition"):
+        items.append(json.dumps(model.definition, sort_keys=True))
+    return "|".join(items)
+
+
+def define_cache_key(
+    model: Any,
+    parameters: List[float],
+    x: List[float],
+    exp_data: List[float],
+    exp_error: List[float],
+    dataID: str,
+    weight_by_error: str,
+    parameter_labels: Optional[List[str]],
+) -> str:
+    """Defines the cache key for a parameter set (the arguments of
+    solve_single_parameter_set())
+
+    Parameters
+    ----------
+    model
+        object defining the model
+
+    parameters
+        a list of floats defining the parameters
+
+    x
+        a list of floats containing the values of the independent variable
+
+    exp_data
+        a list of floats containing the values of the dependent variable
+
+    exp_error
+        a list of floats containing the values of the measurement error
+        for the dependent variable
+
+    dataID
+        a string defining the dataID
+
+    weight_by_error
+        a string defining whether the cost function should be weighted by error or not
+
+    parameter_labels
+        a list of strings defining the parameter labels
+
+    Returns
+    -------
+    key
+        a string defining the hash of the parameter values (rounded to
+        _cache_settings["digits"] significant digits), the model and the data
+
+    """
+    digits = _cache_settings["digits"]
+    rounded_parameters = ",".join(
+        format(float(value), "." + str(digits) + "g") for value in parameters
+    )
+    items = [
+        define_model_key(model),
+        rounded_parameters,
+        repr([float(value) for value in x]),
+        repr([float(value) for value in exp_data]),
+        repr([float(value) for value in exp_error]),
+        dataID,
+        weight_by_error,
+        repr(parameter_labels),
+    ]
+    return hashlib.sha1("\n".join(items).encode("utf-8")).hexdigest()
+
+
+def get_connection() -> sqlite3.Connection:
+    """Returns the sqlite connection of the current process to the shared cache file,
+    creating the file and table if needed
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    connection
+        the sqlite connection
+
+    """
+    if _connection["pid"] != os.getpid():
+        connection = sqlite3.connect(_cache_settings["path"], timeout=60)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, value BLOB)"
+        )
+        connection.commit()
+        _connection["pid"] = os.getpid()
+        _connection["connection"] = connection
+    return _connection["connection"]
+
+
+def lookup(key: str) -> Optional[tuple]:
+    """Returns the cached value for the key, from memory or from the shared cache file,
+    and updates the hit and miss statistics
+
+    Parameters
+    ----------
+    key
+        a string defining the cache key
+
+    Returns
+    -------
+    value
+        the cached value, or None if the key is not in the cache
+
+    """
+    if key in _cache:
+        _cache.move_to_end(key)
+        _cache_statistics["hits"] += 1
+        return _cache[key]
+
+    if _cache_settings["path"] != "":
+        row = (
+            get_connection().execute("SELECT value FROM solutions WHERE key = ?", (key,)).fetchone()
+        )
+        if row is not None:
+            _cache_statistics["disk_hits"] += 1
+            value = pickle.loads(row[0])
+            store_in_memory(key, value)
+            return value
+
+    _cache_statistics["misses"] += 1
+    return None
+
+
+def store_in_memory(key: str, value: tuple) -> None:
+    """Stores the value in the in-memory cache, removing the least recently used entries
+    beyond _cache_settings["max_size"]
+
+    Parameters
+    ----------
+    key
+        a string defining the cache key
+
+    value
+        the value to store
+
+    Returns
+    -------
+    None
+
+    """
+    _cache[key] = value
+    _cache.move_to_end(key)
+    while len(_cache) > _cache_settings["max_size"]:
+        _cache.popitem(last=False)
+        _cache_statistics["evictions"] += 1
+
+
+def store(key: str, value: tuple) -> None:
+    """Stores the value in the in-memory cache and in the shared cache file (if defined)
+
+    Parameters
+    ----------
+    key
+        a string defining the cache key
+
+    value
+        the value to store
+
+    Returns
+    -------
+    None
+
+    """
+    store_in_memory(key, value)
+    if _cache_settings["path"] != "":
+        connection = get_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO solutions (key, value) VALUES (?, ?)",
+            (key, pickle.dumps(value)),
+        )
+        connection.commit()
+
+
+def get_cache_statistics() -> dict:
+    """Returns the cache statistics of the current process
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    statistics
+        a dictionary defining the number of hits in memory ("hits") and in the shared cache
+        file ("disk_hits"), misses, evictions from memory and the number of entries in
+        memory ("size")
+
+    """
+    return {**_cache_statistics, "size": len(_cache)}
+
+
+def print_cache_statistics() -> None:
+    """Prints the cache statistics of the current process (worker processes keep their
+    own statistics)
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+
+    """
+    statistics = get_cache_statistics()
+    num_lookups = statistics["hits"] + statistics["disk_hits"] + statistics["misses"]
+    hit_rate = 0.0
+    if num_lookups > 0:
+        hit_rate = (statistics["hits"] + statistics["disk_hits"]) / num_lookups
+    print(
+        "Solution cache: "
+        + str(statistics["hits"])
+        + " hits, "
+        + str(statistics["disk_hits"])
+        + " disk hits, "
+        + str(statistics["misses"])
+        + " misses ("
+        + str(round(100 * hit_rate, 1))
+        + "% hit rate), "
+        + str(statistics["size"])
+        + " entries"
+    )
+
+
+def solve_cached(key: str, solve: Any) -> Tuple[List[float], float, float]:
+    """Returns the cached results for the key, or calls solve() and caches its results
+
+    Parameters
+    ----------
+    key
+        a string defining the cache key (see define_cache_key())
+
+    solve
+        a function without arguments returning the normalized solutions, chi_sq and r_sq
+
+    Returns
+    -------
+    solutions_norm
+        a list of floats containing the normalized simulation values (a copy, so the
+        cached value is not changed by the caller)
+
+    chi_sq
+        a float defining the value of the cost function
+
+    r_sq
+        a float defining the value of the correlation coefficient (r_sq)
+
+    """
+    value = lookup(key)
+    if value is None:
+        solutions_norm, chi_sq, r_sq = solve()
+        value = (list(solutions_norm), chi_sq, r_sq)
+        store(key, value)
+    return list(value[0]), value[1], value[2]
@@ -5,7 +5,7 @@ Created on Tue Jun 14 13:37:00 2022
 
 @author: kate
 """
-from typing import List
+from typing import List, Optional
 from sklearn.linear_model import LinearRegression
 import numpy as np
 
@@ -78,3 +78,93 @@ def calc_chi_sq(
         chi_sq = chi_sq + err
 
     return chi_sq
+
+
+def calc_chi_sq_lower_bound(
+    exp_: List[float],
+    sim_raw: List[float],
+    std: List[float],
+    weight_by_error: str,
+    normalization_groups: Optional[List[List[int]]],
+) -> float:
+    """Calculates a lower bound on chi2 (as defined by calc_chi_sq()) from the unnormalized
+    simulated data of a subset of the datapoints, for any values of the other datapoints
+
+    Within each normalization group, the maximum used to normalize the data is at least the
+    maximum of the datapoints simulated so far, so the normalized data are the simulated data
+    multiplied by a scale factor s between 0 and 1 / (the maximum so far). The bound for the
+    simulated datapoints of each group is the minimum of their chi2 over s (a quadratic in s),
+    and each datapoint not simulated yet adds its distance to [0, 1], the range of normalized
+    data. Once all datapoints of a group are simulated, s is 1 / (the group maximum), so the
+    bound is chi2 when all datapoints are simulated.
+
+    Parameters
+    ----------
+    exp_
+        a list of floats defining the experimental data
+
+    sim_raw
+        a list of floats defining the simulated data before normalization
+        (nan for datapoints not simulated yet)
+
+    std
+        a list of floats defining the measurement error for the experimental data
+
+    weight_by_error
+        a string defining whether the cost function should be weighted by error or not
+
+    normalization_groups
+        a list of lists defining the start and stop index of each group of datapoints
+        normalized by their maximum value, or None if the data are not normalized
+
+    Returns
+    -------
+    chi_sq_lower_bound
+        a float defining the lower bound on the chi_sq value
+
+    """
+    exp_ = np.asarray(exp_, dtype=float)
+    sim_raw = np.asarray(sim_raw, dtype=float)
+    weights = np.ones(len(exp_))
+    if weight_by_error != "no":
+        weights = 1 / np.asarray(std, dtype=float) ** 2
+    simulated = ~np.isnan(sim_raw)
+
+    if normalization_groups is None:
+        # the other datapoints can take any value
+        return float(np.sum(weights[simulated] * (exp_[simulated] - sim_raw[simulated]) ** 2))
+
+    chi_sq_lower_bound = float(0)
+    for start, stop in normalization_groups:
+        group_exp = exp_[start:stop]
+        group_sim = sim_raw[start:stop]
+        group_weights = weights[start:stop]
+        group_simulated = simulated[start:stop]
+
+        # datapoints not simulated yet
+        distance = np.maximum(group_exp[~group_simulated] - 1, 0) + np.maximum(
+            -group_exp[~group_simulated], 0
+        )
+        chi_sq_lower_bound += float(np.sum(group_weights[~group_simulated] * distance**2))
+
+        # simulated datapoints, minimized over the scale factor s = 1 / (group maximum)
+        sim_ = group_sim[group_simulated]
+        if len(sim_) == 0:
+            continue
+        exp_simulated = group_exp[group_simulated]
+        weights_simulated = group_weights[group_simulated]
+        curvature = np.sum(weights_simulated * sim_**2)
+        scale_factor_max = 1 / np.max(sim_) if np.max(sim_) > 0 else np.inf
+        scale_factor = 0.0
+        if np.all(group_simulated):
+            # the group maximum is known
+            scale_factor = scale_factor_max
+        elif curvature > 0:
+            scale_factor = np.clip(
+                np.sum(weights_simulated * exp_simulated * sim_) / curvature, 0, scale_factor_max
+            )
+        chi_sq_lower_bound += float(
+            np.sum(weights_simulated * (exp_simulated - scale_factor * sim_) ** 2)
+        )
+
+    return chi_sq_lower_bound
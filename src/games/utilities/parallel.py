@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:04:52 2026
+
+Arrays shared between the processes of a multiprocessing pool and scheduling of pool tasks
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from functools import partial
+from multiprocessing import shared_memory
+import queue
+import time
+import numpy as np
+
+# shared memory blocks attached in the current process, kept open while the arrays are used
+_attached_blocks: List[shared_memory.SharedMemory] = []
+
+
+def share_arrays(
+    arrays: Dict[str, np.ndarray]
+) -> Tuple[List[shared_memory.SharedMemory], Dict[str, tuple]]:
+    """Copies arrays to shared memory blocks
+
+    Parameters
+    ----------
+    arrays
+        a dictionary defining the arrays to share (values) and their names (keys)
+
+    Returns
+    -------
+    blocks
+        a list of the shared memory blocks (to be released by release_shared_arrays())
+
+    specs
+        a dictionary defining the shared memory block name, shape and dtype of each array,
+        which is all a worker process needs to attach the arrays (see attach_shared_arrays())
+
+    """
+    blocks = []
+    specs = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.shape, array.dtype.str)
+
+    return blocks, specs
+
+
+def attach_shared_arrays(specs: Dict[str, tuple]) -> Dict[str, np.ndarray]:
+    """Attaches the arrays defined by share_arrays() in the current process (without copying)
+
+    Parameters
+    ----------
+    specs
+        a dictionary defining the shared memory block name, shape and dtype of each array
+
+    Returns
+    -------
+    arrays
+        a dictionary defining the arrays (views of the shared memory blocks)
+
+    """
+    arrays = {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _attached_blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+    return arrays
+
+
+def release_shared_arrays(blocks: List[shared_memory.SharedMemory]) -> None:
+    """Closes and removes the shared memory blocks created by share_arrays()
+
+    Parameters
+    ----------
+    blocks
+        a list of the shared memory blocks
+
+    Returns
+    -------
+    None
+
+    """
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+@contextmanager
+def shared_arrays(
+    arrays: Dict[str, np.ndarray], outputs: Tuple[str, ...] = ()
+) -> Iterator[Tuple[Dict[str, tuple], Dict[str, np.ndarray]]]:
+    """Context manager that copies arrays to shared memory and removes the shared memory
+    blocks on exit, including when an error is raised in the pool
+
+    Parameters
+    ----------
+    arrays
+        a dictionary defining the arrays to share (values) and their names (keys)
+
+    outputs
+        a tuple of strings defining the names of the arrays written by the worker processes,
+        which are copied back on exit
+
+    Returns
+    -------
+    specs
+        a dictionary defining the shared memory block name, shape and dtype of each array
+        (passed to the pool initializer)
+
+    results
+        a dictionary filled on exit with a copy of each array in outputs
+
+    """
+    blocks, specs = share_arrays(arrays)
+    results: Dict[str, np.ndarray] = {}
+    try:
+        yield specs, results
+        for block, (name, (_, shape, dtype)) in zip(blocks, specs.items()):
+            if name in outputs:
+                results[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf).copy()
+    finally:
+        release_shared_arrays(blocks)
+
+
+def define_chunksize(
+    num_tasks: int, num_cores: int, task_time: float, target_chunk_time: float = 0.2
+) -> int:
+    """Defines the number of tasks sent to a worker process at a time, so that each chunk
+    takes about target_chunk_time (to make the communication overhead per task small)
+    while keeping at least 4 chunks per core (to balance the load across the cores)
+
+    Parameters
+    ----------
+    num_tasks
+        an int defining the number of tasks
+
+    num_cores
+        an int defining the number of worker processes
+
+    task_time
+        a float defining the measured time per task (s)
+
+    target_chunk_time
+        a float defining the target time per chunk (s)
+
+    Returns
+    -------
+    chunksize
+        an int defining the number of tasks per chunk
+
+    """
+    chunksize_load_balance = num_tasks // (4 * num_cores)
+    if task_time <= 0:
+        return max(1, chunksize_load_balance)
+
+    return max(1, min(int(target_chunk_time / task_time), chunksize_load_balance))
+
+
+def call_with_indices(func: Callable, indices: List[int]) -> List[Tuple[int, Any, float]]:
+    """Calls func(index) for each index in a chunk and returns each result tagged with its
+    index (so that results that finish out of order can be matched to their tasks) and
+    the time it took
+
+    Parameters
+    ----------
+    func
+        a function of the task index
+
+    indices
+        a list of ints defining the task indices of the chunk
+
+    Returns
+    -------
+    results
+        a list of tuples defining the task index, the result of func(index) and the time
+        taken by the task (s)
+
+    """
+    results = []
+    for index in indices:
+        start_time = time.perf_counter()
+        result = func(index)
+        results.append((index, result, time.perf_counter() - start_time))
+    return results
+
+
+def imap_unordered_tagged(
+    pool: Any, func: Callable, num_tasks: int, num_cores: int, chunksize: Optional[int] = None
+) -> Iterator[Tuple[int, Any]]:
+    """Runs func(index) for index = 0 to num_tasks - 1 in the pool and yields each
+    (index, result) as soon as it finishes, in the order they finish
+
+    Chunks are submitted as earlier chunks finish, keeping 2 * num_cores chunks queued
+    or running, so that a worker process is never waiting for another chunk while tasks
+    are left. If chunksize is None, the first chunks have one task each and the size of
+    each later chunk is defined by define_chunksize() from the median time of the tasks
+    finished so far (so chunks shrink as the remaining tasks run out and a few slow tasks
+    do not set the chunk size).
+
+    Parameters
+    ----------
+    pool
+        a multiprocessing pool
+
+    func
+        a function of the task index (must be picklable, so defined at module level)
+
+    num_tasks
+        an int defining the number of tasks
+
+    num_cores
+        an int defining the number of worker processes in the pool
+
+    chunksize
+        an int defining the number of tasks per chunk, or None to define it from the
+        measured time per task
+
+    Returns
+    -------
+    index
+        an int defining the task index
+
+    result
+        the result of func(index)
+
+    """
+    chunk_func = partial(call_with_indices, func)
+    finished_chunks: "queue.Queue[Any]" = queue.Queue()
+    task_times: List[float] = []
+    next_index = 0
+    num_chunks_running = 0
+    while next_index < num_tasks or num_chunks_running > 0:
+        while next_index < num_tasks and num_chunks_running < 2 * num_cores:
+            size = chunksize
+            if size is None:
+                size = 1
+                if len(task_times) > 0:
+                    size = define_chunksize(
+                        num_tasks - next_index, num_cores, float(np.median(task_times))
+                    )
+            indices = list(range(next_index, min(num_tasks, next_index + size)))
+            pool.apply_async(
+                chunk_func,
+                (indices,),
+                callback=finished_chunks.put,
+                error_callback=finished_chunks.put,
+            )
+            next_index += len(indices)
+            num_chunks_running += 1
+
+        results = finished_chunks.get()
+        num_chunks_running -= 1
+        if isinstance(results, BaseException):
+            raise results
+        for index, result, task_time in results:
+            task_times.append(task_time)
+            yield index, result
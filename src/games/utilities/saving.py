@@ -4,12 +4,26 @@
 Created on Tue Jun 14 13:47:26 2022
 @author: kate
 """
-from typing import List
+from typing import Dict, List
 import os
 import json
+import zipfile
 from datetime import date
+import numpy as np
 import pandas as pd
 
+# columns of the optimization results that hold lists or objects, which are saved to the
+# trajectory file instead of "optimization results.csv" when trajectories are recorded
+TRAJECTORY_COLUMNS = [
+    "model",
+    "chi_sq_list",
+    "Simulation results",
+    "x",
+    "exp_data",
+    "exp_error",
+    "trajectory",
+]
+
 
 def make_main_directory(settings: dict) -> str:
     """Makes main results folder
@@ -118,3 +132,97 @@ def save_pem_evaluation_data(solutions_norm_noise: List[list]) -> None:
         label = "pem evaluation data" + str(i + 1)
         df_pem_evaluation_data[label] = dataset
     df_pem_evaluation_data.to_csv("PEM evaluation data.csv")
+
+
+def save_optimization_trajectories(
+    df_optimization_results: pd.DataFrame, parameter_labels: List[str], filename: str
+) -> pd.DataFrame:
+    """Appends the trajectories of the optimization runs to an npz file as a new batch of
+    arrays, so that the trajectories of previous calls (for example, previous PPL steps)
+    are kept
+
+    Each batch holds one row per model evaluation ("run", "evaluation", "time", "chi_sq"
+    and "parameters", with one column per parameter label) and one row per optimization
+    run ("runs", "simulation_results", "x", "exp_data" and "exp_error").
+
+    Parameters
+    ----------
+    df_optimization_results
+        df containing the results of all optimization runs, including the "trajectory"
+        column defined by define_results_row()
+
+    parameter_labels
+        a list of strings defining the parameter labels
+
+    filename
+        a string defining the path to the npz file
+
+    Returns
+    -------
+    df_scalar_results
+        df containing the scalar columns of df_optimization_results and the references to
+        the trajectory of each run ("num_evaluations", "trajectory file",
+        "trajectory batch" and "run")
+
+    """
+    trajectories = list(df_optimization_results["trajectory"])
+    num_evaluations = [len(trajectory["time"]) for trajectory in trajectories]
+    runs = np.array([trajectory["run"] for trajectory in trajectories], dtype=int)
+    arrays = {
+        "parameter_labels": np.array(parameter_labels),
+        "run": np.repeat(runs, num_evaluations),
+        "evaluation": np.concatenate([np.arange(num) for num in num_evaluations]),
+        "time": np.concatenate([trajectory["time"] for trajectory in trajectories]),
+        "chi_sq": np.concatenate(list(df_optimization_results["chi_sq_list"])).astype(float),
+        "parameters": np.concatenate([trajectory["parameters"] for trajectory in trajectories]),
+        "runs": runs,
+    }
+    for column, name in [
+        ("Simulation results", "simulation_results"),
+        ("x", "x"),
+        ("exp_data", "exp_data"),
+        ("exp_error", "exp_error"),
+    ]:
+        arrays[name] = np.array(list(df_optimization_results[column]), dtype=float)
+
+    # a batch is a folder of .npy members, appended without rewriting the previous batches
+    with zipfile.ZipFile(filename, "a") as file:
+        batch = len({name.split("/")[0] for name in file.namelist()})
+        for name, array in arrays.items():
+            with file.open(str(batch) + "/" + name + ".npy", "w", force_zip64=True) as member:
+                np.lib.format.write_array(  # type: ignore[no-untyped-call]
+                    member, array, allow_pickle=False
+                )
+
+    df_scalar_results = df_optimization_results.drop(
+        columns=[column for column in TRAJECTORY_COLUMNS if column in df_optimization_results]
+    )
+    df_scalar_results["num_evaluations"] = num_evaluations
+    df_scalar_results["trajectory file"] = filename
+    df_scalar_results["trajectory batch"] = batch
+
+    return df_scalar_results
+
+
+def load_optimization_trajectories(filename: str, batch: int = -1) -> Dict[str, np.ndarray]:
+    """Loads a batch of optimization trajectories saved by save_optimization_trajectories()
+
+    Parameters
+    ----------
+    filename
+        a string defining the path to the npz file
+
+    batch
+        an int defining the batch to load (-1 for the last batch)
+
+    Returns
+    -------
+    arrays
+        a dictionary defining the arrays of the batch (see save_optimization_trajectories())
+
+    """
+    with np.load(filename, allow_pickle=False) as file:
+        batches = sorted({int(name.split("/")[0]) for name in file.files})
+        batch = batches[batch]
+        prefix = str(batch) + "/"
+        return {name[len(prefix) :]: file[name] for name in file.files if name.startswith(prefix)}
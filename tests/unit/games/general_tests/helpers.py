@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+
+Helper functions shared by the general tests
+"""
+
+import numpy as np
+
+
+def finite_difference_jacobian(gradient, y, args, step=1e-6):
+    """Approximates the Jacobian of gradient(y, t, *args) with central differences"""
+    jacobian = np.zeros((len(y), len(y)))
+    for j in range(len(y)):
+        perturbation = np.zeros(len(y))
+        perturbation[j] = step
+        jacobian[:, j] = (
+            gradient(y + perturbation, 0.0, *args) - gradient(y - perturbation, 0.0, *args)
+        ) / (2 * step)
+    return jacobian
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from games.models.synTF import synTF
+from games.modules.solve_single import solve_single_parameter_set
+from games.utilities import cache
+
+X = [0, 2, 5, 10, 20, 50, 100, 200]
+EXP_DATA = [0.0, 0.05, 0.1, 0.2, 0.35, 0.6, 0.85, 1.0]
+EXP_ERROR = [0.05] * 8
+DATA = [X, EXP_DATA, EXP_ERROR, "synTF dose response", "yes", ["b", "m", "w"]]
+
+
+class TestCache(unittest.TestCase):
+    def tearDown(self):
+        cache.configure_cache({})
+
+    def test_disabled_by_default(self):
+        """Tests whether the cache is disabled unless solution_cache_size is defined"""
+        settings = {}
+        cache.configure_cache(settings)
+        self.assertFalse(cache.cache_enabled())
+        self.assertEqual(settings["solution_cache_size"], 0)
+        solve_single_parameter_set(synTF(), [1, 1113, 0.032], *DATA)
+        self.assertEqual(cache.get_cache_statistics()["misses"], 0)
+
+    def test_hits_and_results(self):
+        """Tests whether repeated parameter sets are returned from the cache with the same
+        results as without the cache"""
+        model = synTF()
+        expected = solve_single_parameter_set(model, [1, 1113, 0.032], *DATA)
+        cache.configure_cache({"solution_cache_size": 10})
+        for _ in range(3):
+            solutions_norm, chi_sq, r_sq = solve_single_parameter_set(
+                model, [1, 1113, 0.032], *DATA
+            )
+            np.testing.assert_allclose(solutions_norm, expected[0])
+            self.assertEqual(chi_sq, expected[1])
+            self.assertEqual(r_sq, expected[2])
+            # changing the returned solutions does not change the cached value
+            solutions_norm[0] = -1
+        statistics = cache.get_cache_statistics()
+        self.assertEqual(statistics["misses"], 1)
+        self.assertEqual(statistics["hits"], 2)
+
+    def test_key(self):
+        """Tests whether the key depends on the (rounded) parameters, the model and the data"""
+        cache.configure_cache({"solution_cache_size": 10, "solution_cache_digits": 6})
+        model = synTF()
+        key = cache.define_cache_key(model, [1, 1113, 0.032], *DATA)
+        self.assertEqual(key, cache.define_cache_key(model, [1, 1113.0000001, 0.032], *DATA))
+        self.assertNotEqual(key, cache.define_cache_key(model, [1, 1114, 0.032], *DATA))
+        self.assertNotEqual(
+            key, cache.define_cache_key(synTF(inputs=[50]), [1, 1113, 0.032], *DATA)
+        )
+        other_data = [X, EXP_DATA[:-1] + [0.9], *DATA[2:]]
+        self.assertNotEqual(key, cache.define_cache_key(model, [1, 1113, 0.032], *other_data))
+        other_weight = DATA[:4] + ["no", DATA[5]]
+        self.assertNotEqual(key, cache.define_cache_key(model, [1, 1113, 0.032], *other_weight))
+
+    def test_lru_eviction(self):
+        """Tests whether the least recently used entries are removed beyond the cache size"""
+        cache.configure_cache({"solution_cache_size": 2})
+        cache.store("a", ([1.0], 1.0, 1.0))
+        cache.store("b", ([2.0], 2.0, 1.0))
+        self.assertIsNotNone(cache.lookup("a"))
+        cache.store("c", ([3.0], 3.0, 1.0))
+        self.assertIsNone(cache.lookup("b"))
+        self.assertIsNotNone(cache.lookup("a"))
+        self.assertIsNotNone(cache.lookup("c"))
+        statistics = cache.get_cache_statistics()
+        self.assertEqual(statistics["evictions"], 1)
+        self.assertEqual(statistics["size"], 2)
+
+    def test_shared_file(self):
+        """Tests whether entries stored in the cache file are found after the in-memory
+        cache is cleared (as by another process with the same file)"""
+        with tempfile.TemporaryDirectory() as folder:
+            settings = {"solution_cache_size": 10, "solution_cache_path": "cache.sqlite"}
+            settings["context"] = folder
+            cache.configure_cache(settings)
+            model = synTF()
+            expected = solve_single_parameter_set(model, [1, 1113, 0.032], *DATA)
+            self.assertTrue(os.path.exists(os.path.join(folder, "cache.sqlite")))
+
+            # a new in-memory cache with the same file
+            cache.configure_cache({"solution_cache_size": 5})
+            cache.configure_cache(settings)
+            found = solve_single_parameter_set(model, [1, 1113, 0.032], *DATA)
+            np.testing.assert_allclose(found[0], expected[0])
+            self.assertEqual(found[1], expected[1])
+            statistics = cache.get_cache_statistics()
+            self.assertEqual(statistics["disk_hits"], 1)
+            self.assertEqual(statistics["misses"], 0)
+            cache.get_connection().close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import unittest
+import numpy as np
+from games.models import compiled
+from games.models.synTF import synTF
+from games.models.synTF_chem import synTF_chem
+from tests.unit.games.general_tests.helpers import finite_difference_jacobian
+
+
+class TestCompiledKernels(unittest.TestCase):
+    def test_gradient_synTF(self):
+        # Tests whether the synTF kernel matches the gradient of the model class
+        y = np.array([1.0, 2.0, 3.0, 4.0])
+        expected = synTF.gradient(y, 0, [1, 2, 3], [50])
+        found = compiled.synTF_gradient(y, 0.0, np.array([1.0, 2.0, 3.0, 50.0]))
+        np.testing.assert_allclose(found, expected)
+
+    def test_gradient_synTF_chem(self):
+        # Tests whether the synTF_chem kernel matches the gradient of the model class
+        # (m is packed relative to b for mechanisms C and D)
+        y = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0])
+        parameters = [15, 1.5, 0.05, 7, 10, 2]
+        for mechanismID in ["A", "B", "C", "D"]:
+            model = synTF_chem(parameters=parameters, mechanismID=mechanismID, inputs=[50, 20])
+            expected = model.gradient(y, 0, parameters, [50, 20], mechanismID)
+            p = np.concatenate((model.pack_parameters(), [50.0, 20.0]))
+            found = compiled.synTF_chem_gradient(y, 0.0, p)
+            np.testing.assert_allclose(found, expected)
+
+    def test_jacobian(self):
+        # Tests whether the analytic Jacobians match finite difference approximations
+        rng = np.random.default_rng(456767)
+        for _ in range(5):
+            y = rng.uniform(0.1, 5, 4)
+            p = np.concatenate((rng.uniform(0.1, 3, 3), [50.0]))
+            np.testing.assert_allclose(
+                compiled.synTF_jacobian(y, 0.0, p),
+                finite_difference_jacobian(compiled.synTF_gradient, y, (p,)),
+                atol=1e-6,
+            )
+
+            y = rng.uniform(0.1, 5, 8)
+            p = np.concatenate((rng.uniform(0.1, 3, 5), [50.0, 20.0]))
+            np.testing.assert_allclose(
+                compiled.synTF_chem_jacobian(y, 0.0, p),
+                finite_difference_jacobian(compiled.synTF_chem_gradient, y, (p,)),
+                atol=1e-6,
+            )
+
+    @unittest.skipIf(not compiled.NUMBA_AVAILABLE, "numba is not installed")
+    def test_solve_experiment_numba(self):
+        # Tests whether the numba backend gives the same solutions as the python backend
+        parameter_labels = ["e", "b", "k_bind", "m", "km", "n"]
+        x = [0, 1, 1.67, 2.78, 4.64, 7.74, 12.92, 21.54, 35.98, 59.95, 100]
+        x += [0, 2, 5, 10, 20, 50, 100, 200] * 2
+        dataID = "ligand dose response and DBD dose response"
+        parameters = [15, 1, 0.05, 720, 100, 2]
+        for solve_mode in ["default", "batch"]:
+            model = synTF_chem(parameters=parameters, mechanismID="D", solve_mode=solve_mode)
+            expected = model.solve_experiment(x, dataID, parameter_labels)
+            model = synTF_chem(
+                parameters=parameters,
+                mechanismID="D",
+                solve_mode=solve_mode,
+                model_backend="numba",
+            )
+            found = model.solve_experiment(x, dataID, parameter_labels)
+            np.testing.assert_allclose(found, expected, rtol=1e-4, atol=1e-8)
+
+        x = [0, 2, 5, 10, 20, 50, 100, 200]
+        expected = synTF(parameters=[1, 1, 1]).solve_experiment(x, "synTF dose response", None)
+        found = synTF(parameters=[1, 1, 1], model_backend="numba").solve_experiment(
+            x, "synTF dose response", None
+        )
+        np.testing.assert_allclose(found, expected, rtol=1e-4, atol=1e-8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import unittest
+import numpy as np
+from games.models.synTF_chem import synTF_chem
+from games.modules.solve_single import (
+    define_condition_stages,
+    solve_single_parameter_set,
+    solve_single_parameter_set_early_abort,
+)
+from games.utilities.metrics import calc_chi_sq, calc_chi_sq_lower_bound
+
+PARAMETER_LABELS = ["e", "b", "k_bind", "m", "km", "n"]
+X = [0, 1, 1.67, 2.78, 4.64, 7.74, 12.92, 21.54, 35.98, 59.95, 100]
+X += [0, 2, 5, 10, 20, 50, 100, 200]
+DATAID = "ligand dose response and DBD dose response"
+
+
+class TestEarlyAbort(unittest.TestCase):
+    def test_calc_chi_sq_lower_bound(self):
+        """Tests whether the lower bound is at most chi_sq for any subset of simulated
+        datapoints and equal to chi_sq when all datapoints are simulated"""
+        rng = np.random.default_rng(456767)
+        normalization_groups = [[0, 11], [11, 27]]
+        for _ in range(200):
+            solutions_raw = rng.uniform(0, 100, 27)
+            exp_data = rng.uniform(-0.1, 1.1, 27)
+            exp_error = rng.uniform(0.01, 0.2, 27)
+            solutions_norm = synTF_chem.normalize_data(list(solutions_raw), DATAID)
+            chi_sq = calc_chi_sq(exp_data, solutions_norm, exp_error, "yes")
+
+            simulated = rng.random(27) < 0.5
+            solutions_partial = np.where(simulated, solutions_raw, np.nan)
+            self.assertLessEqual(
+                calc_chi_sq_lower_bound(
+                    exp_data, solutions_partial, exp_error, "yes", normalization_groups
+                ),
+                chi_sq + 1e-9,
+            )
+            self.assertAlmostEqual(
+                calc_chi_sq_lower_bound(
+                    exp_data, solutions_raw, exp_error, "yes", normalization_groups
+                ),
+                chi_sq,
+            )
+
+    def test_define_condition_stages(self):
+        """Tests whether the normalization groups are solved one at a time, smallest first,
+        starting with the maximum of each group"""
+        exp_data = [0.1, 0.9, 0.5, 1.0, 0.2, 0.3, 0.8]
+        stages = define_condition_stages(exp_data, [[0, 4], [4, 7]], 2)
+        self.assertEqual(stages, [[6, 4], [5], [3, 0], [1, 2]])
+        stages = define_condition_stages(exp_data, None, 1)
+        self.assertEqual(stages, [[3, 0, 1, 2, 4, 5, 6]])
+
+    def test_solve_single_parameter_set_early_abort(self):
+        """Tests whether the evaluation matches the full evaluation below the threshold
+        and is aborted above the threshold"""
+        model = synTF_chem(parameters=[15, 1, 0.05, 720, 100, 2], mechanismID="D")
+        rng = np.random.default_rng(1234)
+        exp_data = list(rng.uniform(0, 1, 27))
+        exp_error = [0.05] * 27
+        parameters = [1.5, 0.1, 1, 72, 10, 1]
+        solutions_expected, chi_sq_expected, _ = solve_single_parameter_set(
+            model, parameters, X, exp_data, exp_error, DATAID, "yes", PARAMETER_LABELS
+        )
+
+        for solve_mode in ["default", "batch"]:
+            model.solve_mode = solve_mode
+            solutions, chi_sq = solve_single_parameter_set_early_abort(
+                model,
+                parameters,
+                X,
+                exp_data,
+                exp_error,
+                DATAID,
+                "yes",
+                PARAMETER_LABELS,
+                chi_sq_expected + 1,
+                4,
+            )
+            np.testing.assert_allclose(solutions, solutions_expected, rtol=1e-4)
+            self.assertAlmostEqual(chi_sq, chi_sq_expected, delta=1e-3 * chi_sq_expected)
+
+            solutions, chi_sq_lower_bound = solve_single_parameter_set_early_abort(
+                model,
+                parameters,
+                X,
+                exp_data,
+                exp_error,
+                DATAID,
+                "yes",
+                PARAMETER_LABELS,
+                chi_sq_expected / 2,
+                4,
+            )
+            self.assertIsNone(solutions)
+            self.assertGreater(chi_sq_lower_bound, chi_sq_expected / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
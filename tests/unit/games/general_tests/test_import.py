@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+MODULES = [
+    "games.models.set_model",
+    "games.modules.solve_single",
+    "games.modules.parameter_estimation.global_search",
+    "games.modules.parameter_estimation.optimization",
+    "games.modules.parameter_profile_likelihood.calculate_parameter_profile_likelihood",
+    "games.run",
+]
+
+
+class TestImport(unittest.TestCase):
+    def test_no_plotting_libraries(self):
+        # Tests whether importing the modules used by pool workers does not load pyplot or
+        # seaborn (checked in a new process, since other tests import them)
+        code = (
+            "import sys\n"
+            + "".join("import " + module + "\n" for module in MODULES)
+            + "print([name for name in ['matplotlib.pyplot', 'seaborn'] if name in sys.modules])"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
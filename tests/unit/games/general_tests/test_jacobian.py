@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import unittest
+import numpy as np
+from games.models.synTF import synTF
+from games.models.synTF_chem import synTF_chem
+from tests.unit.games.general_tests.helpers import finite_difference_jacobian
+
+
+class TestJacobian(unittest.TestCase):
+    def test_jacobian_synTF(self):
+        # Tests whether the analytic Jacobian matches a finite difference approximation
+        rng = np.random.default_rng(456767)
+        for _ in range(5):
+            y = rng.uniform(0.1, 5, 4)
+            args = (list(rng.uniform(0.1, 3, 3)), [50])
+            np.testing.assert_allclose(
+                synTF.jacobian(y, 0, *args),
+                finite_difference_jacobian(synTF.gradient, y, args),
+                atol=1e-6,
+            )
+
+    def test_jacobian_synTF_chem(self):
+        # Tests whether the analytic Jacobian matches a finite difference approximation
+        # for each mechanism
+        rng = np.random.default_rng(456767)
+        for mechanismID in ["A", "B", "C", "D"]:
+            for _ in range(5):
+                y = rng.uniform(0.1, 5, 8)
+                args = (list(rng.uniform(0.1, 3, 6)), [50, 20], mechanismID)
+                np.testing.assert_allclose(
+                    synTF_chem.jacobian(y, 0, *args),
+                    finite_difference_jacobian(synTF_chem.gradient, y, args),
+                    atol=1e-6,
+                )
+
+    def test_jacobian_batch_synTF_chem(self):
+        # Tests whether the banded batch Jacobian contains the Jacobian of each condition
+        rng = np.random.default_rng(456767)
+        parameters = [15, 1, 0.05, 7, 10, 2]
+        inputs = np.array([[50, 50], [20, 10], [5, 20]], dtype=float)
+        y = rng.uniform(0.1, 5, 8 * len(inputs))
+        jacobian_banded = synTF_chem.jacobian_batch(
+            y, 0, parameters, inputs, "D", synTF_chem.define_rate_matrix()
+        )
+
+        jacobian = np.zeros((len(y), len(y)))
+        for i in range(len(y)):
+            for j in range(max(0, i - 7), min(len(y), i + 8)):
+                jacobian[i, j] = jacobian_banded[i - j + 7, j]
+
+        for condition, inputs_condition in enumerate(inputs):
+            block = slice(8 * condition, 8 * (condition + 1))
+            expected = synTF_chem.jacobian(y[block], 0, parameters, list(inputs_condition), "D")
+            np.testing.assert_allclose(jacobian[block, block], expected)
+            jacobian[block, block] = 0
+        np.testing.assert_array_equal(jacobian, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import os
+import unittest
+import numpy as np
+import games.models
+from games.models.defined_model import DefinedModel
+from games.models.model_definition import (
+    check_model_definition,
+    differentiate,
+    load_model_definition,
+    parse_expression,
+    to_source,
+)
+from games.models.synTF import synTF
+from games.models.synTF_chem import synTF_chem
+from tests.unit.games.general_tests.helpers import finite_difference_jacobian
+
+DEFINITIONS = os.path.join(os.path.dirname(games.models.__file__), "definitions")
+
+
+class TestModelDefinition(unittest.TestCase):
+    def test_differentiate(self):
+        # Tests symbolic derivatives against finite differences
+        values = {"x": 0.7, "a": 2.0, "n": 1.5}
+        for expression in [
+            "a * x ** n / (1 + x ** n)",
+            "exp(-a * x) - log(1 + x)",
+            "sqrt(a * x) * x ** x",
+            "-(x - a) / (x + a)",
+        ]:
+            derivative = eval(
+                to_source(differentiate(parse_expression(expression), "x")),
+                {"exp": np.exp, "log": np.log, "sqrt": np.sqrt},
+                dict(values),
+            )
+            step = 1e-6
+            finite_difference = (
+                eval(
+                    expression,
+                    {"exp": np.exp, "log": np.log, "sqrt": np.sqrt},
+                    {**values, "x": 0.7 + step},
+                )
+                - eval(
+                    expression,
+                    {"exp": np.exp, "log": np.log, "sqrt": np.sqrt},
+                    {**values, "x": 0.7 - step},
+                )
+            ) / (2 * step)
+            self.assertAlmostEqual(derivative, finite_difference, places=6)
+
+    def test_check_model_definition(self):
+        # Tests whether invalid definitions are rejected
+        definition = load_model_definition(os.path.join(DEFINITIONS, "synTF.json"))
+        definition["reactions"].append({"rate": "1", "products": {"unknown": 1}})
+        with self.assertRaises(ValueError):
+            check_model_definition(definition)
+
+    def test_check_expression_names(self):
+        # Tests whether unknown names in rate laws, expressions and the protocol are rejected
+        # when the definition is loaded instead of when the model is solved
+        for key, change, message in [
+            ("reactions", {"rate": "k_txnn * ZF_dose"}, "reaction ZF transcription: k_txnn"),
+            ("reactions", {"rate": "sin(ZF_mRNA)"}, "reaction ZF transcription: sin"),
+            ("reactions", {"rate": "k_txn *"}, "Invalid expression in reaction ZF transcription"),
+            ("protocol", {"set": {"ligand": "ligand_doses"}}, "protocol phase transfection"),
+        ]:
+            definition = load_model_definition(os.path.join(DEFINITIONS, "synTF_chem.json"))
+            definition[key][0].update(change)
+            with self.assertRaisesRegex(ValueError, message):
+                check_model_definition(definition)
+            with self.assertRaisesRegex(ValueError, message):
+                DefinedModel(definition)
+
+        # an expression can only use the expressions defined before it
+        definition = load_model_definition(os.path.join(DEFINITIONS, "synTF_chem.json"))
+        definition["expressions"] = {
+            "total": "2 * half",
+            **definition["expressions"],
+            "half": "ZF_protein / 2",
+        }
+        with self.assertRaisesRegex(ValueError, "expression total: half"):
+            check_model_definition(definition)
+
+    def test_synTF_definition(self):
+        # Tests whether the model built from the synTF definition matches the synTF class
+        x = [0.1, 1, 5, 20, 50]
+        parameters = [1, 1113, 0.032]
+        solutions = synTF(parameters=parameters).solve_experiment(x, "synTF dose response", None)
+        for solve_mode in ["default", "batch"]:
+            model = DefinedModel(
+                os.path.join(DEFINITIONS, "synTF.json"),
+                parameters=parameters,
+                solve_mode=solve_mode,
+            )
+            np.testing.assert_allclose(
+                model.solve_experiment(x, "synTF dose response", None), solutions, rtol=1e-5
+            )
+
+    def test_synTF_chem_definition(self):
+        # Tests whether the model built from the synTF_chem definition matches the
+        # synTF_chem class, including the normalization of both experiments
+        dataID = "ligand dose response and DBD dose response"
+        parameter_labels = ["e", "b", "k_bind", "m", "km", "n"]
+        parameters = [15, 0.5, 0.05, 7, 10, 2]
+        x = [0, 0.1, 0.5, 1, 5, 10, 50, 100, 250, 500, 1000, 2, 5, 10, 20, 30, 40, 50, 100]
+        reference = synTF_chem(parameters=parameters, mechanismID="A")
+        solutions = reference.solve_experiment(x, dataID, parameter_labels)
+        for solve_mode in ["default", "batch"]:
+            model = DefinedModel(
+                os.path.join(DEFINITIONS, "synTF_chem.json"),
+                parameters=parameters,
+                solve_mode=solve_mode,
+            )
+            solutions_defined = model.solve_experiment(x, dataID, parameter_labels)
+            np.testing.assert_allclose(solutions_defined, solutions, rtol=1e-5)
+            np.testing.assert_allclose(
+                model.normalize_data(solutions_defined, dataID),
+                reference.normalize_data(solutions, dataID),
+                rtol=1e-5,
+            )
+            np.testing.assert_allclose(
+                model.solve_experiment_conditions(x, dataID, parameter_labels, [3, 20, 12]),
+                [solutions[3], solutions[20], solutions[12]],
+                rtol=1e-5,
+            )
+            self.assertEqual(
+                model.define_normalization_groups(dataID, 27),
+                reference.define_normalization_groups(dataID, 27),
+            )
+
+    def test_generated_jacobian(self):
+        # Tests whether the generated Jacobians match the generated gradients
+        rng = np.random.default_rng(456767)
+        model = DefinedModel(os.path.join(DEFINITIONS, "synTF_chem.json"))
+        for _ in range(5):
+            y = rng.uniform(0.1, 5, 8)
+            args = (rng.uniform(0.1, 3, 6), np.array([50, 20, 100], dtype=float))
+            np.testing.assert_allclose(
+                model.functions["jacobian"](y, 0, *args),
+                finite_difference_jacobian(model.functions["gradient"], y, args),
+                atol=1e-6,
+            )
+
+        # banded batch Jacobian contains the Jacobian of each condition
+        inputs = np.array([[50, 50, 100], [20, 10, 5]], dtype=float)
+        y = rng.uniform(0.1, 5, 16)
+        parameters = rng.uniform(0.1, 3, 6)
+        jacobian_banded = model.functions["jacobian_batch"](y, 0, parameters, inputs)
+        for condition in range(2):
+            jacobian = model.functions["jacobian"](
+                y[8 * condition : 8 * (condition + 1)], 0, parameters, inputs[condition]
+            )
+            for i in range(8):
+                for j in range(8):
+                    self.assertAlmostEqual(
+                        jacobian_banded[7 + i - j, 8 * condition + j], jacobian[i, j]
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
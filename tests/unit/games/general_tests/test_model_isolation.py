@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import os
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import games.models
+from games.models.defined_model import DefinedModel
+from games.models.synTF import synTF
+from games.models.synTF_chem import synTF_chem
+
+DEFINITIONS = os.path.join(os.path.dirname(games.models.__file__), "definitions")
+PARAMETER_LABELS = ["e", "b", "k_bind", "m", "km", "n"]
+X = [0, 0.1, 1, 5, 50, 250, 1000]
+
+
+class TestModelIsolation(unittest.TestCase):
+    def test_with_parameters(self):
+        # Tests whether solving a copy leaves the original model unchanged
+        model = synTF_chem(parameters=[15, 0.5, 0.05, 7, 10, 2], mechanismID="A")
+        solutions = model.solve_experiment(X, "ligand dose response", PARAMETER_LABELS)
+        given_model = model.with_parameters([10, 1, 0.1, 5, 10, 2])
+        given_model.solve_experiment(X, "ligand dose response", PARAMETER_LABELS)
+        self.assertEqual(model.parameters, [15, 0.5, 0.05, 7, 10, 2])
+        np.testing.assert_allclose(
+            model.solve_experiment(X, "ligand dose response", PARAMETER_LABELS), solutions
+        )
+
+    def test_pickle(self):
+        # Tests whether models give the same solutions after pickling
+        for model, dataID, parameter_labels in [
+            (synTF(parameters=[1, 1113, 0.032]), "synTF dose response", ["b", "m", "w"]),
+            (
+                synTF_chem(parameters=[15, 0.5, 0.05, 7, 10, 2], mechanismID="D"),
+                "ligand dose response",
+                PARAMETER_LABELS,
+            ),
+            (
+                DefinedModel(
+                    os.path.join(DEFINITIONS, "synTF_chem.json"),
+                    parameters=[15, 0.5, 0.05, 7, 10, 2],
+                ),
+                "ligand dose response",
+                PARAMETER_LABELS,
+            ),
+        ]:
+            x = [0.1, 1, 5, 50]
+            model_unpickled = pickle.loads(pickle.dumps(model))
+            np.testing.assert_allclose(
+                model_unpickled.solve_experiment(x, dataID, parameter_labels),
+                model.solve_experiment(x, dataID, parameter_labels),
+            )
+
+    def test_threads(self):
+        # Tests whether copies of one model solved concurrently match sequential solutions
+        # (odeint is not thread-safe, so a solve_ivp method is used)
+        model = synTF_chem(mechanismID="A", solver={"method": "BDF"})
+        rng = np.random.default_rng(456767)
+        parameter_sets = [list(rng.uniform(0.1, 10, 6)) for _ in range(8)]
+
+        def solve(parameters):
+            return model.with_parameters(parameters).solve_experiment(
+                X, "ligand dose response", PARAMETER_LABELS
+            )
+
+        solutions = [solve(parameters) for parameters in parameter_sets]
+        with ThreadPoolExecutor(4) as executor:
+            solutions_threads = list(executor.map(solve, parameter_sets))
+        np.testing.assert_allclose(solutions_threads, solutions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import multiprocessing as mp
+import os
+import time
+import unittest
+import numpy as np
+from games.utilities.parallel import (
+    attach_shared_arrays,
+    define_chunksize,
+    imap_unordered_tagged,
+    shared_arrays,
+)
+
+_arrays: dict = {}
+
+
+def initialize(specs: dict) -> None:
+    _arrays.update(attach_shared_arrays(specs))
+
+
+def sum_row(index: int) -> None:
+    _arrays["sums"][index] = np.sum(_arrays["values"][index])
+
+
+def square(index: int) -> int:
+    return index**2
+
+
+def sleep_uneven(index: int) -> tuple:
+    # the first task is much slower than the others, like an optimization run that
+    # converges slowly
+    start_time = time.time()
+    time.sleep(0.4 if index == 0 else 0.02)
+    return os.getpid(), start_time, time.time()
+
+
+class TestParallel(unittest.TestCase):
+    def test_shared_arrays(self):
+        """Tests whether worker processes read the shared arrays and write the results
+        that are copied back when the shared memory is released"""
+        values = np.arange(24, dtype=float).reshape(8, 3)
+        with shared_arrays({"values": values, "sums": np.zeros(8)}, ("sums",)) as (
+            specs,
+            results,
+        ):
+            with mp.Pool(2, initializer=initialize, initargs=(specs,)) as pool:
+                list(pool.imap(sum_row, range(8), 2))
+                pool.close()
+                pool.join()
+        np.testing.assert_allclose(results["sums"], values.sum(axis=1))
+        self.assertNotIn("values", results)
+
+    def test_define_chunksize(self):
+        """Tests whether the chunk size targets the chunk time and keeps 4 chunks per core"""
+        self.assertEqual(define_chunksize(10000, 2, 0.01), 20)
+        self.assertEqual(define_chunksize(100, 2, 0.0001), 12)
+        self.assertEqual(define_chunksize(100, 2, 5.0), 1)
+        self.assertEqual(define_chunksize(3, 4, 0.0), 1)
+
+    def test_imap_unordered_tagged(self):
+        """Tests whether each task result is returned once with its index, with the chunk
+        size defined from the measured time per task or given"""
+        for chunksize in [None, 3]:
+            with mp.Pool(2) as pool:
+                output = list(imap_unordered_tagged(pool, square, 25, 2, chunksize))
+                pool.close()
+                pool.join()
+            self.assertEqual(sorted(output), [(index, index**2) for index in range(25)])
+
+    def test_imap_unordered_tagged_uneven_tasks(self):
+        """Tests whether a worker process is never idle while tasks are left when the
+        tasks take very different times"""
+        for chunksize in [None, 1]:
+            with mp.Pool(2) as pool:
+                output = list(imap_unordered_tagged(pool, sleep_uneven, 40, 2, chunksize))
+                pool.close()
+                pool.join()
+            self.assertEqual(sorted(index for index, _ in output), list(range(40)))
+            tasks_by_worker: dict = {}
+            for _, (pid, start_time, end_time) in output:
+                tasks_by_worker.setdefault(pid, []).append((start_time, end_time))
+            last_start_time = max(start_time for _, (_, start_time, _) in output)
+            for tasks in tasks_by_worker.values():
+                tasks.sort()
+                for (_, end_time), (next_start_time, _) in zip(tasks, tasks[1:]):
+                    self.assertLess(next_start_time - end_time, 0.1)
+                # the worker kept running tasks until the last task started
+                self.assertGreater(tasks[-1][1], last_start_time - 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import unittest
+import numpy as np
+from games.models import compiled
+from games.models.synTF import synTF
+from games.models.synTF_chem import synTF_chem
+
+SOLVER_TIGHT = {"rtol": 1e-11, "atol": 1e-12, "mxstep": 1000000}
+
+
+def finite_difference_sensitivities(model, x, dataID, parameter_labels, normalize=False):
+    parameters = list(model.parameters)
+    sensitivities = []
+    for j, parameter in enumerate(parameters):
+        step = 1e-4 * parameter
+        solutions = []
+        for perturbation in [step, -step]:
+            model.parameters = list(parameters)
+            model.parameters[j] = parameter + perturbation
+            solution = model.solve_experiment(x, dataID, parameter_labels)
+            if normalize:
+                solution = model.normalize_data(solution, dataID)
+            solutions.append(np.array(solution))
+        sensitivities.append((solutions[0] - solutions[1]) / (2 * step))
+    model.parameters = parameters
+    return np.array(sensitivities).T
+
+
+class TestSensitivities(unittest.TestCase):
+    def check_sensitivities(self, model, x, dataID, parameter_labels):
+        solutions, sensitivities = model.solve_experiment_sensitivities(x, dataID, parameter_labels)
+        np.testing.assert_allclose(
+            solutions, model.solve_experiment(x, dataID, parameter_labels), rtol=1e-6
+        )
+        np.testing.assert_allclose(
+            sensitivities,
+            finite_difference_sensitivities(model, x, dataID, parameter_labels),
+            rtol=1e-4,
+            atol=1e-6 * np.max(np.abs(sensitivities)),
+        )
+        np.testing.assert_allclose(
+            model.normalize_sensitivities(solutions, sensitivities, dataID),
+            finite_difference_sensitivities(model, x, dataID, parameter_labels, normalize=True),
+            rtol=1e-3,
+            atol=1e-6,
+        )
+
+    def test_sensitivities_synTF(self):
+        # Tests whether the forward sensitivities match a finite difference approximation
+        parameter_labels = ["b", "m", "w"]
+        x = [0.1, 1, 5, 20]
+        for solve_mode in ["default", "semi-analytic"]:
+            model = synTF(parameters=[1.5, 30, 2], solver=SOLVER_TIGHT, solve_mode=solve_mode)
+            self.check_sensitivities(model, x, "synTF dose response", parameter_labels)
+
+    def test_sensitivities_synTF_chem(self):
+        # Tests whether the forward sensitivities match a finite difference approximation
+        # for mechanisms with and without m scaled by b
+        parameter_labels = ["e", "b", "k_bind", "m", "km", "n"]
+        x = [0, 5, 50]
+        for mechanismID in ["A", "D"]:
+            model = synTF_chem(
+                parameters=[15, 0.5, 0.05, 7, 10, 2],
+                mechanismID=mechanismID,
+                solver=SOLVER_TIGHT,
+            )
+            self.check_sensitivities(model, x, "ligand dose response", parameter_labels)
+
+    @unittest.skipIf(not compiled.NUMBA_AVAILABLE, "numba is not installed")
+    def test_sensitivities_numba(self):
+        # Tests whether the compiled sensitivity kernels match the python implementation
+        parameter_labels = ["e", "b", "k_bind", "m", "km", "n"]
+        x = [0, 5, 50]
+        sensitivities = []
+        for model_backend in ["python", "numba"]:
+            model = synTF_chem(
+                parameters=[15, 0.5, 0.05, 7, 10, 2],
+                mechanismID="D",
+                model_backend=model_backend,
+            )
+            sensitivities.append(
+                model.solve_experiment_sensitivities(x, "ligand dose response", parameter_labels)[1]
+            )
+        np.testing.assert_allclose(sensitivities[0], sensitivities[1], rtol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import unittest
+from unittest import mock
+import numpy as np
+from games.models import compiled
+from games.models.solvers import define_solver, solve_ode
+from games.models.synTF_chem import synTF_chem
+
+PARAMETERS = [15, 0.5, 0.05, 7, 10, 2]
+PARAMETER_LABELS = ["e", "b", "k_bind", "m", "km", "n"]
+X = [0, 0.1, 1, 5, 50, 250, 1000]
+
+
+def solve_counting(model, x=X):
+    """Solves the ligand dose response and counts the solves before ligand addition
+    (end time 18)"""
+    with mock.patch("games.models.synTF_chem.solve_ode", wraps=solve_ode) as solver:
+        solutions = model.solve_experiment(x, "ligand dose response", PARAMETER_LABELS)
+    num_solves = sum(call.args[3] == 18 for call in solver.call_args_list)
+    return solutions, num_solves
+
+
+class TestSolveBeforeLigandAddition(unittest.TestCase):
+    def test_reuse_across_ligand_doses(self):
+        # Tests whether the solution before ligand addition is solved once for all ligand
+        # doses and gives the same solutions as solving each dose with a new model
+        model = synTF_chem(parameters=PARAMETERS, mechanismID="A")
+        solutions, num_solves = solve_counting(model)
+        self.assertEqual(num_solves, 1)
+        self.assertEqual(len(model.solutions_before_ligand_addition), 1)
+
+        solutions_again, num_solves = solve_counting(model)
+        self.assertEqual(num_solves, 0)
+        np.testing.assert_allclose(solutions_again, solutions)
+
+        solutions_separate = [
+            synTF_chem(parameters=PARAMETERS, mechanismID="A").solve_experiment(
+                [ligand], "ligand dose response", PARAMETER_LABELS
+            )[0]
+            for ligand in X
+        ]
+        np.testing.assert_allclose(solutions, solutions_separate)
+
+    def test_new_solve_after_changes(self):
+        # Tests whether changing the parameters, mechanism or solver forces a new solve
+        model = synTF_chem(parameters=PARAMETERS, mechanismID="A")
+        solve_counting(model)
+
+        model.parameters = [10, 1, 0.1, 5, 10, 2]
+        solutions, num_solves = solve_counting(model)
+        self.assertEqual(num_solves, 1)
+        np.testing.assert_allclose(
+            solutions,
+            synTF_chem(parameters=model.parameters, mechanismID="A").solve_experiment(
+                X, "ligand dose response", PARAMETER_LABELS
+            ),
+        )
+
+        model.mechanismID = "B"
+        self.assertEqual(solve_counting(model)[1], 1)
+
+        model.solver = define_solver({"method": "BDF"})
+        self.assertEqual(solve_counting(model)[1], 1)
+        self.assertEqual(solve_counting(model)[1], 0)
+
+    @unittest.skipIf(not compiled.NUMBA_AVAILABLE, "numba is not installed")
+    def test_new_solve_after_backend_change(self):
+        # Tests whether changing the model backend forces a new solve
+        model = synTF_chem(parameters=PARAMETERS, mechanismID="A")
+        solutions, _ = solve_counting(model)
+        model.model_backend = "numba"
+        model.define_compiled_kernels()
+        solutions_numba, num_solves = solve_counting(model)
+        self.assertEqual(num_solves, 1)
+        np.testing.assert_allclose(solutions_numba, solutions, rtol=1e-4)
+
+    def test_with_parameters(self):
+        # Tests whether a copy made with with_parameters() solves again instead of
+        # using the stored solutions of the original model
+        model = synTF_chem(parameters=PARAMETERS, mechanismID="A")
+        solutions, _ = solve_counting(model)
+
+        given_model = model.with_parameters([10, 1, 0.1, 5, 10, 2])
+        given_solutions, num_solves = solve_counting(given_model)
+        self.assertEqual(num_solves, 1)
+        np.testing.assert_allclose(
+            given_solutions,
+            synTF_chem(parameters=[10, 1, 0.1, 5, 10, 2], mechanismID="A").solve_experiment(
+                X, "ligand dose response", PARAMETER_LABELS
+            ),
+        )
+
+        # a copy with the same parameters does not share the stored solutions either
+        self.assertEqual(solve_counting(model.with_parameters(PARAMETERS))[1], 1)
+
+        # the stored solutions of the original model are unchanged
+        solutions_again, num_solves = solve_counting(model)
+        self.assertEqual(num_solves, 0)
+        np.testing.assert_allclose(solutions_again, solutions)
+
+
+if __name__ == "__main__":
+    unittest.main()
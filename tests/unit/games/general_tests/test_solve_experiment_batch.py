@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import unittest
+import numpy as np
+from games.models.synTF_chem import synTF_chem
+
+
+class TestSolveExperimentBatch(unittest.TestCase):
+    def test_solve_experiment_batch_synTF_chem(self):
+        # Tests whether solving all conditions together in a single ODE system gives
+        # the same solutions as solving each condition separately
+        parameter_labels = ["e", "b", "k_bind", "m", "km", "n"]
+        x = [0, 1, 1.67, 2.78, 4.64, 7.74, 12.92, 21.54, 35.98, 59.95, 100]
+        x += [0, 2, 5, 10, 20, 50, 100, 200] * 2
+        tests = [
+            ([15, 1, 0.05, 720, 100, 2], "ligand dose response"),
+            ([15, 1, 0.05, 720, 100, 2], "ligand dose response and DBD dose response"),
+            ([1.5, 0.1, 1, 72, 10, 1], "ligand dose response and DBD dose response"),
+            ([15, 1, 0.05, 720, 100, 2], "undefined experiment"),
+        ]
+
+        for parameters, dataID in tests:
+            model = synTF_chem(parameters=parameters, mechanismID="D")
+            expected = model.solve_experiment(x, dataID, parameter_labels)
+            model.solve_mode = "batch"
+            found = model.solve_experiment(x, dataID, parameter_labels)
+            self.assertEqual(len(found), len(expected))
+            np.testing.assert_allclose(found, expected, rtol=1e-4, atol=1e-8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import unittest
+import numpy as np
+from games.models.synTF import synTF
+
+
+class TestSolveExperimentSemiAnalytic(unittest.TestCase):
+    def test_solve_experiment_semi_analytic_synTF(self):
+        # Tests whether the semi-analytic solution matches odeint (with tight tolerances)
+        # across parameter regimes, including a sharply saturating promoter (large w)
+        x = [0, 0.5, 2, 5, 10, 20, 50, 100, 200]
+        solver = {"rtol": 1e-12, "atol": 1e-14, "mxstep": 100000}
+        tests = [[1, 1, 1], [0.01, 100, 0.1], [5, 0.5, 10], [0.001, 1000, 10000]]
+
+        for parameters in tests:
+            model = synTF(parameters=parameters, solver=solver)
+            expected = model.solve_experiment(x, "synTF dose response", None)
+            model.solve_mode = "semi-analytic"
+            found = model.solve_experiment(x, "synTF dose response", None)
+            np.testing.assert_allclose(found, expected, rtol=1e-8)
+
+        found = model.solve_experiment(x, "undefined experiment", None)
+        self.assertEqual(found, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import unittest
+import numpy as np
+from games.models.solvers import define_solver, solve_rk4
+from games.models.synTF import synTF
+from games.models.synTF_chem import synTF_chem
+
+
+class TestSolvers(unittest.TestCase):
+    def test_define_solver(self):
+        # Tests whether default solver settings are filled in for the given method
+        solver = define_solver(None)
+        self.assertEqual(solver["method"], "odeint")
+        self.assertEqual(solver["output"], "final")
+
+        solver = define_solver({"method": "rk4", "step_size": 0.01})
+        self.assertEqual(solver["step_size"], 0.01)
+        self.assertEqual(solver["rtol"], 1e-6)
+        self.assertNotIn("mxstep", solver)
+
+        solver = define_solver({"method": "Radau", "rtol": 1e-8})
+        self.assertEqual(solver["rtol"], 1e-8)
+        self.assertEqual(solver["atol"], 1e-9)
+
+        with self.assertRaises(ValueError):
+            define_solver({"method": "undefined method"})
+
+    def test_output(self):
+        # Tests whether "final" output returns only the initial and final states,
+        # and whether the final state is the same as for "dense" output
+        model = synTF(parameters=[1, 1, 1], inputs=[50])
+        solution_dense, t_dense = model.solve_single("dense")
+        solution_final, t_final = model.solve_single("final")
+        self.assertEqual(solution_dense.shape, (100, 4))
+        self.assertEqual(solution_final.shape, (2, 4))
+        np.testing.assert_allclose(t_final, [t_dense[0], t_dense[-1]])
+        np.testing.assert_allclose(solution_final[-1], solution_dense[-1], rtol=1e-6)
+
+    def test_solve_experiment_solvers(self):
+        # Tests whether each solver gives the same solutions as odeint
+        # (in a non-stiff parameter regime, so that rk4 is also accurate)
+        parameter_labels = ["e", "b", "k_bind", "m", "km", "n"]
+        x = [0, 1, 1.67, 2.78, 4.64, 7.74, 12.92, 21.54, 35.98, 59.95, 100]
+        x += [0, 2, 5, 10, 20, 50, 100, 200] * 2
+        dataID = "ligand dose response and DBD dose response"
+        parameters = [0.01, 1, 0.001, 720, 100, 2]
+        expected = synTF_chem(parameters=parameters, mechanismID="D").solve_experiment(
+            x, dataID, parameter_labels
+        )
+
+        for method in ["LSODA", "Radau", "BDF", "rk4"]:
+            for solve_mode in ["default", "batch"]:
+                model = synTF_chem(
+                    parameters=parameters,
+                    mechanismID="D",
+                    solve_mode=solve_mode,
+                    solver={"method": method},
+                )
+                found = model.solve_experiment(x, dataID, parameter_labels)
+                np.testing.assert_allclose(found, expected, rtol=1e-3)
+
+    def test_rk4_stiff_default_settings(self):
+        # Tests whether rk4 with the default settings gives the same solutions as odeint
+        # for the synTF_chem example parameters, for which binding is stiff
+        parameter_labels = ["e", "b", "k_bind", "m", "km", "n"]
+        x = [0, 1, 100]
+        parameters = [15, 1, 1, 720, 100, 2]
+        expected = synTF_chem(parameters=parameters, mechanismID="D").solve_experiment(
+            x, "ligand dose response", parameter_labels
+        )
+        for solve_mode in ["default", "batch"]:
+            model = synTF_chem(
+                parameters=parameters,
+                mechanismID="D",
+                solve_mode=solve_mode,
+                solver={"method": "rk4"},
+            )
+            found = model.solve_experiment(x, "ligand dose response", parameter_labels)
+            self.assertTrue(np.all(np.isfinite(found)))
+            np.testing.assert_allclose(found, expected, rtol=1e-3)
+
+    def test_rk4_diverging(self):
+        # Tests whether rk4 warns and returns NaN instead of wrong states when the
+        # solution diverges (y' = y^2 with y(0) = 1 diverges at t = 1)
+        t = np.array([0, 0.5, 2])
+        with self.assertWarns(RuntimeWarning):
+            solution = solve_rk4(lambda y, time: y**2, np.array([1.0]), t, (), 0.1, 1e-6, 1e-9)
+        self.assertAlmostEqual(solution[1, 0], 2, places=5)
+        self.assertTrue(np.isnan(solution[2, 0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from games.models.synTF import synTF
+from games.modules.parameter_estimation import global_search
+from games.modules.parameter_estimation.global_search import (
+    create_default_df,
+    run_global_search,
+    shrink_bounds,
+    solve_global_search,
+    solve_global_search_array,
+)
+from games.modules.solve_single import solve_single_parameter_set
+
+PARAMETER_LABELS = ["b", "m", "w"]
+X = [0.1, 1, 5, 20, 50]
+EXP_DATA = [0.1, 0.3, 0.6, 0.9, 1]
+EXP_ERROR = [0.05] * 5
+
+
+def define_settings(parallelization):
+    return {
+        "dataID": "synTF dose response",
+        "weight_by_error": "yes",
+        "parameter_labels": PARAMETER_LABELS,
+        "parallelization": parallelization,
+        "num_cores": 2,
+    }
+
+
+class TestGlobalSearch(unittest.TestCase):
+    def test_solve_global_search_array(self):
+        """Tests whether the results arrays match solving each parameter set separately,
+        with and without parallelization"""
+        model = synTF()
+        rng = np.random.default_rng(456767)
+        parameter_array = 10 ** rng.uniform([-1, 1, -2], [1, 3, 0], (6, 3))
+        chi_sq_expected = []
+        solutions_expected = []
+        for parameters in parameter_array:
+            solutions, chi_sq, _ = solve_single_parameter_set(
+                model, list(parameters), X, EXP_DATA, EXP_ERROR, "synTF dose response", "yes", None
+            )
+            chi_sq_expected.append(chi_sq)
+            solutions_expected.append(solutions)
+
+        for parallelization in ["no", "yes"]:
+            chi_sq_array, solutions_array = solve_global_search_array(
+                model, parameter_array, X, EXP_DATA, EXP_ERROR, define_settings(parallelization)
+            )
+            np.testing.assert_allclose(chi_sq_array, chi_sq_expected, atol=1e-4)
+            np.testing.assert_allclose(solutions_array, solutions_expected)
+
+    def test_solve_global_search_array_parallel_early_abort(self):
+        """Tests whether the parallel global search lowers the early abort threshold as the
+        results come back and keeps the same best parameter sets"""
+        model = synTF()
+        rng = np.random.default_rng(456767)
+        parameter_array = 10 ** rng.uniform([-1, 1, -2], [1, 3, 0], (30, 3))
+        settings = define_settings("yes")
+        chi_sq_array, _ = solve_global_search_array(
+            model, parameter_array, X, EXP_DATA, EXP_ERROR, settings
+        )
+        settings["global_search_early_abort"] = "yes"
+        settings["global_search_early_abort_stages"] = 2
+        settings["global_search_top_k"] = 3
+        for parallel_chunksize in [0, 2]:
+            settings["parallel_chunksize"] = parallel_chunksize
+            chi_sq_array_early_abort, _ = solve_global_search_array(
+                model, parameter_array, X, EXP_DATA, EXP_ERROR, settings, np.empty(0)
+            )
+            aborted = np.isinf(chi_sq_array_early_abort)
+            self.assertTrue(aborted.any())
+            np.testing.assert_allclose(
+                np.sort(chi_sq_array_early_abort)[:3], np.sort(chi_sq_array)[:3]
+            )
+            np.testing.assert_allclose(chi_sq_array_early_abort[~aborted], chi_sq_array[~aborted])
+
+    def test_solve_global_search(self):
+        """Tests whether the global search results df contains the columns used by optimization"""
+        df_parameters = create_default_df(4, PARAMETER_LABELS, [1, 1113, 0.032])
+        with tempfile.TemporaryDirectory() as folder:
+            working_directory = os.getcwd()
+            os.chdir(folder)
+            try:
+                df_results = solve_global_search(
+                    synTF(), df_parameters, X, EXP_DATA, EXP_ERROR, define_settings("no")
+                )
+            finally:
+                os.chdir(working_directory)
+
+        self.assertEqual(
+            list(df_results.columns),
+            PARAMETER_LABELS
+            + [
+                "aborted",
+                "x",
+                "exp_data",
+                "exp_error",
+                "dataID",
+                "weight_by_error",
+                "parameter_labels",
+                "chi_sq",
+                "normalized solutions",
+            ],
+        )
+        self.assertEqual(len(set(df_results["chi_sq"])), 1)
+        self.assertEqual(
+            df_results["normalized solutions"].iloc[0],
+            list(df_results["normalized solutions"].iloc[3]),
+        )
+
+    def test_run_global_search_chunked(self):
+        """Tests whether the chunked global search keeps the same best parameter sets
+        as the global search of the full sweep and saves the results of all parameter sets"""
+        problem = {"num_vars": 2, "names": ["m", "w"], "bounds": [[2, 4], [-2, 0]]}
+        settings = define_settings("no")
+        settings["num_parameter_sets_global_search"] = 25
+        settings["num_parameter_sets_optimization"] = 3
+        settings["num_pem_evaluation_datasets"] = 2
+        with tempfile.TemporaryDirectory() as folder:
+            working_directory = os.getcwd()
+            os.chdir(folder)
+            try:
+                df_results = run_global_search(
+                    synTF(), problem, dict(settings), [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+                settings["global_search_chunk_size"] = 7
+                df_results_chunked = run_global_search(
+                    synTF(), problem, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+                df_saved = pd.read_csv("global search results.csv", index_col=0)
+            finally:
+                os.chdir(working_directory)
+
+        self.assertEqual(len(df_results_chunked.index), 5)
+        self.assertEqual(len(df_saved.index), 25)
+        df_results = df_results.sort_values(by=["chi_sq"], kind="stable").reset_index(drop=True)
+        np.testing.assert_allclose(df_results_chunked["chi_sq"], df_results["chi_sq"].iloc[:5])
+        np.testing.assert_allclose(
+            df_results_chunked[PARAMETER_LABELS], df_results[PARAMETER_LABELS].iloc[:5]
+        )
+        np.testing.assert_allclose(np.sort(df_saved["chi_sq"]), np.sort(df_results["chi_sq"]))
+
+    def test_run_global_search_checkpoints(self):
+        """Tests whether a chunked global search resumes from its checkpoints"""
+        problem = {"num_vars": 2, "names": ["m", "w"], "bounds": [[2, 4], [-2, 0]]}
+        settings = define_settings("no")
+        settings["num_parameter_sets_global_search"] = 20
+        settings["num_parameter_sets_optimization"] = 3
+        settings["global_search_chunk_size"] = 5
+        settings["global_search_checkpoints"] = "yes"
+        with tempfile.TemporaryDirectory() as folder:
+            working_directory = os.getcwd()
+            os.chdir(folder)
+            settings["context"] = folder
+            try:
+                df_results = run_global_search(
+                    synTF(), problem, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+                checkpoint_folder = global_search.define_checkpoint_folder(
+                    problem, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+                self.assertEqual(len(os.listdir(checkpoint_folder)), 4)
+
+                # only the chunk without a checkpoint is solved again
+                os.remove(os.path.join(checkpoint_folder, "chunk 10.npz"))
+                with mock.patch.object(
+                    global_search,
+                    "solve_global_search_array",
+                    wraps=global_search.solve_global_search_array,
+                ) as solve:
+                    df_results_resumed = run_global_search(
+                        synTF(), problem, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                    )
+                self.assertEqual(solve.call_count, 1)
+
+                # checkpoints are not used for a different global search
+                settings["weight_by_error"] = "no"
+                self.assertNotEqual(
+                    global_search.define_checkpoint_folder(
+                        problem, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                    ),
+                    checkpoint_folder,
+                )
+            finally:
+                os.chdir(working_directory)
+
+        np.testing.assert_allclose(df_results_resumed["chi_sq"], df_results["chi_sq"])
+
+        # checkpoints are only saved for a chunked LHS global search
+        for chunk_size, method in [(0, "LHS"), (5, "adaptive"), (5, "surrogate")]:
+            settings["global_search_chunk_size"] = chunk_size
+            settings["global_search_method"] = method
+            with self.assertRaisesRegex(ValueError, "global_search_checkpoints"):
+                run_global_search(
+                    synTF(), problem, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+        np.testing.assert_allclose(
+            df_results_resumed[PARAMETER_LABELS], df_results[PARAMETER_LABELS]
+        )
+
+    def test_run_global_search_early_abort(self):
+        """Tests whether the global search with early abort keeps the same best parameter sets
+        and only aborts the evaluation of parameter sets outside of the best parameter sets"""
+        problem = {"num_vars": 2, "names": ["m", "w"], "bounds": [[2, 4], [-2, 0]]}
+        settings = define_settings("no")
+        settings["num_parameter_sets_global_search"] = 30
+        settings["num_parameter_sets_optimization"] = 3
+        settings["global_search_chunk_size"] = 10
+        with tempfile.TemporaryDirectory() as folder:
+            working_directory = os.getcwd()
+            os.chdir(folder)
+            try:
+                df_results = run_global_search(
+                    synTF(), problem, dict(settings), [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+                df_saved = pd.read_csv("global search results.csv", index_col=0)
+                settings["global_search_early_abort"] = "yes"
+                df_results_early_abort = run_global_search(
+                    synTF(), problem, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+                df_saved_early_abort = pd.read_csv("global search results.csv", index_col=0)
+            finally:
+                os.chdir(working_directory)
+
+        np.testing.assert_allclose(df_results_early_abort["chi_sq"], df_results["chi_sq"])
+        aborted = df_saved_early_abort["aborted"]
+        np.testing.assert_array_equal(aborted, np.isinf(df_saved_early_abort["chi_sq"]))
+        self.assertFalse(df_saved["aborted"].any())
+        self.assertFalse(df_results_early_abort["aborted"].any())
+        self.assertTrue(aborted.any())
+        self.assertTrue((df_saved["chi_sq"][aborted] > df_results["chi_sq"].max()).all())
+        np.testing.assert_allclose(
+            df_saved_early_abort["chi_sq"][~aborted], df_saved["chi_sq"][~aborted]
+        )
+
+    def test_shrink_bounds(self):
+        """Tests whether the bounds are shrunk around the best parameter sets"""
+        samples_log = np.array([[0.0, 1.0], [1.0, 1.5], [0.5, -1.0], [2.0, 0.0]])
+        chi_sq_array = np.array([1.0, 2.0, 10.0, 0.5])
+        bounds = shrink_bounds(samples_log, chi_sq_array, [[0, 2], [-2, 2]], [[0, 2], [-2, 2]], 2)
+        np.testing.assert_allclose(bounds, [[0, 2], [-0.4, 1.4]])
+
+    def test_run_global_search_adaptive(self):
+        """Tests whether the adaptive global search solves the given number of parameter sets
+        within the bounds"""
+        problem = {"num_vars": 2, "names": ["m", "w"], "bounds": [[2, 4], [-2, 0]]}
+        settings = define_settings("no")
+        settings["num_parameter_sets_global_search"] = 23
+        settings["num_parameter_sets_optimization"] = 3
+        settings["global_search_method"] = "adaptive"
+        with tempfile.TemporaryDirectory() as folder:
+            working_directory = os.getcwd()
+            os.chdir(folder)
+            try:
+                df_results = run_global_search(
+                    synTF(), problem, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+            finally:
+                os.chdir(working_directory)
+
+        self.assertEqual(len(df_results.index), 23)
+        self.assertTrue((df_results["b"] == 1).all())
+        self.assertTrue(df_results["m"].between(10**2, 10**4).all())
+        self.assertTrue(df_results["w"].between(10**-2, 10**0).all())
+
+        # the later rounds, sampled around the best parameter sets, improve on the first round
+        df_first_round = df_results.iloc[:12]
+        self.assertLessEqual(
+            df_results["chi_sq"].iloc[12:].min(), df_first_round["chi_sq"].min() + 1e-12
+        )
+
+    def test_run_global_search_surrogate(self):
+        """Tests whether the surrogate global search solves the pilot parameter sets and the
+        prescreened fraction of the other parameter sets"""
+        problem = {"num_vars": 2, "names": ["m", "w"], "bounds": [[2, 4], [-2, 0]]}
+        settings = define_settings("no")
+        settings["num_parameter_sets_global_search"] = 40
+        settings["num_parameter_sets_optimization"] = 3
+        settings["global_search_method"] = "surrogate"
+        settings["global_search_surrogate_pilot_fraction"] = 0.5
+        settings["global_search_surrogate_solve_fraction"] = 0.25
+        with tempfile.TemporaryDirectory() as folder:
+            working_directory = os.getcwd()
+            os.chdir(folder)
+            try:
+                df_results = run_global_search(
+                    synTF(), problem, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+                df_surrogate = pd.read_csv("global search surrogate.csv", index_col=0)
+            finally:
+                os.chdir(working_directory)
+
+        self.assertEqual(len(df_results.index), 25)
+        self.assertEqual(list(df_surrogate["selection"]), ["promising"] * 4 + ["exploration"])
+        np.testing.assert_allclose(df_surrogate["chi_sq"], df_results["chi_sq"].iloc[20:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -33,6 +33,17 @@ class TestParameterDefinitionsForOpt(unittest.TestCase):
             found = vary_list
             self.assertEqual(found, expected)
 
+    def test_parameter_definitions_for_opt_log_scale(self):
+        # Tests whether only the free parameters are defined as log10 values with log bounds
+        _, params_for_opt = define_parameters_for_opt(
+            [1, 100, 0.01], ["m", "w"], [[1, 3], [-3, 1]], ["b", "m", "w"], "log"
+        )
+        self.assertEqual(list(params_for_opt), ["p_1", "p_2", "p_3"])
+        self.assertAlmostEqual(params_for_opt["p_1"].value, 1)
+        self.assertAlmostEqual(params_for_opt["p_2"].value, 2)
+        self.assertAlmostEqual(params_for_opt["p_3"].value, -2)
+        self.assertEqual([params_for_opt["p_3"].min, params_for_opt["p_3"].max], [-3, 1])
+
 
 if __name__ == "__main__":
     unittest.main()
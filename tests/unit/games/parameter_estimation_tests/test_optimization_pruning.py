@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from games.models.synTF import synTF
+from games.modules.parameter_estimation.global_search import run_global_search
+from games.modules.parameter_estimation.optimization import (
+    PRUNING_WINDOW,
+    check_pruning,
+    optimize_all,
+)
+
+X = [0.1, 1, 5, 20, 50]
+EXP_DATA = [0.1, 0.3, 0.6, 0.9, 1]
+EXP_ERROR = [0.05] * 5
+PROBLEM = {"num_vars": 2, "names": ["m", "w"], "bounds": [[1, 4], [-3, 1]]}
+
+
+class TestOptimizationPruning(unittest.TestCase):
+    def test_check_pruning(self):
+        """Tests whether runs are pruned when heading into a known basin or when dominated
+        by a known basin without improving, and not before PRUNING_WINDOW evaluations"""
+        basins = [
+            {
+                "parameters": np.array([1.0, -0.6]),
+                "chi_sq": 0.5,
+                "num_evaluations": 40,
+                "num_evaluations_in_radius": 12,
+            }
+        ]
+        chi_sq_list = [10.0] * (PRUNING_WINDOW + 1)
+        near = np.array([1.02, -0.63])
+        far = np.array([3.0, 0.5])
+        self.assertEqual(check_pruning(near, chi_sq_list, basins, 0.05, 10), 12)
+        self.assertIsNone(check_pruning(near, chi_sq_list[:-1], basins, 0.05, 10))
+        self.assertIsNone(check_pruning(near, chi_sq_list, [], 0.05, 10))
+        # far from the basin: pruned only if dominated and not improving
+        self.assertEqual(check_pruning(far, chi_sq_list, basins, 0.05, 10), 40 - len(chi_sq_list))
+        self.assertIsNone(check_pruning(far, chi_sq_list, basins, 0.05, 100))
+        improving = list(np.linspace(100, 10, PRUNING_WINDOW + 1))
+        self.assertIsNone(check_pruning(far, improving, basins, 0.05, 10))
+
+    def test_optimize_all_pruning(self):
+        """Tests whether pruning stops optimization runs that converge to the same minimum,
+        without changing the best fit, with and without parallelization"""
+        settings = {
+            "dataID": "synTF dose response",
+            "weight_by_error": "yes",
+            "parameters": [1, 1113, 0.032],
+            "parameter_labels": ["b", "m", "w"],
+            "num_parameter_sets_global_search": 12,
+            "num_parameter_sets_optimization": 6,
+            "optimization_method": "leastsq",
+            "num_cores": 2,
+        }
+        with tempfile.TemporaryDirectory() as folder:
+            working_directory = os.getcwd()
+            os.chdir(folder)
+            try:
+                settings["parallelization"] = "no"
+                df_global_search_results = run_global_search(
+                    synTF(), PROBLEM, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+                results = {}
+                for pruning, parallelization in [("no", "no"), ("yes", "no"), ("yes", "yes")]:
+                    settings["optimization_pruning"] = pruning
+                    settings["parallelization"] = parallelization
+                    _, chi_sq, df_results, _ = optimize_all(
+                        synTF(), df_global_search_results.copy(), settings, PROBLEM, "ppl"
+                    )
+                    num_evaluations = df_results["chi_sq_list"].apply(len).sum()
+                    results[(pruning, parallelization)] = (chi_sq, df_results, num_evaluations)
+            finally:
+                os.chdir(working_directory)
+
+        chi_sq, df_results, num_evaluations = results[("no", "no")]
+        self.assertFalse(df_results["pruned"].any())
+        for key in [("yes", "no"), ("yes", "yes")]:
+            chi_sq_pruning, df_results_pruning, num_evaluations_pruning = results[key]
+            self.assertAlmostEqual(chi_sq_pruning, chi_sq, places=2)
+            self.assertFalse(df_results_pruning["pruned"].all())
+        df_results_pruning = results[("yes", "no")][1]
+        self.assertTrue(df_results_pruning["pruned"].any())
+        self.assertLess(results[("yes", "no")][2], num_evaluations)
+        self.assertTrue(
+            (df_results_pruning["evaluations saved"][~df_results_pruning["pruned"]] == 0).all()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import os
+import unittest
+import numpy as np
+import games.models
+from games.models.defined_model import DefinedModel
+from games.models.model_definition import load_model_definition
+from games.models.synTF import synTF
+from games.modules.parameter_estimation.optimization import optimize_initial_guess
+
+X = [0.1, 1, 5, 20, 50]
+EXP_DATA = [0.1, 0.3, 0.6, 0.9, 1]
+EXP_ERROR = [0.05] * 5
+PROBLEM = {"num_vars": 2, "names": ["m", "w"], "bounds": [[1, 4], [-3, 1]]}
+
+
+class TestOptimizationResiduals(unittest.TestCase):
+    def test_optimize_more_than_10_parameters(self):
+        """Tests whether a model with more than 10 parameters is optimized to the same
+        best fit as the model with only the free parameters and b"""
+        definition = load_model_definition(
+            os.path.join(os.path.dirname(games.models.__file__), "definitions", "synTF.json")
+        )
+        # the constants are defined as (fixed) parameters, plus 4 parameters that are not used
+        constants = definition.pop("constants")
+        definition["parameters"] += list(constants) + ["unused_" + str(i) for i in range(4)]
+        parameter_labels = definition["parameters"]
+        initial_parameters = [1, 500, 0.1] + list(constants.values()) + [1] * 4
+        self.assertEqual(len(parameter_labels), 12)
+
+        results = []
+        for model, labels, parameters in [
+            (synTF(), ["b", "m", "w"], [1, 500, 0.1]),
+            (DefinedModel(definition), parameter_labels, initial_parameters),
+        ]:
+            results_row, results_row_labels = optimize_initial_guess(
+                model,
+                1,
+                parameters,
+                [X, EXP_DATA, EXP_ERROR],
+                [
+                    "synTF dose response",
+                    "yes",
+                    labels,
+                    PROBLEM,
+                    "leastsq",
+                    "finite difference",
+                    "linear",
+                    "ppl",
+                ],
+            )
+            best_parameters = results_row[len(labels) : 2 * len(labels)]
+            results.append((results_row[results_row_labels.index("chi_sq")], best_parameters))
+
+        self.assertAlmostEqual(results[1][0], results[0][0], places=4)
+        np.testing.assert_allclose(results[1][1][1:3], results[0][1][1:3], rtol=1e-3)
+        self.assertEqual(results[1][1][3:], initial_parameters[3:])
+
+    def test_optimize_log_scale(self):
+        """Tests whether optimizing the free parameters as log10 values (with finite
+        difference and sensitivity Jacobians) reaches the same best fit as in linear scale"""
+        results = {}
+        for parameter_scale, optimizer_jacobian in [
+            ("linear", "finite difference"),
+            ("log", "finite difference"),
+            ("log", "sensitivity"),
+        ]:
+            results_row, results_row_labels = optimize_initial_guess(
+                synTF(),
+                1,
+                [1, 500, 0.1],
+                [X, EXP_DATA, EXP_ERROR],
+                [
+                    "synTF dose response",
+                    "yes",
+                    ["b", "m", "w"],
+                    PROBLEM,
+                    "leastsq",
+                    optimizer_jacobian,
+                    parameter_scale,
+                    "ppl",
+                ],
+            )
+            results[(parameter_scale, optimizer_jacobian)] = (
+                results_row[results_row_labels.index("chi_sq")],
+                results_row[3:6],
+            )
+
+        chi_sq_linear, best_parameters_linear = results[("linear", "finite difference")]
+        for chi_sq, best_parameters in results.values():
+            self.assertAlmostEqual(chi_sq, chi_sq_linear, places=4)
+            np.testing.assert_allclose(best_parameters, best_parameters_linear, rtol=1e-3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import unittest
+import numpy as np
+from games.models.synTF import synTF
+from games.modules.parameter_estimation.optimization import (
+    initialize_optimization,
+    optimize_index,
+    optimize_single_initial_guess,
+)
+from games.utilities.parallel import shared_arrays
+
+
+class TestOptimizationSharedArrays(unittest.TestCase):
+    def test_optimize_index(self):
+        """Tests whether an optimization run defined by a row index in the shared arrays
+        matches the optimization run defined by the global search results row"""
+        x = [0.1, 1, 5, 20, 50]
+        exp_data = [0.1, 0.3, 0.6, 0.9, 1]
+        exp_error = [0.05] * 5
+        parameter_labels = ["b", "m", "w"]
+        problem = {"num_vars": 2, "names": ["m", "w"], "bounds": [[1, 4], [-3, 1]]}
+        row_settings = [
+            "synTF dose response",
+            "yes",
+            parameter_labels,
+            problem,
+            "leastsq",
+            "finite difference",
+            "linear",
+            "ppl",
+        ]
+        # row of the global search results df: index, parameters, data, settings, chi_sq,
+        # normalized solutions and the optimization settings added by optimize_all()
+        row = (1, 1, 500, 0.1, x, exp_data, exp_error, "synTF dose response", "yes")
+        row += (parameter_labels, 0, 0, problem, "leastsq", "finite difference", "linear", "ppl")
+        model = synTF()
+
+        expected, expected_labels = optimize_single_initial_guess(model, row)
+        arrays = {
+            "parameters": np.array([[1, 1113, 0.032], [1, 500, 0.1]]),
+            "x": np.array([x] * 2),
+            "exp_data": np.array([exp_data] * 2),
+            "exp_error": np.array([exp_error] * 2),
+        }
+        with shared_arrays(arrays) as (specs, _):
+            initialize_optimization(model, row_settings, specs)
+            found, found_labels = optimize_index(1)
+
+        self.assertEqual(found_labels, expected_labels)
+        chi_sq_index = expected_labels.index("chi_sq")
+        self.assertAlmostEqual(found[chi_sq_index], expected[chi_sq_index])
+        np.testing.assert_allclose(found[:6], expected[:6])
+
+
+if __name__ == "__main__":
+    unittest.main()
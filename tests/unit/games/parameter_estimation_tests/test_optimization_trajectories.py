@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from games.models.synTF import synTF
+from games.modules.parameter_estimation.global_search import run_global_search
+from games.modules.parameter_estimation.optimization import optimize_all
+from games.utilities.saving import load_optimization_trajectories
+
+X = [0.1, 1, 5, 20, 50]
+EXP_DATA = [0.1, 0.3, 0.6, 0.9, 1]
+EXP_ERROR = [0.05] * 5
+PROBLEM = {"num_vars": 2, "names": ["m", "w"], "bounds": [[1, 4], [-3, 1]]}
+
+
+class TestOptimizationTrajectories(unittest.TestCase):
+    def test_optimize_all_trajectories(self):
+        """Tests whether the trajectories are appended to the npz file, one batch per call,
+        with the same chi_sq values as the results and with only scalars in the CSV, with
+        and without parallelization"""
+        settings = {
+            "dataID": "synTF dose response",
+            "weight_by_error": "yes",
+            "parameters": [1, 1113, 0.032],
+            "parameter_labels": ["b", "m", "w"],
+            "num_parameter_sets_global_search": 8,
+            "num_parameter_sets_optimization": 3,
+            "optimization_method": "leastsq",
+            "num_cores": 2,
+            "parallelization": "no",
+        }
+        with tempfile.TemporaryDirectory() as folder:
+            working_directory = os.getcwd()
+            os.chdir(folder)
+            try:
+                df_global_search_results = run_global_search(
+                    synTF(), PROBLEM, settings, [1, 1113, 0.032], X, EXP_DATA, EXP_ERROR
+                )
+                _, _, df_results_default, _ = optimize_all(
+                    synTF(), df_global_search_results.copy(), settings, PROBLEM, "ppl"
+                )
+                self.assertFalse(os.path.exists("optimization trajectories.npz"))
+
+                settings["optimization_trajectories"] = "yes"
+                results = []
+                for parallelization in ["no", "yes"]:
+                    settings["parallelization"] = parallelization
+                    _, _, df_results, _ = optimize_all(
+                        synTF(), df_global_search_results.copy(), settings, PROBLEM, "ppl"
+                    )
+                    df_csv = pd.read_csv("optimization results.csv", index_col=0)
+                    results.append((df_results, df_csv))
+                trajectories = [
+                    load_optimization_trajectories("optimization trajectories.npz", batch)
+                    for batch in [0, 1]
+                ]
+            finally:
+                os.chdir(working_directory)
+
+        for batch, (df_results, df_csv) in enumerate(results):
+            arrays = trajectories[batch]
+            self.assertNotIn("trajectory", df_results.columns)
+            np.testing.assert_allclose(df_results["chi_sq"], df_results_default["chi_sq"])
+            for column in ["model", "chi_sq_list", "Simulation results", "exp_data"]:
+                self.assertNotIn(column, df_csv.columns)
+            self.assertTrue((df_csv["trajectory batch"] == batch).all())
+            self.assertEqual(list(arrays["parameter_labels"]), ["b", "m", "w"])
+            for _, row in df_results.iterrows():
+                evaluations = arrays["run"] == row["run"]
+                np.testing.assert_allclose(arrays["chi_sq"][evaluations], row["chi_sq_list"])
+                self.assertEqual(
+                    df_csv.loc[df_csv["run"] == row["run"], "num_evaluations"].iloc[0],
+                    len(row["chi_sq_list"]),
+                )
+                parameters = arrays["parameters"][evaluations]
+                self.assertEqual(parameters.shape, (len(row["chi_sq_list"]), 3))
+                self.assertTrue((parameters[:, 0] == 1).all())
+                self.assertTrue((np.diff(arrays["time"][evaluations]) >= 0).all())
+                run_index = list(arrays["runs"]).index(row["run"])
+                np.testing.assert_allclose(
+                    arrays["simulation_results"][run_index], row["Simulation results"]
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ Created on Wed May 25 15:26:19 2022
 """
 
 import unittest
+import numpy as np
 from SALib.sample import latin
 from games.modules.parameter_estimation.global_search import (
     convert_parameters_to_linear,
@@ -59,6 +60,24 @@ class TestParameterSweep(unittest.TestCase):
 
             self.assertEqual(found, expected)
 
+    def test_parameter_sweep_values(self):
+        """Tests whether the sweep contains the default values of the fixed parameters and the
+        linear scale values of the free parameters"""
+        df_parameters_default = create_default_df(3, ["p1", "p2", "p3"], [1, 2, 3])
+        param_values_global_search = [[0.0, -1.0], [1.0, 0.5], [2.0, 0.0]]
+        df_parameters = replace_parameter_values_for_sweep(
+            df_parameters_default,
+            2,
+            ["p3", "p1"],
+            convert_parameters_to_linear(param_values_global_search),
+        )
+        self.assertEqual(list(df_parameters.columns), ["p1", "p2", "p3"])
+        np.testing.assert_allclose(
+            df_parameters.to_numpy(),
+            [[0.1, 2, 1], [10**0.5, 2, 10], [1, 2, 100]],
+        )
+        np.testing.assert_allclose(df_parameters_default.to_numpy(), [[1, 2, 3]] * 3)
+
 
 if __name__ == "__main__":
     unittest.main()
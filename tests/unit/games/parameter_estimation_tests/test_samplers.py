@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import unittest
+import numpy as np
+from SALib.sample import latin
+from games.modules.parameter_estimation.samplers import SAMPLERS, sample_parameters
+
+PROBLEM = {"num_vars": 3, "names": ["p1", "p2", "p3"], "bounds": [[0, 2], [-3, 1], [1, 1.5]]}
+
+
+class TestSamplers(unittest.TestCase):
+    def test_sample_latin(self):
+        """Tests whether the default sampler matches the SALib Latin hypercube sample"""
+        np.testing.assert_array_equal(
+            sample_parameters(PROBLEM, 20, "latin", 456767),
+            latin.sample(PROBLEM, 20, seed=456767),
+        )
+
+    def test_samplers(self):
+        """Tests whether each sampler is reproducible and within the bounds, and whether
+        samples generated in blocks match the full sample"""
+        bounds = np.array(PROBLEM["bounds"])
+        for sampler in SAMPLERS:
+            samples = sample_parameters(PROBLEM, 20, sampler, 1234)
+            self.assertEqual(samples.shape, (20, 3))
+            np.testing.assert_array_equal(samples, sample_parameters(PROBLEM, 20, sampler, 1234))
+            self.assertTrue(np.all(samples >= bounds[:, 0]) and np.all(samples <= bounds[:, 1]))
+            blocks = [
+                sample_parameters(PROBLEM, 20, sampler, 1234, start, stop)
+                for start, stop in [(0, 7), (7, 16), (16, 20)]
+            ]
+            np.testing.assert_allclose(np.vstack(blocks), samples)
+
+    def test_extend_sample(self):
+        """Tests whether the extensible samplers extend a sample without changing it"""
+        for sampler in [name for name, item in SAMPLERS.items() if item["extensible"]]:
+            samples = sample_parameters(PROBLEM, 16, sampler, 1234)
+            samples_extended = sample_parameters(PROBLEM, 32, sampler, 1234)
+            np.testing.assert_allclose(samples_extended[:16], samples)
+
+    def test_latin_hypercube_strata(self):
+        """Tests whether the Latin hypercube samplers have one parameter set in each stratum"""
+        for sampler in ["latin", "LHS-optimized"]:
+            samples = sample_parameters(PROBLEM, 10, sampler, 1234)
+            bounds = np.array(PROBLEM["bounds"])
+            strata = np.floor((samples - bounds[:, 0]) / (bounds[:, 1] - bounds[:, 0]) * 10)
+            for column in strata.T:
+                self.assertEqual(sorted(column), list(range(10)))
+
+    def test_unknown_sampler(self):
+        """Tests whether an unknown sampler raises an error"""
+        with self.assertRaises(ValueError):
+            sample_parameters(PROBLEM, 10, "grid", 1234)
+
+
+if __name__ == "__main__":
+    unittest.main()
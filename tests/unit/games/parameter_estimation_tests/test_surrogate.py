@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed May 25 15:26:19 2022
+
+@author: kate
+"""
+
+import contextlib
+import io
+import os
+import re
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from games.models.synTF import synTF
+from games.modules.parameter_estimation.global_search import run_global_search
+from games.modules.parameter_estimation.surrogate import (
+    calc_ranking_agreement,
+    fit_surrogate,
+    select_candidates,
+)
+
+
+class TestSurrogate(unittest.TestCase):
+    def test_fit_surrogate(self):
+        """Tests whether each surrogate model ranks new parameter sets of a smooth cost function
+        close to their true ranking"""
+        rng = np.random.default_rng(456767)
+        samples_log = rng.uniform(-1, 1, (80, 2))
+        samples_log_new = rng.uniform(-1, 1, (40, 2))
+
+        def cost(samples):
+            return 10 ** (np.sum((samples - 0.3) ** 2, axis=1))
+
+        for surrogate_model in ["gradient boosting", "gaussian process"]:
+            surrogate = fit_surrogate(samples_log, cost(samples_log), surrogate_model, 1234)
+            pairwise_agreement, spearman = calc_ranking_agreement(
+                surrogate.predict(samples_log_new), cost(samples_log_new)
+            )
+            self.assertGreater(pairwise_agreement, 0.75)
+            self.assertGreater(spearman, 0.75)
+
+        with self.assertRaises(ValueError):
+            fit_surrogate(samples_log, cost(samples_log), "neural network", 1234)
+
+    def test_select_candidates(self):
+        """Tests whether the promising candidates have the lowest predicted chi_sq and the
+        exploration candidates are chosen from the rest"""
+        predicted_log_chi_sq = np.array([5.0, 1.0, 3.0, 0.0, 4.0, 2.0, 6.0, 7.0, 8.0, 9.0])
+        exploit_indices, explore_indices = select_candidates(predicted_log_chi_sq, 5, 0.4, 1234)
+        np.testing.assert_array_equal(exploit_indices, [1, 3, 5])
+        self.assertEqual(len(explore_indices), 2)
+        self.assertTrue(set(explore_indices).isdisjoint(exploit_indices))
+
+    def test_calc_ranking_agreement(self):
+        """Tests the ranking agreement for the same, reversed, and partly swapped rankings"""
+        chi_sq_array = np.array([1.0, 2.0, 3.0, 4.0])
+        self.assertAlmostEqual(calc_ranking_agreement(np.log10(chi_sq_array), chi_sq_array)[0], 1)
+        self.assertAlmostEqual(calc_ranking_agreement(-chi_sq_array, chi_sq_array)[0], 0)
+        self.assertAlmostEqual(
+            calc_ranking_agreement(np.array([2.0, 1.0, 3.0, 4.0]), chi_sq_array)[0], 5 / 6
+        )
+
+    def test_calc_ranking_agreement_aborted(self):
+        """Tests whether aborted candidates (chi_sq = inf) are left out of the ranking
+        agreement and failed candidates (chi_sq = nan) rank last"""
+        predicted_log_chi_sq = np.array([2.0, 1.0, 0.0, 3.0, 4.0])
+        chi_sq_array = np.array([3.0, 2.0, np.inf, 4.0, np.nan])
+        expected = calc_ranking_agreement(
+            predicted_log_chi_sq[[0, 1, 3, 4]], np.array([3.0, 2.0, 4.0, np.inf])
+        )
+        np.testing.assert_allclose(
+            calc_ranking_agreement(predicted_log_chi_sq, chi_sq_array), expected
+        )
+        self.assertAlmostEqual(expected[0], 1)
+        self.assertTrue(
+            np.isnan(calc_ranking_agreement(predicted_log_chi_sq[2:4], chi_sq_array[2:4])[0])
+        )
+
+    def test_run_global_search_surrogate_early_abort(self):
+        """Tests whether the aborted prescreened candidates are marked in the surrogate results
+        and left out of the printed ranking agreement"""
+        problem = {"num_vars": 2, "names": ["m", "w"], "bounds": [[2, 4], [-2, 0]]}
+        settings = {
+            "dataID": "synTF dose response",
+            "weight_by_error": "yes",
+            "parameter_labels": ["b", "m", "w"],
+            "parallelization": "no",
+            "num_cores": 2,
+            "num_parameter_sets_global_search": 40,
+            "num_parameter_sets_optimization": 3,
+            "global_search_method": "surrogate",
+            "global_search_surrogate_pilot_fraction": 0.5,
+            "global_search_surrogate_solve_fraction": 0.5,
+            "global_search_early_abort": "yes",
+        }
+        output = io.StringIO()
+        with tempfile.TemporaryDirectory() as folder:
+            working_directory = os.getcwd()
+            os.chdir(folder)
+            try:
+                with contextlib.redirect_stdout(output):
+                    df_results = run_global_search(
+                        synTF(),
+                        problem,
+                        settings,
+                        [1, 1113, 0.032],
+                        [0.1, 1, 5, 20, 50],
+                        [0.1, 0.3, 0.6, 0.9, 1],
+                        [0.05] * 5,
+                    )
+                df_surrogate = pd.read_csv("global search surrogate.csv", index_col=0)
+            finally:
+                os.chdir(working_directory)
+
+        aborted = np.isinf(df_surrogate["chi_sq"])
+        self.assertTrue(aborted.any())
+        self.assertFalse(aborted.all())
+        np.testing.assert_array_equal(df_surrogate["aborted"], aborted)
+        np.testing.assert_array_equal(df_results["aborted"].iloc[20:], aborted)
+        line = [line for line in output.getvalue().splitlines() if "Surrogate" in line][0]
+        self.assertIn(str(int(aborted.sum())) + " aborted parameter sets left out", line)
+        agreement = float(re.search(r"ranking agreement = ([-\d.na]+)", line).group(1))
+        self.assertTrue(np.isfinite(agreement))
+
+
+if __name__ == "__main__":
+    unittest.main()